@@ -1,5 +1,8 @@
+import os
+
 import click
 
+from .. import io
 from .._version import version as steinbock_version
 from ..classification._cli import classify_cmd_group
 from ..export._cli import export_cmd_group
@@ -8,13 +11,58 @@ from ..preprocessing._cli import preprocess_cmd_group
 from ..segmentation._cli import segment_cmd_group
 from ..utils._cli import utils_cmd_group
 from .apps import apps_cmd_group
-from .utils import OrderedClickGroup
+from .utils import OrderedClickGroup, catch_exception
 
 
 @click.group(name="steinbock", cls=OrderedClickGroup)
+@click.option(
+    "--tiff-compression",
+    "tiff_compression",
+    type=click.Choice(["none", "zlib", "lzw", "zstd"], case_sensitive=False),
+    default=io.tiff_compression,
+    show_default=True,
+    help="Lossless compression of written TIFF images and masks",
+)
+@click.option(
+    "--tiff-tile-size",
+    "tiff_tile_size",
+    type=click.IntRange(min=0),
+    default=io.tiff_tile_size,
+    show_default=True,
+    help="Tile size of written TIFF images and masks (0 for strips)",
+)
+@click.option(
+    "--tiff-threads",
+    "tiff_threads",
+    type=click.IntRange(min=0),
+    default=io.tiff_threads,
+    show_default=True,
+    help="Number of threads for TIFF encoding (0 for automatic)",
+)
+@click.option(
+    "--img-storage",
+    "img_storage",
+    type=click.Choice(["native", "float16", "uint16"], case_sensitive=False),
+    default=io.img_storage,
+    show_default=True,
+    help="Storage of written images (native data type, float16 or scaled uint16)",
+)
 @click.version_option(steinbock_version)
-def steinbock_cmd_group():
-    pass
+@catch_exception(handle=io.SteinbockIOException)
+def steinbock_cmd_group(tiff_compression, tiff_tile_size, tiff_threads, img_storage):
+    tiff_compression = tiff_compression.lower()
+    img_storage = img_storage.lower()
+    io._check_tiff_write_options(tiff_compression, tiff_tile_size, tiff_threads)
+    io._check_img_storage(img_storage)
+    io.tiff_compression = tiff_compression
+    io.tiff_tile_size = tiff_tile_size
+    io.tiff_threads = tiff_threads
+    io.img_storage = img_storage
+    # propagate to worker processes that do not inherit the module state
+    os.environ["STEINBOCK_TIFF_COMPRESSION"] = tiff_compression
+    os.environ["STEINBOCK_TIFF_TILE_SIZE"] = str(tiff_tile_size)
+    os.environ["STEINBOCK_TIFF_THREADS"] = str(tiff_threads)
+    os.environ["STEINBOCK_IMG_STORAGE"] = img_storage
 
 
 @click.command(name="view")
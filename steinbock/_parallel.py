@@ -0,0 +1,89 @@
+import logging
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from logging.handlers import QueueHandler
+from queue import SimpleQueue
+from typing import Any, Callable, Deque, Generator, Iterable, List, Tuple
+
+from ._steinbock import SteinbockException
+from ._steinbock import logger as steinbock_logger
+
+
+def _call_with_log_records(
+    func: Callable[..., Any], log_level: int, *args: Any
+) -> Tuple[Any, List[logging.LogRecord]]:
+    # log records are returned to the parent process instead of being handled
+    # in the worker process, which may not have inherited the logging setup
+    # (depending on the multiprocessing start method, e.g. spawn)
+    log_records: SimpleQueue = SimpleQueue()
+    handlers = steinbock_logger.handlers
+    propagate = steinbock_logger.propagate
+    level = steinbock_logger.level
+    steinbock_logger.handlers = [QueueHandler(log_records)]
+    steinbock_logger.propagate = False
+    steinbock_logger.setLevel(log_level)
+    try:
+        result = func(*args)
+    finally:
+        steinbock_logger.handlers = handlers
+        steinbock_logger.propagate = propagate
+        steinbock_logger.setLevel(level)
+    return result, [log_records.get() for _ in range(log_records.qsize())]
+
+
+def _handle_log_records(result: Tuple[Any, List[logging.LogRecord]]) -> Any:
+    result, log_records = result
+    for log_record in log_records:
+        logging.getLogger(log_record.name).handle(log_record)
+    return result
+
+
+def map_parallel(
+    func: Callable[..., Any], *iterables: Iterable[Any], workers: int = 1
+) -> Generator[Any, None, None]:
+    if workers < 1:
+        raise SteinbockException(f"Invalid number of workers: {workers}")
+    if workers == 1:
+        yield from map(func, *iterables)
+        return
+    # bound the number of pending results to limit memory usage
+    max_pending_futures = 2 * workers
+    worker_func = partial(
+        _call_with_log_records, func, steinbock_logger.getEffectiveLevel()
+    )
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures: Deque[Future] = deque()
+        for args in zip(*iterables):
+            if len(futures) == max_pending_futures:
+                yield _handle_log_records(futures.popleft().result())
+            futures.append(executor.submit(worker_func, *args))
+        while len(futures) > 0:
+            yield _handle_log_records(futures.popleft().result())
+
+
+def map_prefetched(
+    func: Callable[..., Any], *iterables: Iterable[Any], depth: int = 1
+) -> Generator[Future, None, None]:
+    # runs func (e.g. image reading) up to depth items ahead of the consumer,
+    # using background threads; futures are yielded in order
+    if depth < 0:
+        raise SteinbockException(f"Invalid prefetch depth: {depth}")
+    if depth == 0:
+        for args in zip(*iterables):
+            future: Future = Future()
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+            yield future
+            del future
+        return
+    with ThreadPoolExecutor(max_workers=depth) as executor:
+        futures: Deque[Future] = deque()
+        for args in zip(*iterables):
+            futures.append(executor.submit(func, *args))
+            if len(futures) > depth:
+                yield futures.popleft()
+        while len(futures) > 0:
+            yield futures.popleft()
@@ -111,6 +111,14 @@ def ilastik_cmd_group():
     help="Path to the Ilastik crop output directory",
 )
 @click.option("--seed", "seed", type=click.INT, help="Random seed")
+@click.option(
+    "--workers",
+    "workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes for creating Ilastik images",
+)
 @click_log.simple_verbosity_option(logger=steinbock_logger)
 @catch_exception(handle=SteinbockException)
 def prepare_cmd(
@@ -125,6 +133,7 @@ def prepare_cmd(
     ilastik_img_dir,
     ilastik_crop_dir,
     seed,
+    workers,
 ):
     channel_groups = None
     if Path(panel_file).is_file():
@@ -135,21 +144,18 @@ def prepare_cmd(
     img_files = io.list_image_files(img_dir)
     Path(ilastik_img_dir).mkdir(exist_ok=True)
     ilastik_img_files = []
-    for img_file, ilastik_img in ilastik.try_create_ilastik_images_from_disk(
+    for _, ilastik_img_file in ilastik.try_create_ilastik_images_from_disk_to_disk(
         img_files,
+        ilastik_img_dir,
         channel_groups=channel_groups,
         aggr_func=aggr_func,
         prepend_mean=prepend_mean,
         mean_factor=mean_factor,
         scale_factor=scale_factor,
+        workers=workers,
     ):
-        ilastik_img_file = io._as_path_with_suffix(
-            Path(ilastik_img_dir) / img_file.name, ".h5"
-        )
-        ilastik.write_ilastik_image(ilastik_img, ilastik_img_file)
         ilastik_img_files.append(ilastik_img_file)
         logger.info(ilastik_img_file)
-        del ilastik_img
     Path(ilastik_crop_dir).mkdir(exist_ok=True)
     ilastik_crop_files = []
     for (
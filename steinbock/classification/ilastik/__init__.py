@@ -7,11 +7,14 @@ from ._ilastik import (
     list_ilastik_crop_files,
     list_ilastik_image_files,
     logger,
+    open_ilastik_crop,
+    open_ilastik_image,
     read_ilastik_crop,
     read_ilastik_image,
     run_pixel_classification,
     try_create_ilastik_crops_from_disk,
     try_create_ilastik_images_from_disk,
+    try_create_ilastik_images_from_disk_to_disk,
     try_fix_ilastik_crops_from_disk,
     write_ilastik_crop,
     write_ilastik_image,
@@ -26,11 +29,14 @@ __all__ = [
     "list_ilastik_crop_files",
     "list_ilastik_image_files",
     "logger",
+    "open_ilastik_crop",
+    "open_ilastik_image",
     "read_ilastik_crop",
     "read_ilastik_image",
     "run_pixel_classification",
     "try_create_ilastik_crops_from_disk",
     "try_create_ilastik_images_from_disk",
+    "try_create_ilastik_images_from_disk_to_disk",
     "try_fix_ilastik_crops_from_disk",
     "write_ilastik_crop",
     "write_ilastik_image",
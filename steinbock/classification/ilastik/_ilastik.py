@@ -3,6 +3,7 @@ import logging
 import shutil
 import subprocess
 from enum import IntEnum
+from functools import partial
 from importlib import resources
 from os import PathLike
 from pathlib import Path
@@ -25,6 +26,7 @@ import numpy as np
 
 from ... import io
 from ..._env import run_captured
+from ..._parallel import map_parallel
 from .._classification import SteinbockClassificationException
 from . import data as ilastik_data
 
@@ -83,6 +85,47 @@ def read_ilastik_crop(ilastik_crop_file: Union[str, PathLike]) -> np.ndarray:
         return io._to_dtype(f[str(_crop_dataset_path)][()], io.img_dtype)
 
 
+def _read_ilastik_dataset(
+    ilastik_file: Union[str, PathLike],
+    dataset_path: str,
+    channels: Optional[Sequence[int]] = None,
+    region: Optional[Tuple[int, int, int, int]] = None,
+) -> np.ndarray:
+    with h5py.File(ilastik_file, mode="r", libver=_h5py_libver) as f:
+        dataset = f[dataset_path]
+        if channels is None and region is None:
+            return dataset[()]
+        channels, region = io._check_image_subset(
+            ilastik_file, dataset.shape, channels, region
+        )
+        y0, y1, x0, x1 = region
+        # h5py requires increasing indices, only the selection is read from disk
+        unique_channels, inverse = np.unique(channels, return_inverse=True)
+        return dataset[unique_channels.tolist(), y0:y1, x0:x1][inverse]
+
+
+def _open_ilastik_dataset(
+    ilastik_file: Union[str, PathLike], dataset_path: str
+) -> io.LazyImage:
+    with h5py.File(ilastik_file, mode="r", libver=_h5py_libver) as f:
+        dataset = f[dataset_path]
+        return io.LazyImage(
+            ilastik_file,
+            dataset.shape,
+            dataset.dtype,
+            partial(_read_ilastik_dataset, ilastik_file, dataset_path),
+            metadata=dict(dataset.attrs),
+        )
+
+
+def open_ilastik_image(ilastik_img_file: Union[str, PathLike]) -> io.LazyImage:
+    return _open_ilastik_dataset(ilastik_img_file, str(_img_dataset_path))
+
+
+def open_ilastik_crop(ilastik_crop_file: Union[str, PathLike]) -> io.LazyImage:
+    return _open_ilastik_dataset(ilastik_crop_file, str(_crop_dataset_path))
+
+
 def write_ilastik_image(
     ilastik_img: np.ndarray, ilastik_img_file: Union[str, PathLike]
 ) -> None:
@@ -152,6 +195,39 @@ def create_ilastik_image(
     return io._to_dtype(ilastik_img, io.img_dtype)
 
 
+def _try_create_ilastik_image_from_disk(
+    img_file: Union[str, PathLike],
+    channel_groups: Optional[np.ndarray] = None,
+    aggr_func: AggregationFunction = np.mean,
+    prepend_mean: bool = True,
+    mean_factor: float = 100.0,
+    scale_factor: int = 1,
+    ilastik_img_dir: Union[str, PathLike, None] = None,
+) -> Union[np.ndarray, Path, None]:
+    try:
+        channels = None
+        if channel_groups is not None:
+            channels, channel_groups = io._select_grouped_channels(channel_groups)
+        ilastik_img = create_ilastik_image(
+            io.read_image(img_file, native_dtype=True, channels=channels),
+            channel_groups=channel_groups,
+            aggr_func=aggr_func,
+            prepend_mean=prepend_mean,
+            mean_factor=mean_factor,
+            scale_factor=scale_factor,
+        )
+        if ilastik_img_dir is None:
+            return ilastik_img
+        ilastik_img_file = io._as_path_with_suffix(
+            Path(ilastik_img_dir) / Path(img_file).name, ".h5"
+        )
+        write_ilastik_image(ilastik_img, ilastik_img_file)
+        return ilastik_img_file
+    except Exception as e:
+        logger.exception(f"Error creating Ilastik image from file {img_file}: {e}")
+    return None
+
+
 def try_create_ilastik_images_from_disk(
     img_files: Sequence[Union[str, PathLike]],
     channel_groups: Optional[np.ndarray] = None,
@@ -159,21 +235,56 @@ def try_create_ilastik_images_from_disk(
     prepend_mean: bool = True,
     mean_factor: float = 100.0,
     scale_factor: int = 1,
+    workers: int = 1,
 ) -> Generator[Tuple[Path, np.ndarray], None, None]:
-    for img_file in img_files:
-        try:
-            ilastik_img = create_ilastik_image(
-                io.read_image(img_file, native_dtype=True),
+    for img_file, ilastik_img in zip(
+        img_files,
+        map_parallel(
+            partial(
+                _try_create_ilastik_image_from_disk,
                 channel_groups=channel_groups,
                 aggr_func=aggr_func,
                 prepend_mean=prepend_mean,
                 mean_factor=mean_factor,
                 scale_factor=scale_factor,
-            )
+            ),
+            img_files,
+            workers=workers,
+        ),
+    ):
+        if ilastik_img is not None:
             yield Path(img_file), ilastik_img
             del ilastik_img
-        except Exception as e:
-            logger.exception(f"Error creating Ilastik image from file {img_file}: {e}")
+
+
+def try_create_ilastik_images_from_disk_to_disk(
+    img_files: Sequence[Union[str, PathLike]],
+    ilastik_img_dir: Union[str, PathLike],
+    channel_groups: Optional[np.ndarray] = None,
+    aggr_func: AggregationFunction = np.mean,
+    prepend_mean: bool = True,
+    mean_factor: float = 100.0,
+    scale_factor: int = 1,
+    workers: int = 1,
+) -> Generator[Tuple[Path, Path], None, None]:
+    for img_file, ilastik_img_file in zip(
+        img_files,
+        map_parallel(
+            partial(
+                _try_create_ilastik_image_from_disk,
+                channel_groups=channel_groups,
+                aggr_func=aggr_func,
+                prepend_mean=prepend_mean,
+                mean_factor=mean_factor,
+                scale_factor=scale_factor,
+                ilastik_img_dir=ilastik_img_dir,
+            ),
+            img_files,
+            workers=workers,
+        ),
+    ):
+        if ilastik_img_file is not None:
+            yield Path(img_file), ilastik_img_file
 
 
 def create_ilastik_crop(
@@ -235,8 +346,7 @@ def create_and_save_ilastik_project(
             rel_ilastik_crop_file = Path(ilastik_crop_file).relative_to(
                 Path(ilastik_project_file).parent
             )
-            with h5py.File(ilastik_crop_file, mode="r", libver=_h5py_libver) as f_crop:
-                ilastik_crop_shape = f_crop[_crop_dataset_path].shape
+            ilastik_crop_shape = open_ilastik_crop(ilastik_crop_file).shape
             lane_group = infos_group.create_group(f"lane{i:04d}")
             lane_group.create_group("Prediction Mask")
             raw_data_group = lane_group.create_group("Raw Data")
@@ -5,12 +5,12 @@ import click
 import click_log
 import numpy as np
 import tifffile
-import xtiff
 
 from ... import io
 from ..._cli.utils import OrderedClickGroup, catch_exception, logger
 from ..._steinbock import SteinbockException
 from ..._steinbock import logger as steinbock_logger
+from .. import ome
 from .data import anndata_cmd, csv_cmd, fcs_cmd
 from .graphs import graphs_cmd
 
@@ -41,6 +41,37 @@ def export_cmd_group():
     show_default=True,
     help="Path to the panel file",
 )
+@click.option(
+    "--pyramid/--no-pyramid",
+    "pyramid",
+    default=True,
+    show_default=True,
+    help="Write multi-resolution pyramids (tiled, as sub-IFDs)",
+)
+@click.option(
+    "--tile-size",
+    "tile_size",
+    type=click.IntRange(min=16),
+    default=256,
+    show_default=True,
+    help="Tile size of pyramid levels (multiple of 16)",
+)
+@click.option(
+    "--compression",
+    "compression",
+    type=click.Choice(["none", "zlib", "lzw", "zstd"], case_sensitive=False),
+    default="zlib",
+    show_default=True,
+    help="Lossless compression of pyramid levels",
+)
+@click.option(
+    "--workers",
+    "workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes",
+)
 @click.option(
     "-o",
     "ome_dir",
@@ -51,7 +82,10 @@ def export_cmd_group():
 )
 @click_log.simple_verbosity_option(logger=steinbock_logger)
 @catch_exception(handle=SteinbockException)
-def ome_cmd(img_dir, panel_file, ome_dir):
+def ome_cmd(img_dir, panel_file, pyramid, tile_size, compression, workers, ome_dir):
+    compression = compression.lower()
+    if pyramid:
+        io._check_tiff_write_options(compression, tile_size, 0)
     panel = io.read_panel(panel_file)
     channel_names = [
         f"{channel_id}_{channel_name}"
@@ -60,16 +94,16 @@ def ome_cmd(img_dir, panel_file, ome_dir):
         )
     ]
     Path(ome_dir).mkdir(exist_ok=True)
-    for img_file in io.list_image_files(img_dir):
-        img = io.read_image(img_file, native_dtype=True)
-        ome_file = io._as_path_with_suffix(Path(ome_dir) / img_file.name, ".ome.tiff")
-        xtiff.to_tiff(
-            io._to_dtype(img, np.float32),
-            ome_file,
-            channel_names=channel_names,
-        )
+    for _, ome_file in ome.try_export_ome_tiffs_from_disk_to_disk(
+        io.list_image_files(img_dir),
+        ome_dir,
+        channel_names,
+        pyramid=pyramid,
+        tile_size=tile_size,
+        compression=compression,
+        workers=workers,
+    ):
         logger.info(ome_file)
-        del img
 
 
 @export_cmd_group.command(name="histocat", help="Export images to histoCAT for MATLAB")
@@ -0,0 +1,148 @@
+import logging
+from functools import partial
+from importlib.util import find_spec
+from os import PathLike
+from pathlib import Path
+from typing import Generator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import tifffile
+import xtiff
+
+from .. import io
+from .._parallel import map_parallel
+
+logger = logging.getLogger(__name__)
+
+
+def _get_num_pyramid_levels(height: int, width: int, tile_size: int) -> int:
+    num_levels = 1
+    while max(height, width) > tile_size:
+        height, width = (height + 1) // 2, (width + 1) // 2
+        num_levels += 1
+    return num_levels
+
+
+def _downsample_region(img: np.ndarray, factor: int) -> np.ndarray:
+    # block averaging, incomplete blocks at the image border are averaged too
+    row_starts = np.arange(0, img.shape[0], factor)
+    col_starts = np.arange(0, img.shape[1], factor)
+    block_sums = np.add.reduceat(
+        np.add.reduceat(img, row_starts, axis=0, dtype=np.float64), col_starts, axis=1
+    )
+    block_sizes = np.outer(
+        np.diff(row_starts, append=img.shape[0]),
+        np.diff(col_starts, append=img.shape[1]),
+    )
+    return (block_sums / block_sizes).astype(img.dtype)
+
+
+def _iter_pyramid_level_tiles(
+    img: np.ndarray, level: int, tile_size: int
+) -> Generator[np.ndarray, None, None]:
+    # tiles of lower-resolution levels are computed on the fly from the
+    # full-resolution image, such that no other pyramid level is held in memory
+    factor = 2**level
+    region_size = tile_size * factor
+    for channel_img in img:
+        for y in range(0, channel_img.shape[0], region_size):
+            for x in range(0, channel_img.shape[1], region_size):
+                region = channel_img[y : y + region_size, x : x + region_size]
+                if factor > 1:
+                    region = _downsample_region(region, factor)
+                yield region
+
+
+def write_ome_tiff(
+    img: np.ndarray,
+    ome_file: Union[str, PathLike],
+    channel_names: Sequence[str],
+    pyramid: bool = True,
+    tile_size: int = 256,
+    compression: str = "zlib",
+) -> None:
+    img = io._to_dtype(img, np.float32)
+    if not pyramid:
+        xtiff.to_tiff(img, ome_file, channel_names=channel_names)
+        return
+    num_levels = _get_num_pyramid_levels(img.shape[1], img.shape[2], tile_size)
+    write_kwargs = {"tile": (tile_size, tile_size), "photometric": "minisblack"}
+    if compression != "none":
+        write_kwargs["compression"] = compression
+        write_kwargs["predictor"] = find_spec("imagecodecs") is not None
+    with tifffile.TiffWriter(ome_file, bigtiff=True, ome=True) as tif:
+        for level in range(num_levels):
+            level_shape = (
+                img.shape[0],
+                -(-img.shape[1] // 2**level),
+                -(-img.shape[2] // 2**level),
+            )
+            if level == 0:
+                level_kwargs = {
+                    "subifds": num_levels - 1,
+                    "metadata": {"axes": "CYX", "Channel": {"Name": channel_names}},
+                }
+            else:
+                level_kwargs = {"subfiletype": 1, "metadata": None}
+            tif.write(
+                _iter_pyramid_level_tiles(img, level, tile_size),
+                shape=level_shape,
+                dtype=img.dtype,
+                **write_kwargs,
+                **level_kwargs,
+            )
+
+
+def _try_export_ome_tiff_from_disk(
+    img_file: Union[str, PathLike],
+    ome_dir: Union[str, PathLike],
+    channel_names: Sequence[str],
+    pyramid: bool = True,
+    tile_size: int = 256,
+    compression: str = "zlib",
+) -> Optional[Path]:
+    try:
+        img = io.read_image(img_file, native_dtype=True)
+        ome_file = io._as_path_with_suffix(
+            Path(ome_dir) / Path(img_file).name, ".ome.tiff"
+        )
+        write_ome_tiff(
+            img,
+            ome_file,
+            channel_names,
+            pyramid=pyramid,
+            tile_size=tile_size,
+            compression=compression,
+        )
+        return ome_file
+    except Exception as e:
+        logger.exception(f"Error exporting {img_file} as OME-TIFF: {e}")
+    return None
+
+
+def try_export_ome_tiffs_from_disk_to_disk(
+    img_files: Sequence[Union[str, PathLike]],
+    ome_dir: Union[str, PathLike],
+    channel_names: Sequence[str],
+    pyramid: bool = True,
+    tile_size: int = 256,
+    compression: str = "zlib",
+    workers: int = 1,
+) -> Generator[Tuple[Path, Path], None, None]:
+    for img_file, ome_file in zip(
+        img_files,
+        map_parallel(
+            partial(
+                _try_export_ome_tiff_from_disk,
+                ome_dir=ome_dir,
+                channel_names=channel_names,
+                pyramid=pyramid,
+                tile_size=tile_size,
+                compression=compression,
+            ),
+            img_files,
+            workers=workers,
+        ),
+    ):
+        if ome_file is not None:
+            yield Path(img_file), ome_file
@@ -1,9 +1,24 @@
+import json
 import logging
+import math
 import os
 import re
+import time
+from functools import partial
+from importlib.util import find_spec
 from os import PathLike
 from pathlib import Path
-from typing import List, Optional, Sequence, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import pandas as pd
@@ -11,6 +26,9 @@ import tifffile
 
 from ._steinbock import SteinbockException
 
+if TYPE_CHECKING:
+    import zarr
+
 logger = logging.getLogger(__name__)
 img_dtype = np.dtype(os.environ.get("STEINBOCK_IMG_DTYPE", "float32"))
 mask_dtype = np.dtype(os.environ.get("STEINBOCK_MASK_DTYPE", "uint16"))
@@ -20,6 +38,160 @@ class SteinbockIOException(SteinbockException):
     pass
 
 
+_data_file_suffixes = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+data_file_format = os.environ.get("STEINBOCK_DATA_FORMAT", "csv").lower()
+if data_file_format not in _data_file_suffixes:
+    raise SteinbockIOException(f"Unsupported data file format: {data_file_format}")
+data_file_suffix = _data_file_suffixes[data_file_format]
+
+_image_file_suffixes = {"tiff": ".tiff", "zarr": ".ome.zarr"}
+image_file_format = os.environ.get("STEINBOCK_IMAGE_FORMAT", "tiff").lower()
+if image_file_format not in _image_file_suffixes:
+    raise SteinbockIOException(f"Unsupported image file format: {image_file_format}")
+image_file_suffix = _image_file_suffixes[image_file_format]
+# compact storage of (floating-point) images as float16 or as uint16 with
+# per-channel scale/offset, images are decoded to img_dtype when read
+_img_storages = ("native", "float16", "uint16")
+img_storage = os.environ.get("STEINBOCK_IMG_STORAGE", "native").lower()
+if img_storage not in _img_storages:
+    raise SteinbockIOException(f"Unsupported image storage: {img_storage}")
+_img_scaling_key = "steinbock_scaling"
+zarr_chunk_size = int(os.environ.get("STEINBOCK_ZARR_CHUNK_SIZE", "512"))
+zarr_available = find_spec("zarr") is not None
+dir_index_manifest = bool(int(os.environ.get("STEINBOCK_DIR_INDEX_MANIFEST", "0")))
+_dir_index_manifest_name = ".steinbock_index.json"
+# directories modified shortly before scanning may be modified again without a
+# change of their mtime (coarse file system timestamps), see "racy git"
+_dir_index_racy_ns = 2_000_000_000
+_dir_indices: Dict[str, Dict[str, Any]] = {}
+
+_tiff_compressions = ("none", "zlib", "lzw", "zstd")
+tiff_compression = os.environ.get("STEINBOCK_TIFF_COMPRESSION", "none").lower()
+tiff_tile_size = int(os.environ.get("STEINBOCK_TIFF_TILE_SIZE", "0"))
+tiff_threads = int(os.environ.get("STEINBOCK_TIFF_THREADS", "0"))
+
+
+def _check_tiff_write_options(compression: str, tile_size: int, threads: int) -> None:
+    if compression not in _tiff_compressions:
+        raise SteinbockIOException(f"Unsupported TIFF compression: {compression}")
+    if compression in ("lzw", "zstd") and find_spec("imagecodecs") is None:
+        raise SteinbockIOException(
+            f"TIFF compression {compression} requires the imagecodecs package"
+        )
+    if tile_size < 0 or tile_size % 16 != 0:
+        raise SteinbockIOException(
+            f"Invalid TIFF tile size: {tile_size} (must be a multiple of 16)"
+        )
+    if threads < 0:
+        raise SteinbockIOException(f"Invalid number of TIFF threads: {threads}")
+
+
+_check_tiff_write_options(tiff_compression, tiff_tile_size, tiff_threads)
+
+
+def _get_tiff_write_kwargs() -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"maxworkers": tiff_threads or None}
+    if tiff_tile_size > 0:
+        kwargs["tile"] = (tiff_tile_size, tiff_tile_size)
+    if tiff_compression != "none":
+        kwargs["compression"] = tiff_compression
+        # the floating point predictor is only implemented in imagecodecs
+        kwargs["predictor"] = find_spec("imagecodecs") is not None
+    return kwargs
+
+
+def _memmap_tiff(tiff_file: Union[str, PathLike], mode: str, **kwargs) -> np.ndarray:
+    try:
+        return tifffile.memmap(tiff_file, mode=mode, **kwargs)
+    except ValueError:
+        if mode != "r":
+            raise
+    # compressed or tiled TIFF files cannot be memory-mapped, read them instead
+    logger.debug("Reading %s into memory (not memory-mappable)", tiff_file)
+    return tifffile.imread(tiff_file, squeeze=False)
+
+
+def _is_zarr(path: Union[str, PathLike]) -> bool:
+    return Path(path).suffix.lower() == ".zarr"
+
+
+def _open_zarr_array(zarr_path: Union[str, PathLike]) -> "zarr.Array":
+    if not zarr_available:
+        raise SteinbockIOException(f"{zarr_path}: reading Zarr requires zarr")
+    import zarr
+
+    group = zarr.open_group(str(zarr_path), mode="r")
+    multiscales = group.attrs.get("multiscales")
+    if multiscales:  # full-resolution dataset of the first OME-NGFF image
+        return group[multiscales[0]["datasets"][0]["path"]]
+    return group["0"]
+
+
+def _create_zarr_array(
+    zarr_path: Union[str, PathLike],
+    shape: Tuple[int, ...],
+    dtype: np.dtype,
+    axes: Sequence[str],
+) -> "zarr.Array":
+    if not zarr_available:
+        raise SteinbockIOException(f"{zarr_path}: writing Zarr requires zarr")
+    import zarr
+
+    # OME-NGFF 0.4 requires Zarr format 2 and "/" as dimension separator
+    kwargs = {}
+    if int(zarr.__version__.split(".")[0]) >= 3:
+        kwargs["zarr_format"] = 2
+    group = zarr.open_group(str(zarr_path), mode="w", **kwargs)
+    chunks = tuple(
+        min(size, zarr_chunk_size) if axis in ("y", "x") else 1
+        for axis, size in zip(axes, shape)
+    )
+    zarr_array = group.zeros(
+        name="0",
+        shape=shape,
+        chunks=chunks,
+        dtype=dtype,
+        dimension_separator="/",
+        **kwargs,
+    )
+    group.attrs["multiscales"] = [
+        {
+            "version": "0.4",
+            "name": _as_path_with_suffix(zarr_path, "").name,
+            "axes": [
+                {"name": axis, "type": "channel" if axis == "c" else "space"}
+                for axis in axes
+            ],
+            "datasets": [
+                {
+                    "path": "0",
+                    "coordinateTransformations": [
+                        {"type": "scale", "scale": [1.0] * len(axes)}
+                    ],
+                }
+            ],
+        }
+    ]
+    return zarr_array
+
+
+def _mmap_zarr(
+    zarr_path: Union[str, PathLike], mode: str, axes: Sequence[str], **kwargs
+) -> Union[np.ndarray, "zarr.Array"]:
+    if mode == "r":
+        # Zarr stores cannot be memory-mapped, read them instead
+        if len(axes) == 3:
+            img = read_image(zarr_path, native_dtype=True)
+            if img.dtype == np.float16:  # compact image storage, see img_storage
+                img = _to_dtype(img, img_dtype)
+            return img
+        return read_mask(zarr_path, native_dtype=True)
+    if "shape" not in kwargs or "dtype" not in kwargs:
+        raise SteinbockIOException(f"{zarr_path}: shape and dtype required")
+    # chunks are written to disk upon assignment
+    return _create_zarr_array(zarr_path, kwargs["shape"], kwargs["dtype"], axes)
+
+
 def _as_path_with_suffix(path: Union[str, PathLike], suffix: str) -> Path:
     path = Path(path)
     if re.fullmatch(r".+\.ome\.[^.]+", path.name, flags=re.IGNORECASE):
@@ -31,13 +203,88 @@ def _as_path_with_suffix(path: Union[str, PathLike], suffix: str) -> Path:
     return path.with_suffix(suffix)
 
 
-def _to_dtype(src: np.ndarray, dst_dtype: np.dtype) -> np.ndarray:
+def _check_img_storage(storage: str) -> None:
+    if storage not in _img_storages:
+        raise SteinbockIOException(f"Unsupported image storage: {storage}")
+    if storage != "native" and not np.issubdtype(img_dtype, np.floating):
+        raise SteinbockIOException(
+            f"Image storage {storage} requires a floating-point image data type"
+        )
+
+
+def _encode_image(img: np.ndarray) -> Tuple[np.ndarray, Optional[Dict[str, Any]]]:
+    _check_img_storage(img_storage)
+    if img_storage == "float16":
+        return _to_dtype(img, np.dtype(np.float16)), None
+    if img_storage == "uint16":
+        # map the finite value range of each channel to the uint16 range,
+        # reserving the largest uint16 value for NaN
+        nan_value = int(np.iinfo(np.uint16).max)
+        scaling: Dict[str, Any] = {"scale": [], "offset": [], "nan": nan_value}
+        encoded_img = np.empty(img.shape, dtype=np.uint16)
+        for channel_img, encoded_channel_img in zip(img, encoded_img):
+            if np.isinf(channel_img).any():
+                raise SteinbockIOException(
+                    f"Image storage {img_storage} does not support infinite values"
+                )
+            is_nan = np.isnan(channel_img)
+            offset, value_range = 0.0, 0.0
+            if not is_nan.all():
+                offset = float(np.nanmin(channel_img))
+                value_range = float(np.nanmax(channel_img)) - offset
+            scale = value_range / (nan_value - 1) or 1.0
+            scaled_channel_img = (channel_img - offset) / scale
+            scaled_channel_img[is_nan] = 0
+            encoded_channel_img[:, :] = _to_dtype(
+                scaled_channel_img, np.dtype(np.uint16)
+            )
+            encoded_channel_img[is_nan] = nan_value
+            scaling["scale"].append(scale)
+            scaling["offset"].append(offset)
+        return encoded_img, scaling
+    return img, None
+
+
+def _decode_image(
+    img: np.ndarray, scaling: Dict[str, Any], channels: Optional[Sequence[int]]
+) -> np.ndarray:
+    scale = np.asarray(scaling["scale"], dtype=np.float64)
+    offset = np.asarray(scaling["offset"], dtype=np.float64)
+    if channels is not None:
+        scale, offset = scale[list(channels)], offset[list(channels)]
+    nan_value = scaling.get("nan")
+    decoded_img = np.empty(img.shape, dtype=img_dtype)
+    for i in range(img.shape[0]):  # channel by channel, for memory reasons
+        decoded_img[i] = img[i] * scale[i] + offset[i]
+        if nan_value is not None:
+            decoded_img[i][img[i] == nan_value] = np.nan
+    return decoded_img
+
+
+def _get_tiff_image_scaling(tif: tifffile.TiffFile) -> Optional[Dict[str, Any]]:
+    if tif.is_imagej:
+        properties = (tif.imagej_metadata or {}).get("Properties", {})
+        if _img_scaling_key in properties:
+            return json.loads(properties[_img_scaling_key])
+    return None
+
+
+def _read_image_scaling(img_file: Union[str, PathLike]) -> Optional[Dict[str, Any]]:
+    if _is_zarr(img_file):
+        import zarr
+
+        return zarr.open_group(str(img_file), mode="r").attrs.get(_img_scaling_key)
+    with tifffile.TiffFile(img_file) as tif:
+        return _get_tiff_image_scaling(tif)
+
+
+def _to_dtype(
+    src: np.ndarray, dst_dtype: np.dtype, block_size: int = 2**22
+) -> np.ndarray:
     if src.dtype == dst_dtype:
         return src
     src_is_int = np.issubdtype(src.dtype, np.integer)
     dst_is_int = np.issubdtype(dst_dtype, np.integer)
-    if not src_is_int and dst_is_int:
-        src = np.around(src)
     if src_is_int:
         src_info = np.iinfo(src.dtype)
     else:
@@ -46,39 +293,236 @@ def _to_dtype(src: np.ndarray, dst_dtype: np.dtype) -> np.ndarray:
         dst_info = np.iinfo(dst_dtype)
     else:
         dst_info = np.finfo(dst_dtype)
-    if src_info.min < dst_info.min or src_info.max > dst_info.max:
-        src = np.clip(src, dst_info.min, dst_info.max)
-    return src.astype(dst_dtype)
+    round_src = not src_is_int and dst_is_int
+    clip_src = src_info.min < dst_info.min or src_info.max > dst_info.max
+    if not (round_src or clip_src):
+        return src.astype(dst_dtype)
+    if src.ndim == 0:
+        return _to_dtype(src[np.newaxis], dst_dtype)[0]
+    # convert block by block into a preallocated output array, such that
+    # rounding/clipping only require temporary arrays of the block size
+    dst = np.empty(src.shape, dtype=dst_dtype)
+    src_view, dst_view = src, dst
+    if src.flags.c_contiguous:  # iterate over flat views, not over the first axis
+        src_view, dst_view = src.reshape(-1), dst.reshape(-1)
+    block_length = max(1, block_size // max(1, math.prod(src_view.shape[1:])))
+    for start in range(0, src_view.shape[0], block_length):
+        block = src_view[start : start + block_length]
+        if round_src:
+            block = np.around(block)
+            if clip_src:  # the rounded block is a copy and can be clipped in-place
+                np.clip(block, dst_info.min, dst_info.max, out=block)
+        elif clip_src:
+            block = np.clip(block, dst_info.min, dst_info.max)
+        dst_view[start : start + block_length] = block
+        del block
+    return dst
+
+
+def _scan_dir(root_dir: Path) -> Dict[str, Any]:
+    scan_time = time.time_ns()
+    dir_mtimes = {}
+    entries = []
+    rel_dirs = [""]
+    while len(rel_dirs) > 0:
+        rel_dir = rel_dirs.pop()
+        dir_path = root_dir / rel_dir
+        dir_mtimes[rel_dir] = dir_path.stat().st_mtime_ns
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if not entry.name.startswith("."):
+                    entries.append(rel_path)
+                # do not descend into Zarr stores (chunks are not listed)
+                if entry.is_dir(follow_symlinks=False) and not _is_zarr(entry.name):
+                    rel_dirs.append(rel_path)
+    return {"scan_time": scan_time, "dir_mtimes": dir_mtimes, "entries": entries}
+
+
+def _is_dir_index_valid(root_dir: Path, dir_index: Dict[str, Any]) -> bool:
+    max_mtime = dir_index["scan_time"] - _dir_index_racy_ns
+    for rel_dir, mtime in dir_index["dir_mtimes"].items():
+        if mtime >= max_mtime:
+            return False
+        try:
+            if (root_dir / rel_dir).stat().st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def _read_dir_index_manifest(root_dir: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with (root_dir / _dir_index_manifest_name).open(mode="r") as f:
+            dir_index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if _is_dir_index_valid(root_dir, dir_index):
+        return dir_index
+    return None
+
+
+def _write_dir_index_manifest(root_dir: Path, dir_index: Dict[str, Any]) -> None:
+    # overwriting an existing file does not change the directory mtime
+    try:
+        with (root_dir / _dir_index_manifest_name).open(mode="w") as f:
+            json.dump(dir_index, f)
+    except OSError as e:
+        logger.debug("Cannot write directory index manifest to %s: %s", root_dir, e)
+
+
+def _get_dir_index(root_dir: Union[str, PathLike]) -> Dict[str, Any]:
+    root_dir = Path(root_dir)
+    if not root_dir.is_dir():
+        return {"entries": []}
+    key = os.path.abspath(root_dir)
+    dir_index = _dir_indices.get(key)
+    if dir_index is not None and _is_dir_index_valid(root_dir, dir_index):
+        return dir_index
+    dir_index = None
+    if dir_index_manifest:
+        manifest_file = root_dir / _dir_index_manifest_name
+        if manifest_file.is_file():
+            dir_index = _read_dir_index_manifest(root_dir)
+        else:  # create before scanning, as this changes the directory mtime
+            manifest_file.touch()
+    if dir_index is None:
+        dir_index = _scan_dir(root_dir)
+        if dir_index_manifest:
+            _write_dir_index_manifest(root_dir, dir_index)
+    dir_index["entry_set"] = set(dir_index["entries"])
+    _dir_indices[key] = dir_index
+    return dir_index
+
+
+_ome_file_name_pattern = re.compile(r"(.+)\.ome\.[^.]+", flags=re.IGNORECASE)
+
+
+def _get_file_stem(file_name: str) -> str:
+    # string equivalent of _as_path_with_suffix(file_name, ""), for speed
+    m = _ome_file_name_pattern.fullmatch(file_name)
+    if m is not None:
+        return m.group(1)
+    stem, dot, _ = file_name.rpartition(".")
+    return stem if dot and stem else file_name
+
+
+def _list_dir_files(
+    dir_path: Union[str, PathLike], suffixes: Sequence[str]
+) -> List[Path]:
+    # recursively lists files with the given suffixes using the directory index;
+    # files with the same stem are listed once, preferring the first suffix
+    rel_paths = {}
+    entries = _get_dir_index(dir_path)["entries"]
+    for suffix in reversed(suffixes):
+        for rel_path in entries:
+            if rel_path.endswith(suffix):
+                rel_paths[_get_file_stem(rel_path)] = rel_path
+    dir_path = Path(dir_path)
+    return [
+        dir_path / rel_path
+        for rel_path in sorted(rel_paths.values(), key=lambda p: p.split("/"))
+    ]
 
 
 def _list_related_files(
     base_files: Sequence[Union[str, PathLike]],
     related_dir: Union[str, PathLike],
-    related_suffix: str,
+    related_suffix: Union[str, Sequence[str]],
 ) -> List[Path]:
+    if isinstance(related_suffix, str):
+        related_suffix = [related_suffix]
+    related_dir = Path(related_dir)
+    related_entries = _get_dir_index(related_dir).get("entry_set", set())
     related_files = []
     for base_file in base_files:
-        related_file = _as_path_with_suffix(
-            Path(related_dir) / Path(base_file).name, related_suffix
+        stem = _get_file_stem(os.path.basename(base_file))
+        related_file_name = next(
+            (
+                stem + suffix
+                for suffix in related_suffix
+                if stem + suffix in related_entries
+            ),
+            None,
         )
-        if not related_file.is_file():
-            raise SteinbockIOException(f"File not found: {related_file}")
-        related_files.append(related_file)
+        if related_file_name is None:
+            raise SteinbockIOException(
+                f"File not found: {related_dir / (stem + related_suffix[0])}"
+            )
+        related_files.append(related_dir / related_file_name)
     return related_files
 
 
+def _get_data_file_suffixes() -> List[str]:
+    # the configured data file format takes precedence over the other formats
+    return [data_file_suffix] + [
+        suffix for suffix in _data_file_suffixes.values() if suffix != data_file_suffix
+    ]
+
+
+def _get_image_file_suffixes() -> List[str]:
+    # the configured image file format takes precedence over the other formats
+    return [image_file_suffix] + [
+        suffix
+        for suffix in _image_file_suffixes.values()
+        if suffix != image_file_suffix
+    ]
+
+
+def _list_image_files(img_dir: Union[str, PathLike]) -> List[Path]:
+    return _list_dir_files(img_dir, _get_image_file_suffixes())
+
+
+def _list_data_files(data_dir: Union[str, PathLike]) -> List[Path]:
+    return _list_dir_files(data_dir, _get_data_file_suffixes())
+
+
+def _get_data_file_format(data_file: Union[str, PathLike]) -> str:
+    for file_format, suffix in _data_file_suffixes.items():
+        if Path(data_file).suffix.lower() == suffix:
+            return file_format
+    return "csv"
+
+
+def _sniff_csv_separator(csv_file: Union[str, PathLike]) -> Optional[str]:
+    with open(csv_file, mode="r", encoding="utf-8", errors="replace") as f:
+        header = f.readline()
+    if "," in header and ";" in header:
+        return None  # ambiguous, use the regular expression separator
+    if ";" in header:
+        return ";"
+    return ","
+
+
+def _read_csv(csv_file: Union[str, PathLike], **kwargs) -> pd.DataFrame:
+    # use the fast C parser with the separator sniffed from the header line,
+    # falling back to the slow Python parser for ambiguous/malformed files
+    sep = _sniff_csv_separator(csv_file)
+    if sep is not None:
+        try:
+            return pd.read_csv(csv_file, sep=sep, engine="c", **kwargs)
+        except pd.errors.ParserError as e:
+            logger.debug(
+                "Parsing %s with sniffed separator %r failed, falling back to "
+                "the Python parser: %s",
+                csv_file,
+                sep,
+                e,
+            )
+    return pd.read_csv(csv_file, sep=",|;", engine="python", **kwargs)
+
+
 def read_panel(
     panel_file: Union[str, PathLike], unfiltered: bool = False
 ) -> pd.DataFrame:
-    panel = pd.read_csv(
+    panel = _read_csv(
         panel_file,
-        sep=",|;",
         dtype={
             "channel": pd.StringDtype(),
             "name": pd.StringDtype(),
             "keep": pd.BooleanDtype(),
         },
-        engine="python",
         true_values=["1"],
         false_values=["0"],
     )
@@ -116,8 +560,8 @@ def list_image_files(
     base_files: Optional[Sequence[Union[str, PathLike]]] = None,
 ) -> List[Path]:
     if base_files is not None:
-        return _list_related_files(base_files, img_dir, ".tiff")
-    return sorted(Path(img_dir).rglob("[!.]*.tiff"))
+        return _list_related_files(base_files, img_dir, _get_image_file_suffixes())
+    return _list_image_files(img_dir)
 
 
 def _fix_image_shape(img_file: Union[str, PathLike], img: np.ndarray) -> np.ndarray:
@@ -153,23 +597,304 @@ def _fix_image_shape(img_file: Union[str, PathLike], img: np.ndarray) -> np.ndar
     return img
 
 
+def _read_tiff_page_region(
+    page: Union[tifffile.TiffPage, tifffile.TiffFrame],
+    region: Tuple[int, int, int, int],
+) -> np.ndarray:
+    y0, y1, x0, x1 = region
+    keyframe = page.keyframe
+    chunk_height, chunk_width = keyframe.chunks[-2:]
+    num_chunks_x = keyframe.chunked[-1]
+    img = np.zeros((y1 - y0, x1 - x0), dtype=keyframe.dtype)
+    fh = page.parent.filehandle
+    for chunk_y in range(y0 // chunk_height, (y1 - 1) // chunk_height + 1):
+        for chunk_x in range(x0 // chunk_width, (x1 - 1) // chunk_width + 1):
+            index = chunk_y * num_chunks_x + chunk_x
+            fh.seek(page.dataoffsets[index])
+            data = fh.read(page.databytecounts[index])
+            chunk, _, _ = keyframe.decode(data, index)
+            if chunk is None:  # empty tile/strip
+                continue
+            chunk = chunk[0, :, :, 0]
+            chunk_y0, chunk_x0 = chunk_y * chunk_height, chunk_x * chunk_width
+            sub_y0 = max(y0, chunk_y0)
+            sub_y1 = min(y1, chunk_y0 + chunk.shape[0])
+            sub_x0 = max(x0, chunk_x0)
+            sub_x1 = min(x1, chunk_x0 + chunk.shape[1])
+            img[sub_y0 - y0 : sub_y1 - y0, sub_x0 - x0 : sub_x1 - x0] = chunk[
+                sub_y0 - chunk_y0 : sub_y1 - chunk_y0,
+                sub_x0 - chunk_x0 : sub_x1 - chunk_x0,
+            ]
+    return img
+
+
+def _check_image_subset(
+    img_file: Union[str, PathLike],
+    img_shape: Tuple[int, int, int],
+    channels: Optional[Sequence[int]],
+    region: Optional[Tuple[int, int, int, int]],
+) -> Tuple[List[int], Tuple[int, int, int, int]]:
+    num_channels, height, width = img_shape
+    if channels is None:
+        channels = list(range(num_channels))
+    channels = [int(channel) for channel in channels]
+    for channel in channels:
+        if not 0 <= channel < num_channels:
+            raise SteinbockIOException(
+                f"{img_file}: channel {channel} out of range "
+                f"(image has {num_channels} channels)"
+            )
+    if region is None:
+        region = (0, height, 0, width)
+    y0, y1, x0, x1 = region
+    if not (0 <= y0 < y1 <= height and 0 <= x0 < x1 <= width):
+        raise SteinbockIOException(
+            f"{img_file}: region {region} out of bounds "
+            f"(image has shape {img_shape})"
+        )
+    return channels, region
+
+
+def _read_zarr_image(
+    img_file: Union[str, PathLike],
+    channels: Optional[Sequence[int]],
+    region: Optional[Tuple[int, int, int, int]],
+) -> np.ndarray:
+    img = _open_zarr_array(img_file)
+    if img.ndim != 3:  # e.g. TCZYX images written by other software
+        img = _fix_image_shape(img_file, img[...])
+    channels, region = _check_image_subset(img_file, img.shape, channels, region)
+    y0, y1, x0, x1 = region
+    if isinstance(img, np.ndarray):
+        return img[channels, y0:y1, x0:x1]
+    # only the chunks overlapping the selection are read and decoded
+    return img.oindex[channels, y0:y1, x0:x1]
+
+
+def _read_image_subset(
+    img_file: Union[str, PathLike],
+    tif: tifffile.TiffFile,
+    channels: Optional[Sequence[int]],
+    region: Optional[Tuple[int, int, int, int]],
+) -> np.ndarray:
+    series = tif.series[0]
+    # determine the image shape without reading the image data
+    img_shape = _fix_image_shape(
+        img_file, np.broadcast_to(np.uint8(0), series.get_shape(False))
+    ).shape
+    channels, region = _check_image_subset(img_file, img_shape, channels, region)
+    y0, y1, x0, x1 = region
+    if series.dataoffset is not None:
+        # contiguous uncompressed image data, copy the subset from a memory map
+        img = np.memmap(
+            img_file,
+            dtype=series.dtype.newbyteorder(tif.byteorder),
+            mode="r",
+            offset=series.dataoffset,
+            shape=series.get_shape(False),
+        )
+    else:
+        pages = series.pages
+        if len(pages) == img_shape[0] and pages[0].shape == img_shape[1:]:
+            # one page per channel (e.g. ImageJ hyperstack), decode only the
+            # tiles/strips of the requested channels overlapping the region
+            return np.stack(
+                [_read_tiff_page_region(pages[c], region) for c in channels]
+            )
+        logger.debug("Reading %s entirely (unsupported TIFF layout)", img_file)
+        img = tif.asarray(squeeze=False)
+    img = _fix_image_shape(img_file, img)
+    return np.array(img[channels, y0:y1, x0:x1])
+
+
+def _select_grouped_channels(
+    channel_groups: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    # ungrouped channels are ignored during aggregation and need not be read
+    channels = np.flatnonzero(pd.notna(channel_groups))
+    return channels, channel_groups[channels]
+
+
 def read_image(
     img_file: Union[str, PathLike],
     native_dtype: bool = False,
+    channels: Optional[Sequence[int]] = None,
+    region: Optional[Tuple[int, int, int, int]] = None,
 ) -> np.ndarray:
-    img = tifffile.imread(img_file, squeeze=False)
-    img = _fix_image_shape(img_file, img)
+    if _is_zarr(img_file):
+        img = _read_zarr_image(img_file, channels, region)
+        scaling = _read_image_scaling(img_file) if img.dtype == np.uint16 else None
+    else:
+        # read image data and scaling metadata from the same file handle
+        with tifffile.TiffFile(img_file) as tif:
+            if channels is not None or region is not None:
+                img = _read_image_subset(img_file, tif, channels, region)
+            else:
+                img = tif.asarray(squeeze=False)
+                img = _fix_image_shape(img_file, img)
+            scaling = None
+            if img.dtype == np.uint16:
+                scaling = _get_tiff_image_scaling(tif)
+    if scaling is not None:
+        img = _decode_image(img, scaling, channels)
     if not native_dtype:
         img = _to_dtype(img, img_dtype)
     return img
 
 
+class LazyImage:
+    def __init__(
+        self,
+        img_file: Union[str, PathLike],
+        shape: Tuple[int, int, int],
+        file_dtype: np.dtype,
+        read_func: Callable[..., np.ndarray],
+        metadata: Optional[Dict[str, Any]] = None,
+        native_dtype: bool = False,
+    ) -> None:
+        self.img_file = Path(img_file)
+        self.shape = tuple(int(n) for n in shape)
+        self.file_dtype = np.dtype(file_dtype)
+        self.metadata = metadata or {}
+        self.native_dtype = native_dtype
+        self._read_func = read_func
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.file_dtype if self.native_dtype else img_dtype
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __repr__(self) -> str:
+        return f"LazyImage({self.img_file}, shape={self.shape}, dtype={self.dtype})"
+
+    def read(
+        self,
+        channels: Optional[Sequence[int]] = None,
+        region: Optional[Tuple[int, int, int, int]] = None,
+    ) -> np.ndarray:
+        img = self._read_func(channels=channels, region=region)
+        if not self.native_dtype:
+            img = _to_dtype(img, img_dtype)
+        return img
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        img = self.read()
+        if dtype is not None:
+            img = img.astype(dtype, copy=False)
+        return img
+
+    def __getitem__(self, key) -> np.ndarray:
+        if not isinstance(key, tuple):
+            key = (key,)
+        ellipsis_indices = [i for i, k in enumerate(key) if k is Ellipsis]
+        if len(ellipsis_indices) == 1:
+            i = ellipsis_indices[0]
+            fill = (slice(None),) * (self.ndim - len(key) + 1)
+            key = key[:i] + fill + key[i + 1 :]
+        if len(key) > self.ndim or any(k is None or k is Ellipsis for k in key):
+            return np.asarray(self)[key]  # unsupported, e.g. np.newaxis
+        key += (slice(None),) * (self.ndim - len(key))
+        array_keys = [k for k in key if not isinstance(k, (int, np.integer, slice))]
+        if len(array_keys) > 1:
+            return np.asarray(self)[key]  # index arrays are broadcast together
+        # determine the shape of the selection without reading the image data
+        selection = np.broadcast_to(np.uint8(0), self.shape)[key]
+        if selection.size == 0:
+            return np.empty(selection.shape, dtype=self.dtype)
+        # read the bounding box of the selection and index into it
+        channel_key, *spatial_key = key
+        if isinstance(channel_key, (int, np.integer)):
+            channels = [range(self.shape[0])[channel_key]]
+            local_key = [0]
+        else:
+            channels = np.arange(self.shape[0])[channel_key].tolist()
+            local_key = [slice(None)]
+        region = []
+        for k, n in zip(spatial_key, self.shape[1:]):
+            if isinstance(k, (int, np.integer)):
+                start = range(n)[k]
+                region += [start, start + 1]
+                local_key.append(0)
+            elif isinstance(k, slice):
+                indices = range(n)[k]
+                region += [min(indices), max(indices) + 1]
+                local_key.append(slice(None, None, indices.step))
+            else:
+                region += [0, n]
+                local_key.append(k)
+        img = self.read(channels=channels, region=tuple(region))
+        return img[tuple(local_key)]
+
+
+def _open_tiff_image(
+    img_file: Union[str, PathLike]
+) -> Tuple[Tuple[int, int, int], np.dtype, Dict[str, Any]]:
+    with tifffile.TiffFile(img_file) as tif:
+        series = tif.series[0]
+        img_shape = _fix_image_shape(
+            img_file, np.broadcast_to(np.uint8(0), series.get_shape(False))
+        ).shape
+        metadata: Dict[str, Any] = {"axes": series.get_axes(False)}
+        if tif.is_imagej:
+            metadata["imagej"] = tif.imagej_metadata
+        if tif.is_ome:
+            metadata["ome"] = tif.ome_metadata
+        file_dtype = series.dtype
+        if _get_tiff_image_scaling(tif) is not None:
+            file_dtype = img_dtype  # decoded when read
+        return img_shape, file_dtype, metadata
+
+
+def _open_zarr_image(
+    img_file: Union[str, PathLike]
+) -> Tuple[Tuple[int, int, int], np.dtype, Dict[str, Any]]:
+    import zarr
+
+    img = _open_zarr_array(img_file)
+    img_shape = _fix_image_shape(img_file, np.broadcast_to(np.uint8(0), img.shape))
+    metadata = dict(zarr.open_group(str(img_file), mode="r").attrs)
+    file_dtype = img.dtype
+    if _img_scaling_key in metadata:
+        file_dtype = img_dtype  # decoded when read
+    return img_shape.shape, file_dtype, metadata
+
+
+def open_image(img_file: Union[str, PathLike], native_dtype: bool = False) -> LazyImage:
+    # only the image header is read, image data is decoded upon access
+    if _is_zarr(img_file):
+        img_shape, file_dtype, metadata = _open_zarr_image(img_file)
+    else:
+        img_shape, file_dtype, metadata = _open_tiff_image(img_file)
+    return LazyImage(
+        img_file,
+        img_shape,
+        file_dtype,
+        partial(read_image, img_file, native_dtype=True),
+        metadata=metadata,
+        native_dtype=native_dtype,
+    )
+
+
 def mmap_image(img_file: Union[str, PathLike], mode="r", **kwargs) -> np.ndarray:
+    if _is_zarr(img_file):
+        return _mmap_zarr(img_file, mode, ("c", "y", "x"), **kwargs)
     if "imagej" not in kwargs and mode == "r+":
         kwargs["imagej"] = True
     img_exists = Path(img_file).is_file()
-    img = tifffile.memmap(img_file, mode=mode, **kwargs)
+    img = _memmap_tiff(img_file, mode, **kwargs)
     if img_exists:
+        if mode == "r" and img.dtype != img_dtype:
+            if img.dtype == np.float16 or (
+                img.dtype == np.uint16 and _read_image_scaling(img_file) is not None
+            ):
+                # compact image storage (see img_storage), decode into memory
+                return read_image(img_file)
         if img.dtype != img_dtype:
             logger.warning(
                 "Data type of memory-mapped image file %s (%s) is not %s",
@@ -186,26 +911,37 @@ def write_image(
     img_file: Union[str, PathLike],
     ignore_dtype: bool = False,
 ) -> None:
+    scaling = None
     if not ignore_dtype:
         img = _to_dtype(img, img_dtype)
+        img, scaling = _encode_image(img)
+    if _is_zarr(img_file):
+        _create_zarr_array(img_file, img.shape, img.dtype, ("c", "y", "x"))[...] = img
+        if scaling is not None:
+            import zarr
+
+            zarr.open_group(str(img_file), mode="r+").attrs[_img_scaling_key] = scaling
+        return
+    kwargs = _get_tiff_write_kwargs()
+    if scaling is not None:
+        kwargs["metadata"] = {"Properties": {_img_scaling_key: json.dumps(scaling)}}
     tifffile.imwrite(
         img_file,
         data=img[np.newaxis, np.newaxis, :, :, :, np.newaxis],
         imagej=img.dtype in (np.uint8, np.uint16, np.float32),
+        **kwargs,
     )
 
 
 def read_image_info(image_info_file: Union[str, PathLike]) -> pd.DataFrame:
-    image_info = pd.read_csv(
+    image_info = _read_csv(
         image_info_file,
-        sep=",|;",
         dtype={
             "image": pd.StringDtype(),
             "width_px": pd.UInt16Dtype(),
             "height_px": pd.UInt16Dtype(),
             "num_channels": pd.UInt8Dtype(),
         },
-        engine="python",
     )
     for required_col in ("image", "width_px", "height_px", "num_channels"):
         if required_col not in image_info:
@@ -237,8 +973,8 @@ def list_mask_files(
     base_files: Optional[Sequence[Union[str, PathLike]]] = None,
 ) -> List[Path]:
     if base_files is not None:
-        return _list_related_files(base_files, mask_dir, ".tiff")
-    return sorted(Path(mask_dir).rglob("[!.]*.tiff"))
+        return _list_related_files(base_files, mask_dir, _get_image_file_suffixes())
+    return _list_image_files(mask_dir)
 
 
 def _fix_mask_shape(mask_file: Union[str, PathLike], mask: np.ndarray) -> np.ndarray:
@@ -283,24 +1019,45 @@ def _fix_mask_shape(mask_file: Union[str, PathLike], mask: np.ndarray) -> np.nda
     return mask
 
 
+def _get_min_mask_dtype(max_label: Union[int, float]) -> np.dtype:
+    # smallest unsigned integer data type fitting the largest object ID
+    return np.min_scalar_type(max(0, math.ceil(max_label)))
+
+
+def _get_mask_dtype(native_dtype: np.dtype) -> np.dtype:
+    # masks are read as mask_dtype, unless their object IDs do not fit
+    native_dtype = np.dtype(native_dtype)
+    if (
+        np.issubdtype(native_dtype, np.unsignedinteger)
+        and native_dtype.itemsize > mask_dtype.itemsize
+    ):
+        return native_dtype
+    return mask_dtype
+
+
 def read_mask(
     mask_file: Union[str, PathLike],
     native_dtype: bool = False,
 ) -> np.ndarray:
-    mask = tifffile.imread(mask_file, squeeze=False)
+    if _is_zarr(mask_file):
+        mask = _open_zarr_array(mask_file)[...]
+    else:
+        mask = tifffile.imread(mask_file, squeeze=False)
     mask = _fix_mask_shape(mask_file, mask)
     if not native_dtype:
-        mask = _to_dtype(mask, mask_dtype)
+        mask = _to_dtype(mask, _get_mask_dtype(mask.dtype))
     return mask
 
 
 def mmap_mask(mask_file: Union[str, PathLike], mode="r", **kwargs) -> np.ndarray:
+    if _is_zarr(mask_file):
+        return _mmap_zarr(mask_file, mode, ("y", "x"), **kwargs)
     if "imagej" not in kwargs and mode == "r+":
         kwargs["imagej"] = True
     mask_exists = Path(mask_file).is_file()
-    mask = tifffile.memmap(mask_file, mode=mode, **kwargs)
+    mask = _memmap_tiff(mask_file, mode, **kwargs)
     if mask_exists:
-        if mask.dtype != mask_dtype:
+        if not np.issubdtype(mask.dtype, np.unsignedinteger):
             logger.warning(
                 "Data type of memory-mapped mask file %s (%s) is not %s",
                 mask_file,
@@ -317,11 +1074,16 @@ def write_mask(
     ignore_dtype: bool = False,
 ) -> None:
     if not ignore_dtype:
-        mask = _to_dtype(mask, mask_dtype)
+        max_label = np.amax(mask) if mask.size > 0 else 0
+        mask = _to_dtype(mask, _get_min_mask_dtype(max_label))
+    if _is_zarr(mask_file):
+        _create_zarr_array(mask_file, mask.shape, mask.dtype, ("y", "x"))[...] = mask
+        return
     tifffile.imwrite(
         mask_file,
         data=mask[np.newaxis, np.newaxis, np.newaxis, :, :, np.newaxis],
         imagej=mask.dtype in (np.uint8, np.uint16, np.float32),
+        **_get_tiff_write_kwargs(),
     )
 
 
@@ -330,17 +1092,28 @@ def list_data_files(
     base_files: Optional[Sequence[Union[str, PathLike]]] = None,
 ) -> List[Path]:
     if base_files is not None:
-        return _list_related_files(base_files, data_dir, ".csv")
-    return sorted(Path(data_dir).rglob("[!.]*.csv"))
+        return _list_related_files(base_files, data_dir, _get_data_file_suffixes())
+    return _list_data_files(data_dir)
 
 
 def read_data(data_file: Union[str, PathLike]) -> pd.DataFrame:
-    return pd.read_csv(data_file, sep=",|;", index_col="Object", engine="python")
+    file_format = _get_data_file_format(data_file)
+    if file_format == "parquet":
+        return pd.read_parquet(data_file).set_index("Object")
+    if file_format == "feather":
+        return pd.read_feather(data_file).set_index("Object")
+    return _read_csv(data_file, index_col="Object")
 
 
 def write_data(data: pd.DataFrame, data_file: Union[str, PathLike]) -> None:
     data = data.reset_index()
-    data.to_csv(data_file, index=False)
+    file_format = _get_data_file_format(data_file)
+    if file_format == "parquet":
+        data.to_parquet(data_file, index=False)
+    elif file_format == "feather":
+        data.to_feather(data_file)
+    else:
+        data.to_csv(data_file, index=False)
 
 
 def list_neighbors_files(
@@ -348,32 +1121,46 @@ def list_neighbors_files(
     base_files: Optional[Sequence[Union[str, PathLike]]] = None,
 ) -> List[Path]:
     if base_files is not None:
-        return _list_related_files(base_files, neighbors_dir, ".csv")
-    return sorted(Path(neighbors_dir).rglob("[!.]*.csv"))
+        return _list_related_files(base_files, neighbors_dir, _get_data_file_suffixes())
+    return _list_data_files(neighbors_dir)
+
+
+def _get_neighbors_dtypes(neighbors: pd.DataFrame) -> Dict[str, np.dtype]:
+    max_label = 0
+    if len(neighbors.index) > 0:
+        max_label = max(neighbors["Object"].max(), neighbors["Neighbor"].max())
+    label_dtype = _get_mask_dtype(_get_min_mask_dtype(max_label))
+    return {
+        "Object": label_dtype,
+        "Neighbor": label_dtype,
+        "Distance": np.dtype(np.float32),
+    }
 
 
 def read_neighbors(neighbors_file: Union[str, PathLike]) -> pd.DataFrame:
-    return pd.read_csv(
-        neighbors_file,
-        sep=",|;",
-        usecols=["Object", "Neighbor", "Distance"],
-        dtype={
-            "Object": mask_dtype,
-            "Neighbor": mask_dtype,
-            "Distance": np.float32,
-        },
-        engine="python",
-    )
+    file_format = _get_data_file_format(neighbors_file)
+    neighbors_columns = ["Object", "Neighbor", "Distance"]
+    if file_format == "parquet":
+        neighbors = pd.read_parquet(neighbors_file, columns=neighbors_columns)
+    elif file_format == "feather":
+        neighbors = pd.read_feather(neighbors_file, columns=neighbors_columns)
+    else:
+        neighbors = _read_csv(
+            neighbors_file, usecols=neighbors_columns, dtype={"Distance": np.float32}
+        )
+    # object IDs are read as mask_dtype, unless they do not fit
+    return neighbors.astype(_get_neighbors_dtypes(neighbors))
 
 
 def write_neighbors(
     neighbors: pd.DataFrame, neighbors_file: Union[str, PathLike]
 ) -> None:
-    neighbors = neighbors.loc[:, ["Object", "Neighbor", "Distance"]].astype(
-        {
-            "Object": mask_dtype,
-            "Neighbor": mask_dtype,
-            "Distance": np.float32,
-        }
-    )
-    neighbors.to_csv(neighbors_file, index=False)
+    neighbors = neighbors.loc[:, ["Object", "Neighbor", "Distance"]]
+    neighbors = neighbors.astype(_get_neighbors_dtypes(neighbors))
+    file_format = _get_data_file_format(neighbors_file)
+    if file_format == "parquet":
+        neighbors.to_parquet(neighbors_file, index=False)
+    elif file_format == "feather":
+        neighbors.reset_index(drop=True).to_feather(neighbors_file)
+    else:
+        neighbors.to_csv(neighbors_file, index=False)
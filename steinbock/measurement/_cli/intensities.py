@@ -1,3 +1,4 @@
+import re
 from pathlib import Path
 
 import click
@@ -7,7 +8,11 @@ from ... import io
 from ..._cli.utils import catch_exception, logger
 from ..._steinbock import SteinbockException
 from ..._steinbock import logger as steinbock_logger
-from ..intensities import IntensityAggregation, try_measure_intensities_from_disk
+from ..intensities import (
+    IntensityAggregation,
+    IntensityPercentile,
+    try_measure_aggregated_intensities_from_disk_to_disk,
+)
 
 _intensity_aggregations = {
     "sum": IntensityAggregation.SUM,
@@ -20,6 +25,35 @@ _intensity_aggregations = {
 }
 
 
+def _get_intensity_aggregation(intensity_aggregation_name):
+    if intensity_aggregation_name in _intensity_aggregations:
+        return _intensity_aggregations[intensity_aggregation_name]
+    m = re.fullmatch(r"p(\d+(?:\.\d+)?)", intensity_aggregation_name)
+    if m is not None and float(m.group(1)) <= 100:
+        return IntensityPercentile(float(m.group(1)))
+    return None
+
+
+def _get_intensity_aggregation_name(intensity_aggregation):
+    if isinstance(intensity_aggregation, IntensityPercentile):
+        percentile = intensity_aggregation.percentile
+        if percentile.is_integer():
+            return f"p{int(percentile)}"
+        return f"p{percentile}"
+    return intensity_aggregation.name.lower()
+
+
+def _check_intensity_aggregation_names(ctx, param, intensity_aggregation_names):
+    for intensity_aggregation_name in intensity_aggregation_names:
+        if _get_intensity_aggregation(intensity_aggregation_name) is None:
+            raise click.BadParameter(
+                f"{intensity_aggregation_name} is not one of "
+                f"{', '.join(_intensity_aggregations.keys())} "
+                "or a percentile (e.g. p90)"
+            )
+    return intensity_aggregation_names
+
+
 @click.command(name="intensities", help="Measure object intensities")
 @click.option(
     "--img",
@@ -47,11 +81,15 @@ _intensity_aggregations = {
 )
 @click.option(
     "--aggr",
-    "intensity_aggregation_name",
-    type=click.Choice(list(_intensity_aggregations.keys()), case_sensitive=True),
-    default="mean",
+    "intensity_aggregation_names",
+    type=click.STRING,
+    multiple=True,
+    default=["mean"],
     show_default=True,
-    help="Function for aggregating cell pixels",
+    callback=_check_intensity_aggregation_names,
+    help="Function for aggregating cell pixels ("
+    + "|".join(_intensity_aggregations.keys())
+    + "|p<percentile>, can be specified multiple times)",
 )
 @click.option(
     "--mmap/--no-mmap",
@@ -60,13 +98,30 @@ _intensity_aggregations = {
     show_default=True,
     help="Use memory mapping for reading images/masks",
 )
+@click.option(
+    "--workers",
+    "workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes",
+)
+@click.option(
+    "--prefetch",
+    "prefetch",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of images/masks to read ahead (single worker only)",
+)
 @click.option(
     "-o",
     "intensities_dir",
     type=click.Path(file_okay=False),
     default="intensities",
     show_default=True,
-    help="Path to the object intensities output directory",
+    help="Path to the object intensities output directory "
+    "(suffixed by the function name for multiple aggregation functions)",
 )
 @click_log.simple_verbosity_option(logger=steinbock_logger)
 @catch_exception(handle=SteinbockException)
@@ -74,25 +129,43 @@ def intensities_cmd(
     img_dir,
     mask_dir,
     panel_file,
-    intensity_aggregation_name,
+    intensity_aggregation_names,
     mmap,
+    workers,
+    prefetch,
     intensities_dir,
 ):
     panel = io.read_panel(panel_file)
     channel_names = panel["name"].tolist()
     img_files = io.list_image_files(img_dir)
     mask_files = io.list_mask_files(mask_dir, base_files=img_files)
-    Path(intensities_dir).mkdir(exist_ok=True)
-    for img_file, mask_file, intensities in try_measure_intensities_from_disk(
+    # e.g. p90 and p90.0 refer to the same percentile
+    intensity_aggregations = list(
+        dict.fromkeys(
+            _get_intensity_aggregation(intensity_aggregation_name)
+            for intensity_aggregation_name in intensity_aggregation_names
+        )
+    )
+    intensities_dirs = {}
+    for intensity_aggregation in intensity_aggregations:
+        cur_intensities_dir = Path(intensities_dir)
+        if len(intensity_aggregations) > 1:
+            # resolve to also support "." (i.e., paths with an empty name)
+            cur_intensities_dir = cur_intensities_dir.resolve()
+            cur_intensities_dir = cur_intensities_dir.with_name(
+                f"{cur_intensities_dir.name}_"
+                f"{_get_intensity_aggregation_name(intensity_aggregation)}"
+            )
+        cur_intensities_dir.mkdir(exist_ok=True)
+        intensities_dirs[intensity_aggregation] = cur_intensities_dir
+    for _, _, intensities_files in try_measure_aggregated_intensities_from_disk_to_disk(
         img_files,
         mask_files,
+        intensities_dirs,
         channel_names,
-        _intensity_aggregations[intensity_aggregation_name],
         mmap=mmap,
+        workers=workers,
+        prefetch=prefetch,
     ):
-        intensities_file = io._as_path_with_suffix(
-            Path(intensities_dir) / img_file.name, ".csv"
-        )
-        io.write_data(intensities, intensities_file)
-        logger.info(intensities_file)
-        del intensities
+        for intensities_file in intensities_files.values():
+            logger.info(intensities_file)
@@ -7,12 +7,13 @@ from ... import io
 from ..._cli.utils import catch_exception, logger
 from ..._steinbock import SteinbockException
 from ..._steinbock import logger as steinbock_logger
-from ..neighbors import NeighborhoodType, try_measure_neighbors_from_disk
+from ..neighbors import NeighborhoodType, try_measure_neighbors_from_disk_to_disk
 
 _neighborhood_types = {
     "centroids": NeighborhoodType.CENTROID_DISTANCE,
     "borders": NeighborhoodType.EUCLIDEAN_BORDER_DISTANCE,
     "expansion": NeighborhoodType.EUCLIDEAN_PIXEL_EXPANSION,
+    "delaunay": NeighborhoodType.CENTROID_DELAUNAY_TRIANGULATION,
 }
 
 
@@ -51,6 +52,12 @@ _neighborhood_types = {
     type=click.INT,
     help="Maximum number of neighbors per object",
 )
+@click.option(
+    "--connectivity",
+    "connectivity",
+    type=click.IntRange(min=1, max=2),
+    help="[Pixel expansion] Pixel connectivity (1: 4-neighborhood, 2: 8-neighborhood)",
+)
 @click.option(
     "--mmap/--no-mmap",
     "mmap",
@@ -58,6 +65,14 @@ _neighborhood_types = {
     show_default=True,
     help="Use memory mapping for reading images/masks",
 )
+@click.option(
+    "--workers",
+    "workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes",
+)
 @click.option(
     "-o",
     "neighbors_dir",
@@ -69,21 +84,27 @@ _neighborhood_types = {
 @click_log.simple_verbosity_option(logger=steinbock_logger)
 @catch_exception(handle=SteinbockException)
 def neighbors_cmd(
-    mask_dir, neighborhood_type_name, metric, dmax, kmax, mmap, neighbors_dir
+    mask_dir,
+    neighborhood_type_name,
+    metric,
+    dmax,
+    kmax,
+    connectivity,
+    mmap,
+    workers,
+    neighbors_dir,
 ):
     mask_files = io.list_mask_files(mask_dir)
     Path(neighbors_dir).mkdir(exist_ok=True)
-    for mask_file, neighbors in try_measure_neighbors_from_disk(
+    for _, neighbors_file in try_measure_neighbors_from_disk_to_disk(
         mask_files,
+        neighbors_dir,
         _neighborhood_types[neighborhood_type_name],
         metric=metric,
         dmax=dmax,
         kmax=kmax,
+        connectivity=connectivity,
         mmap=mmap,
+        workers=workers,
     ):
-        neighbors_file = io._as_path_with_suffix(
-            Path(neighbors_dir) / Path(mask_file).name, ".csv"
-        )
-        io.write_neighbors(neighbors, neighbors_file)
         logger.info(neighbors_file)
-        del neighbors
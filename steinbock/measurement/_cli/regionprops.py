@@ -7,7 +7,7 @@ from ... import io
 from ..._cli.utils import catch_exception, logger
 from ..._steinbock import SteinbockException
 from ..._steinbock import logger as steinbock_logger
-from ..regionprops import try_measure_regionprops_from_disk
+from ..regionprops import try_measure_regionprops_from_disk_to_disk
 
 
 @click.command(name="regionprops", help="Measure object region properties")
@@ -34,6 +34,14 @@ from ..regionprops import try_measure_regionprops_from_disk
     show_default=True,
     help="Use memory mapping for reading images/masks",
 )
+@click.option(
+    "--workers",
+    "workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes",
+)
 @click.argument("skimage_regionprops", nargs=-1, type=click.STRING)
 @click.option(
     "-o",
@@ -45,7 +53,9 @@ from ..regionprops import try_measure_regionprops_from_disk
 )
 @click_log.simple_verbosity_option(logger=steinbock_logger)
 @catch_exception(handle=SteinbockException)
-def regionprops_cmd(img_dir, mask_dir, mmap, skimage_regionprops, regionprops_dir):
+def regionprops_cmd(
+    img_dir, mask_dir, mmap, workers, skimage_regionprops, regionprops_dir
+):
     img_files = io.list_image_files(img_dir)
     mask_files = io.list_mask_files(mask_dir, base_files=img_files)
     Path(regionprops_dir).mkdir(exist_ok=True)
@@ -57,12 +67,12 @@ def regionprops_cmd(img_dir, mask_dir, mmap, skimage_regionprops, regionprops_di
             "axis_minor_length",
             "eccentricity",
         ]
-    for img_file, mask_file, regionprops in try_measure_regionprops_from_disk(
-        img_files, mask_files, skimage_regionprops, mmap=mmap
+    for _, _, regionprops_file in try_measure_regionprops_from_disk_to_disk(
+        img_files,
+        mask_files,
+        regionprops_dir,
+        skimage_regionprops,
+        mmap=mmap,
+        workers=workers,
     ):
-        regionprops_file = io._as_path_with_suffix(
-            Path(regionprops_dir) / img_file.name, ".csv"
-        )
-        io.write_data(regionprops, regionprops_file)
         logger.info(regionprops_file)
-        del regionprops
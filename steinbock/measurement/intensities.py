@@ -1,66 +1,384 @@
 import logging
+from concurrent.futures import Future
 from enum import Enum
-from functools import partial
+from functools import cached_property, partial
+from itertools import repeat
 from os import PathLike
 from pathlib import Path
-from typing import Generator, Sequence, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import pandas as pd
-import scipy.ndimage
+from scipy.sparse import csr_matrix
 
 from .. import io
+from .._parallel import map_parallel, map_prefetched
 
 logger = logging.getLogger(__name__)
 
 
+class _ObjectPixels:
+    # groups the pixels of all channels by object once, such that all channels
+    # can be aggregated together and intermediate results can be shared
+    def __init__(self, img: np.ndarray, mask: np.ndarray) -> None:
+        labels = mask.ravel()
+        (pixel_indices,) = np.nonzero(labels)
+        self.object_ids, self.object_indices, self.counts = np.unique(
+            labels[pixel_indices], return_inverse=True, return_counts=True
+        )
+        self.values = img.reshape((img.shape[0], -1))[:, pixel_indices]
+        # sparse (objects x pixels) indicator matrix; pixels are summed up in
+        # their original order, for results identical to scipy.ndimage
+        self.membership = csr_matrix(
+            (
+                np.ones(len(pixel_indices)),
+                (self.object_indices, np.arange(len(pixel_indices))),
+            ),
+            shape=(len(self.object_ids), len(pixel_indices)),
+        )
+
+    def _sum_by_object(self, values: np.ndarray) -> np.ndarray:
+        return (self.membership @ values.T).T
+
+    @cached_property
+    def offsets(self) -> np.ndarray:
+        return np.cumsum(self.counts) - self.counts
+
+    @cached_property
+    def sorted_values(self) -> np.ndarray:
+        return self.values[:, np.argsort(self.object_indices, kind="stable")]
+
+    @cached_property
+    def ranked_values(self) -> np.ndarray:
+        # pixel values sorted by object and, within each object, by value; for
+        # vectorization, all objects of the same size are sorted together
+        ranked_values = np.empty_like(self.sorted_values)
+        for count in np.unique(self.counts):
+            offsets = self.offsets[self.counts == count]
+            pixel_indices = offsets[:, np.newaxis] + np.arange(count)
+            ranked_values[:, pixel_indices] = np.sort(
+                self.sorted_values[:, pixel_indices], axis=-1
+            )
+        return ranked_values
+
+    @cached_property
+    def sums(self) -> np.ndarray:
+        return self._sum_by_object(self.values)
+
+    @cached_property
+    def mins(self) -> np.ndarray:
+        return np.minimum.reduceat(self.sorted_values, self.offsets, axis=1)
+
+    @cached_property
+    def maxs(self) -> np.ndarray:
+        return np.maximum.reduceat(self.sorted_values, self.offsets, axis=1)
+
+    @cached_property
+    def means(self) -> np.ndarray:
+        return self.sums / self.counts
+
+    @cached_property
+    def centered_sums_of_squares(self) -> np.ndarray:
+        centered_values = self.values - self.means[:, self.object_indices]
+        centered_values *= centered_values
+        return self._sum_by_object(centered_values)
+
+    @cached_property
+    def variances(self) -> np.ndarray:
+        return self.centered_sums_of_squares / self.counts.astype(float)
+
+    @cached_property
+    def medians(self) -> np.ndarray:
+        # same as scipy.ndimage.median: average of the two middle values
+        lower_values = self.ranked_values[:, self.offsets + (self.counts - 1) // 2]
+        upper_values = self.ranked_values[:, self.offsets + self.counts // 2]
+        if not np.issubdtype(self.values.dtype, np.floating):
+            lower_values = lower_values.astype(float)
+            upper_values = upper_values.astype(float)
+        return (lower_values + upper_values) / 2.0
+
+    def percentiles(self, percentile: float) -> np.ndarray:
+        # same as numpy.percentile: linear interpolation between closest ranks
+        positions = (self.counts - 1) * (percentile / 100.0)
+        lower_positions = np.floor(positions).astype(int)
+        upper_positions = np.minimum(lower_positions + 1, self.counts - 1)
+        lower_values = self.ranked_values[:, self.offsets + lower_positions]
+        upper_values = self.ranked_values[:, self.offsets + upper_positions]
+        lower_values = lower_values.astype(float)
+        upper_values = upper_values.astype(float)
+        weights = positions - lower_positions
+        return lower_values + (upper_values - lower_values) * weights
+
+
+def _aggregate_sum(object_pixels: _ObjectPixels) -> np.ndarray:
+    return object_pixels.sums
+
+
+def _aggregate_min(object_pixels: _ObjectPixels) -> np.ndarray:
+    return object_pixels.mins
+
+
+def _aggregate_max(object_pixels: _ObjectPixels) -> np.ndarray:
+    return object_pixels.maxs
+
+
+def _aggregate_mean(object_pixels: _ObjectPixels) -> np.ndarray:
+    return object_pixels.means
+
+
+def _aggregate_median(object_pixels: _ObjectPixels) -> np.ndarray:
+    return object_pixels.medians
+
+
+def _aggregate_percentile(
+    object_pixels: _ObjectPixels, percentile: float
+) -> np.ndarray:
+    return object_pixels.percentiles(percentile)
+
+
+def _aggregate_std(object_pixels: _ObjectPixels) -> np.ndarray:
+    return np.sqrt(object_pixels.variances)
+
+
+def _aggregate_var(object_pixels: _ObjectPixels) -> np.ndarray:
+    return object_pixels.variances
+
+
 class IntensityAggregation(Enum):
-    SUM = partial(scipy.ndimage.sum_labels)
-    MIN = partial(scipy.ndimage.minimum)
-    MAX = partial(scipy.ndimage.maximum)
-    MEAN = partial(scipy.ndimage.mean)
-    MEDIAN = partial(scipy.ndimage.median)
-    STD = partial(scipy.ndimage.standard_deviation)
-    VAR = partial(scipy.ndimage.variance)
+    SUM = partial(_aggregate_sum)
+    MIN = partial(_aggregate_min)
+    MAX = partial(_aggregate_max)
+    MEAN = partial(_aggregate_mean)
+    MEDIAN = partial(_aggregate_median)
+    STD = partial(_aggregate_std)
+    VAR = partial(_aggregate_var)
+
+    def __reduce_ex__(self, protocol):
+        # pickle by name (partial objects do not compare equal after unpickling)
+        return getattr, (self.__class__, self.name)
+
+
+class IntensityPercentile(NamedTuple):
+    percentile: float
+
+    @property
+    def value(self) -> Callable[[_ObjectPixels], np.ndarray]:
+        return partial(_aggregate_percentile, percentile=self.percentile)
 
 
 def measure_intensites(
     img: np.ndarray,
     mask: np.ndarray,
     channel_names: Sequence[str],
-    intensity_aggregation: IntensityAggregation,
+    intensity_aggregation: Union[IntensityAggregation, IntensityPercentile],
 ) -> pd.DataFrame:
-    object_ids = np.unique(mask[mask != 0])
-    data = {
-        channel_name: intensity_aggregation.value(img[i], labels=mask, index=object_ids)
-        for i, channel_name in enumerate(channel_names)
-    }
-    return pd.DataFrame(
-        data=data,
-        index=pd.Index(object_ids, dtype=io.mask_dtype, name="Object"),
+    return measure_aggregated_intensities(
+        img, mask, channel_names, [intensity_aggregation]
+    )[intensity_aggregation]
+
+
+def measure_aggregated_intensities(
+    img: np.ndarray,
+    mask: np.ndarray,
+    channel_names: Sequence[str],
+    intensity_aggregations: Sequence[Union[IntensityAggregation, IntensityPercentile]],
+) -> Dict[Union[IntensityAggregation, IntensityPercentile], pd.DataFrame]:
+    # intermediate results (e.g. sums, counts) are shared between aggregations
+    object_pixels = _ObjectPixels(img, mask)
+    object_index = pd.Index(
+        object_pixels.object_ids, dtype=io._get_mask_dtype(mask.dtype), name="Object"
     )
+    return {
+        intensity_aggregation: pd.DataFrame(
+            data=dict(zip(channel_names, intensity_aggregation.value(object_pixels))),
+            index=object_index,
+        )
+        for intensity_aggregation in intensity_aggregations
+    }
 
 
 def try_measure_intensities_from_disk(
     img_files: Sequence[Union[str, PathLike]],
     mask_files: Sequence[Union[str, PathLike]],
     channel_names: Sequence[str],
-    intensity_aggregation: IntensityAggregation,
+    intensity_aggregation: Union[IntensityAggregation, IntensityPercentile],
     mmap: bool = False,
+    workers: int = 1,
+    prefetch: int = 1,
 ) -> Generator[Tuple[Path, Path, pd.DataFrame], None, None]:
-    for img_file, mask_file in zip(img_files, mask_files):
-        try:
-            if mmap:
-                img = io.mmap_image(img_file)
-                mask = io.mmap_mask(mask_file)
-            else:
-                img = io.read_image(img_file)
-                mask = io.read_mask(mask_file)
-            intensities = measure_intensites(
-                img, mask, channel_names, intensity_aggregation
+    for (
+        img_file,
+        mask_file,
+        intensities_dict,
+    ) in try_measure_aggregated_intensities_from_disk(
+        img_files,
+        mask_files,
+        channel_names,
+        [intensity_aggregation],
+        mmap=mmap,
+        workers=workers,
+        prefetch=prefetch,
+    ):
+        intensities = intensities_dict.pop(intensity_aggregation)
+        del intensities_dict
+        yield img_file, mask_file, intensities
+        del intensities
+
+
+def _read_image_and_mask(
+    img_file: Union[str, PathLike], mask_file: Union[str, PathLike], mmap: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    if mmap:
+        return io.mmap_image(img_file), io.mmap_mask(mask_file)
+    return io.read_image(img_file), io.read_mask(mask_file)
+
+
+def _try_measure_aggregated_intensities_from_disk(
+    img_file: Union[str, PathLike],
+    mask_file: Union[str, PathLike],
+    img_and_mask: Optional[Future],
+    channel_names: Sequence[str],
+    intensity_aggregations: Sequence[Union[IntensityAggregation, IntensityPercentile]],
+    mmap: bool = False,
+    intensities_dirs: Optional[
+        Mapping[Union[IntensityAggregation, IntensityPercentile], Union[str, PathLike]]
+    ] = None,
+) -> Union[
+    Dict[Union[IntensityAggregation, IntensityPercentile], pd.DataFrame],
+    Dict[Union[IntensityAggregation, IntensityPercentile], Path],
+    None,
+]:
+    try:
+        if img_and_mask is not None:
+            img, mask = img_and_mask.result()
+            del img_and_mask
+        else:
+            img, mask = _read_image_and_mask(img_file, mask_file, mmap=mmap)
+        intensities_dict = measure_aggregated_intensities(
+            img, mask, channel_names, intensity_aggregations
+        )
+        del img, mask
+        if intensities_dirs is None:
+            return intensities_dict
+        intensities_files = {}
+        for intensity_aggregation, intensities in intensities_dict.items():
+            intensities_file = io._as_path_with_suffix(
+                Path(intensities_dirs[intensity_aggregation]) / Path(img_file).name,
+                io.data_file_suffix,
             )
-            del img, mask
-            yield Path(img_file), Path(mask_file), intensities
-            del intensities
-        except Exception as e:
-            logger.exception(f"Error measuring intensities in {img_file}: {e}")
+            io.write_data(intensities, intensities_file)
+            intensities_files[intensity_aggregation] = intensities_file
+        return intensities_files
+    except Exception as e:
+        logger.exception(f"Error measuring intensities in {img_file}: {e}")
+    return None
+
+
+def _map_aggregated_intensities_from_disk(
+    func: Callable[..., Any],
+    img_files: Sequence[Union[str, PathLike]],
+    mask_files: Sequence[Union[str, PathLike]],
+    mmap: bool = False,
+    workers: int = 1,
+    prefetch: int = 1,
+) -> Iterator[Any]:
+    if workers == 1:
+        # read the next images/masks in the background while measuring
+        imgs_and_masks: Iterable[Optional[Future]] = map_prefetched(
+            partial(_read_image_and_mask, mmap=mmap),
+            img_files,
+            mask_files,
+            depth=prefetch,
+        )
+    else:
+        imgs_and_masks = repeat(None)  # read by the worker processes
+    return map_parallel(func, img_files, mask_files, imgs_and_masks, workers=workers)
+
+
+def try_measure_aggregated_intensities_from_disk(
+    img_files: Sequence[Union[str, PathLike]],
+    mask_files: Sequence[Union[str, PathLike]],
+    channel_names: Sequence[str],
+    intensity_aggregations: Sequence[Union[IntensityAggregation, IntensityPercentile]],
+    mmap: bool = False,
+    workers: int = 1,
+    prefetch: int = 1,
+) -> Generator[
+    Tuple[
+        Path,
+        Path,
+        Dict[Union[IntensityAggregation, IntensityPercentile], pd.DataFrame],
+    ],
+    None,
+    None,
+]:
+    for img_file, mask_file, intensities_dict in zip(
+        img_files,
+        mask_files,
+        _map_aggregated_intensities_from_disk(
+            partial(
+                _try_measure_aggregated_intensities_from_disk,
+                channel_names=channel_names,
+                intensity_aggregations=intensity_aggregations,
+                mmap=mmap,
+            ),
+            img_files,
+            mask_files,
+            mmap=mmap,
+            workers=workers,
+            prefetch=prefetch,
+        ),
+    ):
+        if intensities_dict is not None:
+            yield Path(img_file), Path(mask_file), intensities_dict
+            del intensities_dict
+
+
+def try_measure_aggregated_intensities_from_disk_to_disk(
+    img_files: Sequence[Union[str, PathLike]],
+    mask_files: Sequence[Union[str, PathLike]],
+    intensities_dirs: Mapping[
+        Union[IntensityAggregation, IntensityPercentile], Union[str, PathLike]
+    ],
+    channel_names: Sequence[str],
+    mmap: bool = False,
+    workers: int = 1,
+    prefetch: int = 1,
+) -> Generator[
+    Tuple[Path, Path, Dict[Union[IntensityAggregation, IntensityPercentile], Path]],
+    None,
+    None,
+]:
+    for img_file, mask_file, intensities_files in zip(
+        img_files,
+        mask_files,
+        _map_aggregated_intensities_from_disk(
+            partial(
+                _try_measure_aggregated_intensities_from_disk,
+                channel_names=channel_names,
+                intensity_aggregations=list(intensities_dirs.keys()),
+                mmap=mmap,
+                intensities_dirs=intensities_dirs,
+            ),
+            img_files,
+            mask_files,
+            mmap=mmap,
+            workers=workers,
+            prefetch=prefetch,
+        ),
+    ):
+        if intensities_files is not None:
+            yield Path(img_file), Path(mask_file), intensities_files
@@ -8,14 +8,24 @@ from typing import Generator, Optional, Sequence, Tuple, Union
 import numpy as np
 import pandas as pd
 from scipy.ndimage import distance_transform_edt
+from scipy.spatial import Delaunay, QhullError, cKDTree
 from scipy.spatial.distance import pdist, squareform
 from skimage.measure import regionprops
 
 from .. import io
+from .._parallel import map_parallel
 from ._measurement import SteinbockMeasurementException
 
 logger = logging.getLogger(__name__)
 
+# scipy.spatial.distance metrics supported by spatial trees (as Minkowski p-norms)
+_kdtree_minkowski_p_norms = {
+    "euclidean": 2.0,
+    "minkowski": 2.0,
+    "cityblock": 1.0,
+    "chebyshev": np.inf,
+}
+
 
 class SteinbockNeighborsMeasurementException(SteinbockMeasurementException):
     pass
@@ -34,20 +44,15 @@ def _to_triu_indices(k: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
     return i.astype(int), j.astype(int)
 
 
-def _measure_centroid_distance_neighbors(
-    mask: np.ndarray,
-    metric: Optional[str] = None,
+def _query_centroid_neighbors_dense(
+    centroids: np.ndarray,
+    metric: str,
     dmax: Optional[float] = None,
     kmax: Optional[int] = None,
-) -> pd.DataFrame:
-    if metric is None:
-        raise SteinbockNeighborsMeasurementException("Metric is required")
-    props = regionprops(mask)
-    labels = np.array([p.label for p in props])
-    centroids = np.array([p.centroid for p in props])
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     condensed_dists = pdist(centroids, metric=metric)
     if kmax is not None:
-        k = min(kmax, len(props) - 1)
+        k = min(kmax, len(centroids) - 1)
         dist_mat = squareform(condensed_dists, checks=False).astype(float)
         np.fill_diagonal(dist_mat, np.inf)
         knn_indices = np.argpartition(dist_mat, k - 1)[:, :k]
@@ -56,91 +61,281 @@ def _measure_centroid_distance_neighbors(
             indices1, indices2 = np.nonzero(knn_dists <= dmax)
             indices2 = knn_indices[(indices1, indices2)]
         else:
-            indices1 = np.repeat(np.arange(len(props)), k)
+            indices1 = np.repeat(np.arange(len(centroids)), k)
             indices2 = np.ravel(knn_indices)
         distances = dist_mat[(indices1, indices2)]
-    elif dmax is not None:
+    else:
         (condensed_indices,) = np.nonzero(condensed_dists <= dmax)
-        indices1, indices2 = _to_triu_indices(condensed_indices, len(props))
+        indices1, indices2 = _to_triu_indices(condensed_indices, len(centroids))
         distances = condensed_dists[condensed_indices]
         indices1, indices2, distances = (
             np.concatenate((indices1, indices2)),
             np.concatenate((indices2, indices1)),
             np.concatenate((distances, distances)),
         )
+    return indices1, indices2, distances
+
+
+def _query_centroid_neighbors_kdtree(
+    centroids: np.ndarray,
+    p: float,
+    dmax: Optional[float] = None,
+    kmax: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    tree = cKDTree(centroids)
+    if kmax is not None:
+        k = min(kmax, len(centroids) - 1)
+        distance_upper_bound = np.inf
+        if dmax is not None:
+            distance_upper_bound = np.nextafter(dmax, np.inf)
+        knn_dists, knn_indices = tree.query(
+            centroids, k=k + 1, p=p, distance_upper_bound=distance_upper_bound
+        )
+        knn_dists = np.reshape(knn_dists, (len(centroids), k + 1))
+        knn_indices = np.reshape(knn_indices, (len(centroids), k + 1))
+        # exclude each object itself (or, for objects with identical centroids,
+        # the farthest of the k + 1 nearest neighbors) from its neighbors
+        is_self = knn_indices == np.arange(len(centroids))[:, np.newaxis]
+        is_self[~np.any(is_self, axis=1), -1] = True
+        knn_dists = np.reshape(knn_dists[~is_self], (len(centroids), k))
+        knn_indices = np.reshape(knn_indices[~is_self], (len(centroids), k))
+        if dmax is not None:
+            indices1, indices2 = np.nonzero(knn_dists <= dmax)
+        else:
+            indices1, indices2 = np.nonzero(np.isfinite(knn_dists))
+        distances = knn_dists[(indices1, indices2)]
+        indices2 = knn_indices[(indices1, indices2)]
     else:
+        # query_pairs may exclude pairs at a distance of exactly dmax
+        pairs = tree.query_pairs(np.nextafter(dmax, np.inf), p=p, output_type="ndarray")
+        pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+        distances = np.linalg.norm(
+            centroids[pairs[:, 0]] - centroids[pairs[:, 1]], ord=p, axis=1
+        )
+        is_within_dmax = distances <= dmax
+        indices1, indices2 = pairs[is_within_dmax, 0], pairs[is_within_dmax, 1]
+        distances = distances[is_within_dmax]
+        indices1, indices2, distances = (
+            np.concatenate((indices1, indices2)),
+            np.concatenate((indices2, indices1)),
+            np.concatenate((distances, distances)),
+        )
+    return indices1, indices2, distances
+
+
+def _measure_centroid_distance_neighbors(
+    mask: np.ndarray,
+    metric: Optional[str] = None,
+    dmax: Optional[float] = None,
+    kmax: Optional[int] = None,
+    connectivity: Optional[int] = None,
+) -> pd.DataFrame:
+    if metric is None:
+        raise SteinbockNeighborsMeasurementException("Metric is required")
+    if connectivity is not None:
+        raise SteinbockNeighborsMeasurementException(
+            "Connectivity is not supported by centroid distances"
+        )
+    if dmax is None and kmax is None:
         raise SteinbockNeighborsMeasurementException(
             "Specify either dmax or kmax (or both)"
         )
+    props = regionprops(mask)
+    labels = np.array([p.label for p in props], dtype=int)
+    centroids = np.array([p.centroid for p in props], dtype=float)
+    if len(props) == 0 or (kmax is not None and len(props) < 2):
+        indices1 = indices2 = np.array([], dtype=int)
+        distances = np.array([], dtype=float)
+    elif metric in _kdtree_minkowski_p_norms:
+        # spatial tree queries avoid computing all pairwise distances
+        indices1, indices2, distances = _query_centroid_neighbors_kdtree(
+            centroids, _kdtree_minkowski_p_norms[metric], dmax=dmax, kmax=kmax
+        )
+    else:
+        indices1, indices2, distances = _query_centroid_neighbors_dense(
+            centroids, metric, dmax=dmax, kmax=kmax
+        )
+    label_dtype = io._get_mask_dtype(mask.dtype)
     return pd.DataFrame(
         data={
-            "Object": np.asarray(labels[indices1], dtype=io.mask_dtype),
-            "Neighbor": np.asarray(labels[indices2], dtype=io.mask_dtype),
+            "Object": np.asarray(labels[indices1], dtype=label_dtype),
+            "Neighbor": np.asarray(labels[indices2], dtype=label_dtype),
             "Distance": np.asarray(distances, dtype=np.float32),
         }
     )
 
 
+def _get_border_pixels(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # distances between objects are minimal between their border pixels, i.e.,
+    # object pixels with a differently labeled pixel in their 4-neighborhood
+    border = np.zeros(mask.shape, dtype=bool)
+    border[:-1, :] |= mask[:-1, :] != mask[1:, :]
+    border[1:, :] |= mask[1:, :] != mask[:-1, :]
+    border[:, :-1] |= mask[:, :-1] != mask[:, 1:]
+    border[:, 1:] |= mask[:, 1:] != mask[:, :-1]
+    border &= mask != 0
+    return mask[border], np.argwhere(border)
+
+
+def _min_by_label_pair(
+    labels1: np.ndarray, labels2: np.ndarray, distances: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    order = np.lexsort((distances, labels2, labels1))
+    labels1, labels2, distances = labels1[order], labels2[order], distances[order]
+    is_min = np.ones(len(order), dtype=bool)
+    is_min[1:] = (labels1[1:] != labels1[:-1]) | (labels2[1:] != labels2[:-1])
+    return labels1[is_min], labels2[is_min], distances[is_min]
+
+
+def _query_border_neighbors_dmax(
+    border_labels: np.ndarray, border_coords: np.ndarray, dmax: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    tree = cKDTree(border_coords)
+    # query_pairs may exclude pairs at a distance of exactly dmax
+    pairs = tree.query_pairs(np.nextafter(dmax, np.inf), output_type="ndarray")
+    pairs = pairs[border_labels[pairs[:, 0]] != border_labels[pairs[:, 1]]]
+    distances = np.linalg.norm(
+        border_coords[pairs[:, 0]] - border_coords[pairs[:, 1]], axis=1
+    )
+    is_within_dmax = distances <= dmax
+    pairs, distances = pairs[is_within_dmax], distances[is_within_dmax]
+    return _min_by_label_pair(
+        np.concatenate((border_labels[pairs[:, 0]], border_labels[pairs[:, 1]])),
+        np.concatenate((border_labels[pairs[:, 1]], border_labels[pairs[:, 0]])),
+        np.concatenate((distances, distances)),
+    )
+
+
+def _query_border_neighbors_all(
+    border_labels: np.ndarray,
+    border_coords: np.ndarray,
+    kmax: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    order = np.argsort(border_labels, kind="stable")
+    border_labels, border_coords = border_labels[order], border_coords[order]
+    unique_labels, offsets, counts = np.unique(
+        border_labels, return_index=True, return_counts=True
+    )
+    bbox_mins = np.minimum.reduceat(border_coords, offsets, axis=0)
+    bbox_maxs = np.maximum.reduceat(border_coords, offsets, axis=0)
+
+    def min_distances(tree: cKDTree, indices: np.ndarray) -> np.ndarray:
+        # minimum distances between the tree pixels and the indexed objects
+        index_counts = counts[indices]
+        index_offsets = np.cumsum(index_counts) - index_counts
+        pixel_indices = np.arange(np.sum(index_counts)) + np.repeat(
+            offsets[indices] - index_offsets, index_counts
+        )
+        pixel_dists, _ = tree.query(border_coords[pixel_indices])
+        return np.minimum.reduceat(pixel_dists, index_offsets)
+
+    labels1 = []
+    labels2 = []
+    distances = []
+    for i, (offset, count) in enumerate(zip(offsets, counts)):
+        tree = cKDTree(border_coords[offset : offset + count])
+        # distances between bounding boxes are lower bounds for the distances
+        # between objects; these are used to find candidate neighbors
+        bbox_gaps = np.maximum(
+            np.maximum(bbox_mins - bbox_maxs[i], bbox_mins[i] - bbox_maxs), 0
+        )
+        lower_bounds = np.sqrt(np.sum(bbox_gaps**2, axis=1))
+        lower_bounds[i] = np.inf
+        neighbor_indices = np.flatnonzero(np.isfinite(lower_bounds))
+        if kmax is not None and len(neighbor_indices) > kmax:
+            knn_indices = np.argpartition(lower_bounds, kmax - 1)[:kmax]
+            knn_dmax = np.amax(min_distances(tree, knn_indices))
+            neighbor_indices = np.flatnonzero(lower_bounds <= knn_dmax)
+        neighbor_dists = min_distances(tree, neighbor_indices)
+        if kmax is not None and len(neighbor_indices) > kmax:
+            knn_indices = np.argpartition(neighbor_dists, kmax - 1)[:kmax]
+            neighbor_indices = neighbor_indices[knn_indices]
+            neighbor_dists = neighbor_dists[knn_indices]
+        labels1.append(np.full(len(neighbor_indices), unique_labels[i]))
+        labels2.append(unique_labels[neighbor_indices])
+        distances.append(neighbor_dists)
+    if len(unique_labels) == 0:
+        return np.array([]), np.array([]), np.array([])
+    return np.concatenate(labels1), np.concatenate(labels2), np.concatenate(distances)
+
+
 def _measure_euclidean_border_distance_neighbors(
     mask: np.ndarray,
     metric: Optional[str] = None,
     dmax: Optional[float] = None,
     kmax: Optional[int] = None,
+    connectivity: Optional[int] = None,
 ) -> pd.DataFrame:
     if metric not in (None, "euclidean"):
         raise SteinbockNeighborsMeasurementException("Metric has to be euclidean")
-    labels1 = []
-    labels2 = []
-    distances = []
-    unique_labels = np.unique(mask)
-    unique_labels = unique_labels[unique_labels != 0]
-    for label in unique_labels:
-        if dmax is not None:
-            ys, xs = np.nonzero(mask == label)
-            dmax_int = int(np.ceil(dmax))
-            ymin, ymax = np.amin(ys) - dmax_int, np.amax(ys) + dmax_int
-            xmin, xmax = np.amin(xs) - dmax_int, np.amax(xs) + dmax_int
-            mask_or_patch = mask[
-                max(0, ymin) : min(mask.shape[0], ymax + 1),
-                max(0, xmin) : min(mask.shape[1], xmax + 1),
-            ]
-            neighbor_labels = np.unique(mask_or_patch)
-            neighbor_labels = neighbor_labels[neighbor_labels != 0]
-        else:
-            mask_or_patch = mask
-            neighbor_labels = unique_labels
-        dists = distance_transform_edt(mask_or_patch != label)
-        neighbor_labels = neighbor_labels[neighbor_labels != label]
-        neighbor_dists = np.array(
-            [
-                np.amin(dists[mask_or_patch == neighbor_label])
-                for neighbor_label in neighbor_labels
-            ]
+    if connectivity is not None:
+        raise SteinbockNeighborsMeasurementException(
+            "Connectivity is not supported by border distances"
         )
-        if dmax is not None:
-            neighbor_labels = neighbor_labels[neighbor_dists <= dmax]
-            neighbor_dists = neighbor_dists[neighbor_dists <= dmax]
-        if kmax is not None and len(neighbor_labels) > kmax:
-            knn_indices = np.argpartition(neighbor_dists, kmax - 1)[:kmax]
-            neighbor_labels = neighbor_labels[knn_indices]
-            neighbor_dists = neighbor_dists[knn_indices]
-        labels1 += [label] * len(neighbor_labels)
-        labels2 += neighbor_labels.tolist()
-        distances += neighbor_dists.tolist()
+    border_labels, border_coords = _get_border_pixels(mask)
+    if dmax is not None:
+        labels1, labels2, distances = _query_border_neighbors_dmax(
+            border_labels, border_coords, dmax
+        )
+        if kmax is not None:
+            order = np.lexsort((distances, labels1))
+            labels1, labels2, distances = (
+                labels1[order],
+                labels2[order],
+                distances[order],
+            )
+            _, label_offsets, label_counts = np.unique(
+                labels1, return_index=True, return_counts=True
+            )
+            label_ranks = np.arange(len(labels1)) - np.repeat(
+                label_offsets, label_counts
+            )
+            labels1, labels2, distances = (
+                labels1[label_ranks < kmax],
+                labels2[label_ranks < kmax],
+                distances[label_ranks < kmax],
+            )
+    else:
+        labels1, labels2, distances = _query_border_neighbors_all(
+            border_labels, border_coords, kmax=kmax
+        )
+    label_dtype = io._get_mask_dtype(mask.dtype)
     return pd.DataFrame(
         data={
-            "Object": np.asarray(labels1, dtype=io.mask_dtype),
-            "Neighbor": np.asarray(labels2, dtype=io.mask_dtype),
+            "Object": np.asarray(labels1, dtype=label_dtype),
+            "Neighbor": np.asarray(labels2, dtype=label_dtype),
             "Distance": np.asarray(distances, dtype=np.float32),
         }
     )
 
 
+def _find_touching_objects(
+    mask: np.ndarray, connectivity: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    # compare the mask with shifted copies of itself (one per neighbor offset)
+    offsets = [(0, 1), (1, 0)]
+    if connectivity == 2:
+        offsets += [(1, 1), (1, -1)]
+    labels1 = []
+    labels2 = []
+    for dy, dx in offsets:
+        labels = mask[: mask.shape[0] - dy, max(0, -dx) : mask.shape[1] - max(0, dx)]
+        shifted_labels = mask[dy:, max(0, dx) : mask.shape[1] - max(0, -dx)]
+        touching = (labels != shifted_labels) & (labels != 0) & (shifted_labels != 0)
+        labels1 += [labels[touching], shifted_labels[touching]]
+        labels2 += [shifted_labels[touching], labels[touching]]
+    label_pairs = np.unique(
+        np.stack((np.concatenate(labels1), np.concatenate(labels2)), axis=-1), axis=0
+    )
+    return label_pairs[:, 0], label_pairs[:, 1]
+
+
 def _measure_euclidean_pixel_expansion_neighbors(
     mask: np.ndarray,
     metric: Optional[str] = None,
     dmax: Optional[float] = None,
     kmax: Optional[int] = None,
+    connectivity: Optional[int] = None,
 ) -> pd.DataFrame:
     if metric not in (None, "euclidean"):
         raise SteinbockNeighborsMeasurementException(
@@ -154,16 +349,89 @@ def _measure_euclidean_pixel_expansion_neighbors(
         raise SteinbockNeighborsMeasurementException(
             "k-nearest neighbors is not supported by pixel expansion"
         )
+    if connectivity is None:
+        connectivity = 1
+    if connectivity not in (1, 2):
+        raise SteinbockNeighborsMeasurementException(
+            "Connectivity has to be 1 (4-neighborhood) or 2 (8-neighborhood)"
+        )
     mask = _expand_mask_euclidean(mask, dmax)
-    neighbors = _measure_euclidean_border_distance_neighbors(mask, dmax=1.0)
-    neighbors["Distance"] = np.nan
-    return neighbors
+    labels1, labels2 = _find_touching_objects(mask, connectivity)
+    label_dtype = io._get_mask_dtype(mask.dtype)
+    return pd.DataFrame(
+        data={
+            "Object": np.asarray(labels1, dtype=label_dtype),
+            "Neighbor": np.asarray(labels2, dtype=label_dtype),
+            "Distance": np.full(len(labels1), np.nan),
+        }
+    )
+
+
+def _query_centroid_neighbors_delaunay(
+    centroids: np.ndarray, dmax: Optional[float] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    try:
+        indptr, indices2 = Delaunay(centroids).vertex_neighbor_vertices
+        indices1 = np.repeat(np.arange(len(centroids)), np.diff(indptr))
+    except QhullError:
+        # fewer than three objects, or all centroids are collinear
+        order = np.lexsort((centroids[:, 1], centroids[:, 0]))
+        indices1 = np.concatenate((order[:-1], order[1:]))
+        indices2 = np.concatenate((order[1:], order[:-1]))
+    distances = np.linalg.norm(centroids[indices1] - centroids[indices2], axis=1)
+    if dmax is not None:
+        keep = distances <= dmax
+        indices1, indices2, distances = indices1[keep], indices2[keep], distances[keep]
+    order = np.lexsort((indices2, indices1))
+    return indices1[order], indices2[order], distances[order]
+
+
+def _measure_centroid_delaunay_neighbors(
+    mask: np.ndarray,
+    metric: Optional[str] = None,
+    dmax: Optional[float] = None,
+    kmax: Optional[int] = None,
+    connectivity: Optional[int] = None,
+) -> pd.DataFrame:
+    if metric not in (None, "euclidean"):
+        raise SteinbockNeighborsMeasurementException("Metric has to be euclidean")
+    if kmax is not None:
+        raise SteinbockNeighborsMeasurementException(
+            "k-nearest neighbors is not supported by Delaunay triangulation"
+        )
+    if connectivity is not None:
+        raise SteinbockNeighborsMeasurementException(
+            "Connectivity is not supported by Delaunay triangulation"
+        )
+    props = regionprops(mask)
+    labels = np.array([p.label for p in props], dtype=int)
+    centroids = np.array([p.centroid for p in props], dtype=float)
+    if len(props) < 2:
+        indices1 = indices2 = np.array([], dtype=int)
+        distances = np.array([], dtype=float)
+    else:
+        indices1, indices2, distances = _query_centroid_neighbors_delaunay(
+            centroids, dmax=dmax
+        )
+    label_dtype = io._get_mask_dtype(mask.dtype)
+    return pd.DataFrame(
+        data={
+            "Object": np.asarray(labels[indices1], dtype=label_dtype),
+            "Neighbor": np.asarray(labels[indices2], dtype=label_dtype),
+            "Distance": np.asarray(distances, dtype=np.float32),
+        }
+    )
 
 
 class NeighborhoodType(Enum):
     CENTROID_DISTANCE = partial(_measure_centroid_distance_neighbors)
     EUCLIDEAN_BORDER_DISTANCE = partial(_measure_euclidean_border_distance_neighbors)
     EUCLIDEAN_PIXEL_EXPANSION = partial(_measure_euclidean_pixel_expansion_neighbors)
+    CENTROID_DELAUNAY_TRIANGULATION = partial(_measure_centroid_delaunay_neighbors)
+
+    def __reduce_ex__(self, protocol):
+        # pickle by name (partial objects do not compare equal after unpickling)
+        return getattr, (self.__class__, self.name)
 
 
 def measure_neighbors(
@@ -172,8 +440,47 @@ def measure_neighbors(
     metric: Optional[str] = None,
     dmax: Optional[float] = None,
     kmax: Optional[int] = None,
+    connectivity: Optional[int] = None,
 ) -> pd.DataFrame:
-    return neighborhood_type.value(mask, metric=metric, dmax=dmax, kmax=kmax)
+    return neighborhood_type.value(
+        mask, metric=metric, dmax=dmax, kmax=kmax, connectivity=connectivity
+    )
+
+
+def _try_measure_neighbors_from_disk(
+    mask_file: Union[str, PathLike],
+    neighborhood_type: NeighborhoodType,
+    metric: Optional[str] = None,
+    dmax: Optional[float] = None,
+    kmax: Optional[int] = None,
+    connectivity: Optional[int] = None,
+    mmap: bool = False,
+    neighbors_dir: Union[str, PathLike, None] = None,
+) -> Union[pd.DataFrame, Path, None]:
+    try:
+        if mmap:
+            mask = io.mmap_mask(mask_file)
+        else:
+            mask = io.read_mask(mask_file)
+        neighbors = measure_neighbors(
+            mask,
+            neighborhood_type,
+            metric=metric,
+            dmax=dmax,
+            kmax=kmax,
+            connectivity=connectivity,
+        )
+        del mask
+        if neighbors_dir is None:
+            return neighbors
+        neighbors_file = io._as_path_with_suffix(
+            Path(neighbors_dir) / Path(mask_file).name, io.data_file_suffix
+        )
+        io.write_neighbors(neighbors, neighbors_file)
+        return neighbors_file
+    except Exception as e:
+        logger.exception(f"Error measuring neighbors in {mask_file}: {e}")
+    return None
 
 
 def try_measure_neighbors_from_disk(
@@ -182,19 +489,58 @@ def try_measure_neighbors_from_disk(
     metric: Optional[str] = None,
     dmax: Optional[float] = None,
     kmax: Optional[int] = None,
+    connectivity: Optional[int] = None,
     mmap: bool = False,
+    workers: int = 1,
 ) -> Generator[Tuple[Path, pd.DataFrame], None, None]:
-    for mask_file in mask_files:
-        try:
-            if mmap:
-                mask = io.mmap_mask(mask_file)
-            else:
-                mask = io.read_mask(mask_file)
-            neighbors = measure_neighbors(
-                mask, neighborhood_type, metric=metric, dmax=dmax, kmax=kmax
-            )
-            del mask
+    for mask_file, neighbors in zip(
+        mask_files,
+        map_parallel(
+            partial(
+                _try_measure_neighbors_from_disk,
+                neighborhood_type=neighborhood_type,
+                metric=metric,
+                dmax=dmax,
+                kmax=kmax,
+                connectivity=connectivity,
+                mmap=mmap,
+            ),
+            mask_files,
+            workers=workers,
+        ),
+    ):
+        if neighbors is not None:
             yield Path(mask_file), neighbors
             del neighbors
-        except Exception as e:
-            logger.exception(f"Error measuring neighbors in {mask_file}: {e}")
+
+
+def try_measure_neighbors_from_disk_to_disk(
+    mask_files: Sequence[Union[str, PathLike]],
+    neighbors_dir: Union[str, PathLike],
+    neighborhood_type: NeighborhoodType,
+    metric: Optional[str] = None,
+    dmax: Optional[float] = None,
+    kmax: Optional[int] = None,
+    connectivity: Optional[int] = None,
+    mmap: bool = False,
+    workers: int = 1,
+) -> Generator[Tuple[Path, Path], None, None]:
+    for mask_file, neighbors_file in zip(
+        mask_files,
+        map_parallel(
+            partial(
+                _try_measure_neighbors_from_disk,
+                neighborhood_type=neighborhood_type,
+                metric=metric,
+                dmax=dmax,
+                kmax=kmax,
+                connectivity=connectivity,
+                mmap=mmap,
+                neighbors_dir=neighbors_dir,
+            ),
+            mask_files,
+            workers=workers,
+        ),
+    ):
+        if neighbors_file is not None:
+            yield Path(mask_file), neighbors_file
@@ -1,4 +1,5 @@
 import logging
+from functools import partial
 from os import PathLike
 from pathlib import Path
 from typing import Generator, Sequence, Tuple, Union
@@ -8,6 +9,7 @@ import pandas as pd
 from skimage.measure import regionprops_table
 
 from .. import io
+from .._parallel import map_parallel
 
 logger = logging.getLogger(__name__)
 
@@ -26,27 +28,86 @@ def measure_regionprops(
     object_ids = data.pop("label")
     return pd.DataFrame(
         data=data,
-        index=pd.Index(object_ids, dtype=io.mask_dtype, name="Object"),
+        index=pd.Index(object_ids, dtype=io._get_mask_dtype(mask.dtype), name="Object"),
     )
 
 
+def _try_measure_regionprops_from_disk(
+    img_file: Union[str, PathLike],
+    mask_file: Union[str, PathLike],
+    skimage_regionprops: Sequence[str],
+    mmap: bool = False,
+    regionprops_dir: Union[str, PathLike, None] = None,
+) -> Union[pd.DataFrame, Path, None]:
+    try:
+        if mmap:
+            img = io.mmap_image(img_file)
+            mask = io.mmap_mask(mask_file)
+        else:
+            img = io.read_image(img_file)
+            mask = io.read_mask(mask_file)
+        regionprops = measure_regionprops(img, mask, skimage_regionprops)
+        del img, mask
+        if regionprops_dir is None:
+            return regionprops
+        regionprops_file = io._as_path_with_suffix(
+            Path(regionprops_dir) / Path(img_file).name, io.data_file_suffix
+        )
+        io.write_data(regionprops, regionprops_file)
+        return regionprops_file
+    except Exception as e:
+        logger.exception(f"Error measuring regionprops in {img_file}: {e}")
+    return None
+
+
 def try_measure_regionprops_from_disk(
     img_files: Sequence[Union[str, PathLike]],
     mask_files: Sequence[Union[str, PathLike]],
     skimage_regionprops: Sequence[str],
     mmap: bool = False,
+    workers: int = 1,
 ) -> Generator[Tuple[Path, Path, pd.DataFrame], None, None]:
-    for img_file, mask_file in zip(img_files, mask_files):
-        try:
-            if mmap:
-                img = io.mmap_image(img_file)
-                mask = io.mmap_mask(mask_file)
-            else:
-                img = io.read_image(img_file)
-                mask = io.read_mask(mask_file)
-            regionprops = measure_regionprops(img, mask, skimage_regionprops)
-            del img, mask
+    for img_file, mask_file, regionprops in zip(
+        img_files,
+        mask_files,
+        map_parallel(
+            partial(
+                _try_measure_regionprops_from_disk,
+                skimage_regionprops=skimage_regionprops,
+                mmap=mmap,
+            ),
+            img_files,
+            mask_files,
+            workers=workers,
+        ),
+    ):
+        if regionprops is not None:
             yield Path(img_file), Path(mask_file), regionprops
             del regionprops
-        except Exception as e:
-            logger.exception(f"Error measuring regionprops in {img_file}: {e}")
+
+
+def try_measure_regionprops_from_disk_to_disk(
+    img_files: Sequence[Union[str, PathLike]],
+    mask_files: Sequence[Union[str, PathLike]],
+    regionprops_dir: Union[str, PathLike],
+    skimage_regionprops: Sequence[str],
+    mmap: bool = False,
+    workers: int = 1,
+) -> Generator[Tuple[Path, Path, Path], None, None]:
+    for img_file, mask_file, regionprops_file in zip(
+        img_files,
+        mask_files,
+        map_parallel(
+            partial(
+                _try_measure_regionprops_from_disk,
+                skimage_regionprops=skimage_regionprops,
+                mmap=mmap,
+                regionprops_dir=regionprops_dir,
+            ),
+            img_files,
+            mask_files,
+            workers=workers,
+        ),
+    ):
+        if regionprops_file is not None:
+            yield Path(img_file), Path(mask_file), regionprops_file
@@ -2,7 +2,6 @@ from pathlib import Path
 
 import click
 import click_log
-import numpy as np
 import pandas as pd
 
 from ... import io
@@ -73,6 +72,14 @@ def panel_cmd(ext_img_dir, panel_file):
     show_default=True,
     help="Use memory mapping for writing images",
 )
+@click.option(
+    "--workers",
+    "workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes",
+)
 @click.option(
     "--imgout",
     "img_dir",
@@ -91,7 +98,7 @@ def panel_cmd(ext_img_dir, panel_file):
 )
 @click_log.simple_verbosity_option(logger=steinbock_logger)
 @catch_exception(handle=SteinbockException)
-def images_cmd(ext_img_dir, panel_file, mmap, img_dir, image_info_file):
+def images_cmd(ext_img_dir, panel_file, mmap, workers, img_dir, image_info_file):
     channel_indices = None
     if Path(panel_file).is_file():
         panel = io.read_panel(panel_file)
@@ -100,43 +107,20 @@ def images_cmd(ext_img_dir, panel_file, mmap, img_dir, image_info_file):
     ext_img_files = external.list_image_files(ext_img_dir)
     image_info_data = []
     Path(img_dir).mkdir(exist_ok=True)
-    for ext_img_file, img in external.try_preprocess_images_from_disk(ext_img_files):
-        # filter channels here rather than in try_preprocess_images_from_disk,
-        # to avoid advanced indexing creating a copy of img (relevant for mmap)
-        if channel_indices is not None:
-            if max(channel_indices) > img.shape[0]:
-                logger.warning(
-                    f"Channel indices out of bounds for file {ext_img_file} "
-                    f"with {img.shape[0]} channels"
-                )
-                continue
-            cur_channel_indices = channel_indices
-        else:
-            cur_channel_indices = list(range(img.shape[0]))
-        img_file = io._as_path_with_suffix(
-            Path(img_dir) / Path(ext_img_file).name, ".tiff"
-        )
-        out_shape = list(img.shape)
-        out_shape[0] = len(cur_channel_indices)
-        out_shape = tuple(out_shape)
-        if mmap:
-            out = io.mmap_image(img_file, mode="r+", shape=out_shape, dtype=img.dtype)
-        else:
-            out = np.empty(out_shape, dtype=img.dtype)
-        for i, channel_index in enumerate(cur_channel_indices):
-            out[i, :, :] = img[channel_index, :, :]
-            if mmap:
-                out.flush()
-        if not mmap:
-            io.write_image(out, img_file)
+    for _, img_file, img_shape in external.try_preprocess_images_from_disk_to_disk(
+        ext_img_files,
+        img_dir,
+        channel_indices=channel_indices,
+        mmap=mmap,
+        workers=workers,
+    ):
         image_info_row = {
             "image": img_file.name,
-            "width_px": img.shape[2],
-            "height_px": img.shape[1],
-            "num_channels": img.shape[0],
+            "width_px": img_shape[2],
+            "height_px": img_shape[1],
+            "num_channels": img_shape[0],
         }
         image_info_data.append(image_info_row)
         logger.info(img_file)
-        del img
     image_info = pd.DataFrame(data=image_info_data)
     io.write_image_info(image_info, image_info_file)
@@ -91,6 +91,14 @@ def imc_cmd_group():
     show_default=True,
     help="Unzip .mcd/.txt files from .zip archives",
 )
+@click.option(
+    "--mcdindex",
+    "mcd_index_file",
+    type=click.Path(dir_okay=False),
+    default="mcd_index.json",
+    show_default=True,
+    help="Path to the IMC .mcd file metadata index (cache)",
+)
 @click.option(
     "-o",
     "panel_file",
@@ -110,6 +118,7 @@ def panel_cmd(
     mcd_dir,
     txt_dir,
     unzip,
+    mcd_index_file,
     panel_file,
 ):
     panel = None
@@ -124,7 +133,9 @@ def panel_cmd(
     if panel is None and Path(mcd_dir).is_dir():
         mcd_files = imc.list_mcd_files(mcd_dir, unzip=unzip)
         if len(mcd_files) > 0:
-            panel = imc.create_panel_from_mcd_files(mcd_files, unzip=unzip)
+            panel = imc.create_panel_from_mcd_files(
+                mcd_files, unzip=unzip, mcd_index_file=mcd_index_file
+            )
     if panel is None and Path(txt_dir).is_dir():
         txt_files = imc.list_txt_files(txt_dir, unzip=unzip)
         if len(txt_files) > 0:
@@ -161,6 +172,14 @@ def panel_cmd(
     show_default=True,
     help="Unzip .mcd/.txt files from .zip archives",
 )
+@click.option(
+    "--mcdindex",
+    "mcd_index_file",
+    type=click.Path(dir_okay=False),
+    default="mcd_index.json",
+    show_default=True,
+    help="Path to the IMC .mcd file metadata index (cache)",
+)
 @click.option(
     "--panel",
     "panel_file",
@@ -175,6 +194,14 @@ def panel_cmd(
     type=click.FLOAT,
     help="Hot pixel filter (specify delta threshold)",
 )
+@click.option(
+    "--workers",
+    "workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes",
+)
 @click.option(
     "--imgout",
     "img_dir",
@@ -191,6 +218,13 @@ def panel_cmd(
     show_default=True,
     help="Path to the image information output file",
 )
+@click.option(
+    "--resume/--no-resume",
+    "resume",
+    default=True,
+    show_default=True,
+    help="Skip unchanged acquisitions with existing images",
+)
 @click.option(
     "--strict",
     "strict",
@@ -202,7 +236,17 @@ def panel_cmd(
 @click_log.simple_verbosity_option(logger=steinbock_logger)
 @catch_exception(handle=SteinbockException)
 def images_cmd(
-    mcd_dir, txt_dir, unzip, panel_file, hpf, img_dir, image_info_file, strict
+    mcd_dir,
+    txt_dir,
+    unzip,
+    mcd_index_file,
+    panel_file,
+    hpf,
+    workers,
+    img_dir,
+    image_info_file,
+    resume,
+    strict,
 ):
     channel_names = None
     if Path(panel_file).is_file():
@@ -211,6 +255,17 @@ def images_cmd(
             channel_names = panel["channel"].tolist()
     image_info_data = []
     Path(img_dir).mkdir(exist_ok=True)
+    # image information is recorded incrementally for resuming interrupted runs
+    manifest_file = Path(img_dir) / imc.image_manifest_file_name
+    image_manifest = {}
+    if resume:
+        image_manifest = imc.read_image_manifest(
+            manifest_file, img_dir, channel_names=channel_names, hpf=hpf
+        )
+    reserved_img_file_names = {
+        record["image_info"]["image"] for record in image_manifest.values()
+    }
+    manifest_records = []
     mcd_files = imc.list_mcd_files(mcd_dir, unzip=unzip)
     txt_files = imc.list_txt_files(txt_dir, unzip=unzip)
     mcd_txt_files = {}
@@ -228,29 +283,65 @@ def images_cmd(
         hpf=hpf,
         unzip=unzip,
         strict=strict,
+        workers=workers,
+        mcd_index_file=mcd_index_file,
+        image_manifest=image_manifest,
     ):
         img_file_stem = Path(mcd_or_txt_file).stem
         if acquisition is not None:
             img_file_stem += f"_{acquisition.id:03d}"
+        orig_img_file_stem = img_file_stem
         if img_file_stem in mcd_txt_files:
             num_dupl += 1
             first_mcd_txt_file = mcd_txt_files[img_file_stem][0]
+            mcd_txt_files[img_file_stem].append(mcd_or_txt_file)
             img_file_stem = f"DUPLICATE{num_dupl:03d}_{img_file_stem}"
             logger.warning(
                 f"File {mcd_or_txt_file} is a duplicate of {first_mcd_txt_file}, "
                 f"saving as {img_file_stem}"
             )
-            mcd_txt_files[img_file_stem].append(mcd_or_txt_file)
         else:
             mcd_txt_files[img_file_stem] = [mcd_or_txt_file]
-        img_file = Path(img_dir) / f"{img_file_stem}.tiff"
+        if img is None:  # unchanged, see image manifest
+            record = image_manifest[
+                imc.create_image_manifest_key(
+                    mcd_or_txt_file,
+                    acquisition.id if acquisition is not None else None,
+                    channel_names=channel_names,
+                    hpf=hpf,
+                )
+            ]
+            img_file = Path(img_dir) / record["image_info"]["image"]
+            image_info_data.append(record["image_info"])
+            manifest_records.append(record)
+            logger.info(f"{img_file} (unchanged)")
+            continue
+        while f"{img_file_stem}{io.image_file_suffix}" in reserved_img_file_names:
+            num_dupl += 1
+            img_file_stem = f"DUPLICATE{num_dupl:03d}_{orig_img_file_stem}"
+            logger.warning(
+                f"Image name of file {mcd_or_txt_file} is taken by an unchanged "
+                f"image, saving as {img_file_stem}"
+            )
+        img_file = Path(img_dir) / f"{img_file_stem}{io.image_file_suffix}"
         io.write_image(img, img_file)
         image_info_row = imc.create_image_info(
             mcd_or_txt_file, acquisition, img, recovery_txt_file, recovered, img_file
         )
         image_info_data.append(image_info_row)
+        record = imc.create_image_manifest_record(
+            mcd_or_txt_file,
+            acquisition,
+            image_info_row,
+            img_file,
+            channel_names=channel_names,
+            hpf=hpf,
+        )
+        imc.append_image_manifest_record(record, manifest_file)
+        manifest_records.append(record)
         logger.info(img_file)
         del img
     image_info = pd.DataFrame(data=image_info_data)
     io.write_image_info(image_info, image_info_file)
+    imc.write_image_manifest(manifest_records, manifest_file)
     logger.info(image_info_file)
@@ -1,13 +1,15 @@
 import logging
+from functools import partial
 from os import PathLike
 from pathlib import Path
-from typing import Generator, List, Sequence, Tuple, Union
+from typing import Generator, List, Optional, Sequence, Tuple, Union
 
 import imageio
 import numpy as np
 import pandas as pd
 
 from .. import io
+from .._parallel import map_parallel
 from ._preprocessing import SteinbockPreprocessingException
 
 logger = logging.getLogger(__name__)
@@ -38,6 +40,17 @@ def _read_external_image(ext_img_file: Union[str, PathLike]) -> np.ndarray:
     return ext_img
 
 
+def _read_external_image_shape(
+    ext_img_file: Union[str, PathLike]
+) -> Tuple[int, int, int]:
+    # try reading the image header first, without decoding the image data
+    try:
+        return io.open_image(ext_img_file, native_dtype=True).shape
+    except Exception:
+        pass  # skipped intentionally
+    return _read_external_image(ext_img_file).shape
+
+
 def list_image_files(ext_img_dir: Union[str, PathLike]) -> List[Path]:
     return sorted(Path(ext_img_dir).rglob("[!.]*.*"))
 
@@ -48,8 +61,7 @@ def create_panel_from_image_files(
     num_channels = None
     for ext_img_file in ext_img_files:
         try:
-            ext_img = _read_external_image(ext_img_file)
-            num_channels = ext_img.shape[0]
+            num_channels = _read_external_image_shape(ext_img_file)[0]
             break
         except Exception:
             pass  # skipped intentionally
@@ -74,14 +86,86 @@ def create_panel_from_image_files(
     return panel
 
 
+def _try_read_external_image(
+    ext_img_file: Union[str, PathLike]
+) -> Optional[np.ndarray]:
+    try:
+        return _read_external_image(ext_img_file)
+    except Exception:
+        logger.warning(f"Unsupported file format: {ext_img_file}")
+    return None
+
+
+def _try_preprocess_image_from_disk_to_disk(
+    ext_img_file: Union[str, PathLike],
+    img_dir: Union[str, PathLike],
+    channel_indices: Optional[Sequence[int]] = None,
+    mmap: bool = False,
+) -> Optional[Tuple[Path, Tuple[int, ...]]]:
+    img = _try_read_external_image(ext_img_file)
+    if img is None:
+        return None
+    # filter channels here rather than in _read_external_image,
+    # to avoid advanced indexing creating a copy of img (relevant for mmap)
+    if channel_indices is not None:
+        if max(channel_indices) > img.shape[0]:
+            logger.warning(
+                f"Channel indices out of bounds for file {ext_img_file} "
+                f"with {img.shape[0]} channels"
+            )
+            return None
+    else:
+        channel_indices = list(range(img.shape[0]))
+    img_file = io._as_path_with_suffix(
+        Path(img_dir) / Path(ext_img_file).name, io.image_file_suffix
+    )
+    out_shape = (len(channel_indices),) + img.shape[1:]
+    if mmap:
+        out = io.mmap_image(img_file, mode="r+", shape=out_shape, dtype=img.dtype)
+    else:
+        out = np.empty(out_shape, dtype=img.dtype)
+    for i, channel_index in enumerate(channel_indices):
+        out[i, :, :] = img[channel_index, :, :]
+        if isinstance(out, np.memmap):
+            out.flush()
+    if not mmap:
+        io.write_image(out, img_file)
+    del out
+    return img_file, img.shape
+
+
 def try_preprocess_images_from_disk(
-    ext_img_files: Sequence[Union[str, PathLike]]
+    ext_img_files: Sequence[Union[str, PathLike]], workers: int = 1
 ) -> Generator[Tuple[Path, np.ndarray], None, None]:
-    for ext_img_file in ext_img_files:
-        try:
-            img = _read_external_image(ext_img_file)
-        except Exception:
-            logger.warning(f"Unsupported file format: {ext_img_file}")
-            continue
-        yield Path(ext_img_file), img
-        del img
+    for ext_img_file, img in zip(
+        ext_img_files,
+        map_parallel(_try_read_external_image, ext_img_files, workers=workers),
+    ):
+        if img is not None:
+            yield Path(ext_img_file), img
+            del img
+
+
+def try_preprocess_images_from_disk_to_disk(
+    ext_img_files: Sequence[Union[str, PathLike]],
+    img_dir: Union[str, PathLike],
+    channel_indices: Optional[Sequence[int]] = None,
+    mmap: bool = False,
+    workers: int = 1,
+) -> Generator[Tuple[Path, Path, Tuple[int, ...]], None, None]:
+    for ext_img_file, result in zip(
+        ext_img_files,
+        map_parallel(
+            partial(
+                _try_preprocess_image_from_disk_to_disk,
+                img_dir=img_dir,
+                channel_indices=channel_indices,
+                mmap=mmap,
+            ),
+            ext_img_files,
+            workers=workers,
+        ),
+    ):
+        if result is not None:
+            img_file, img_shape = result
+            yield Path(ext_img_file), img_file, img_shape
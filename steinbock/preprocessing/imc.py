@@ -1,21 +1,42 @@
+import itertools
+import json
 import logging
+import mmap
 import re
+import struct
+from contextlib import contextmanager
+from dataclasses import replace
+from functools import partial
+from io import TextIOWrapper
 from os import PathLike
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Any, Dict, Generator, List, Optional, Sequence, Tuple, Union
-from zipfile import ZipFile
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Generator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from zipfile import ZIP_STORED, ZipFile
 
 import numpy as np
 import pandas as pd
 from scipy.ndimage import maximum_filter
 
 from .. import io
+from .._parallel import map_parallel
 from ._preprocessing import SteinbockPreprocessingException
 
 try:
     from readimc import MCDFile, TXTFile
-    from readimc.data import Acquisition, AcquisitionBase
+    from readimc.data import Acquisition, AcquisitionBase, Slide
+    from readimc.mcd_parser import MCDParser
 
     imc_available = True
 except Exception:
@@ -37,6 +58,284 @@ def _get_zip_file_member(path: Union[str, PathLike]) -> Optional[Tuple[Path, str
     return None
 
 
+def _get_stored_zip_file_member(
+    path: Union[str, PathLike]
+) -> Optional[Tuple[Path, int, int]]:
+    # stored (uncompressed, unencrypted) members can be read in place
+    zip_file_member = _get_zip_file_member(path)
+    if zip_file_member is None:
+        return None
+    zip_file, member = zip_file_member
+    with ZipFile(zip_file) as fzip:
+        zip_info = fzip.getinfo(member)
+    if zip_info.compress_type != ZIP_STORED or zip_info.flag_bits & 0x1:
+        return None
+    with Path(zip_file).open(mode="rb") as f:
+        f.seek(zip_info.header_offset)
+        local_header = f.read(30)
+    if len(local_header) != 30 or local_header[:4] != b"PK\x03\x04":
+        return None
+    name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+    member_offset = zip_info.header_offset + 30 + name_length + extra_length
+    return zip_file, member_offset, zip_info.file_size
+
+
+_mcd_schema_start = "<MCDSchema".encode("utf-16-le")
+_mcd_schema_end = "</MCDSchema>".encode("utf-16-le")
+
+
+def _find_mcd_schema_xml(data: Any, start: int, end: int) -> str:
+    # like readimc, take the last schema (older files contain multiple ones)
+    schema_start = data.rfind(_mcd_schema_start, start, end)
+    if schema_start == -1:
+        raise IOError("MCD file corrupted: start of XML document not found")
+    schema_end = data.rfind(_mcd_schema_end, schema_start, end)
+    if schema_end == -1:
+        raise IOError("MCD file corrupted: end of XML document not found")
+    schema_end += len(_mcd_schema_end)
+    return bytes(data[schema_start:schema_end]).decode("utf-16-le")
+
+
+def _stream_mcd_schema_xml(f: IO[bytes], chunk_size: int = 2**24) -> str:
+    # only data following the last schema start is kept in memory
+    schema_xml = None
+    pending = bytearray()
+    in_schema = False
+    chunk = f.read(chunk_size)
+    while len(chunk) > 0:
+        pending += chunk
+        while True:
+            if not in_schema:
+                schema_start = pending.find(_mcd_schema_start)
+                if schema_start == -1:
+                    del pending[: max(0, len(pending) - len(_mcd_schema_start) + 1)]
+                    break
+                del pending[:schema_start]
+                in_schema = True
+            schema_end = pending.find(_mcd_schema_end)
+            next_schema_start = pending.find(_mcd_schema_start, 1)
+            if next_schema_start != -1 and (
+                schema_end == -1 or next_schema_start < schema_end
+            ):
+                del pending[:next_schema_start]
+                continue
+            if schema_end == -1:
+                break
+            schema_end += len(_mcd_schema_end)
+            schema_xml = bytes(pending[:schema_end]).decode("utf-16-le")
+            del pending[:schema_end]
+            in_schema = False
+        chunk = f.read(chunk_size)
+    if schema_xml is None:
+        raise IOError("MCD file corrupted: XML document not found")
+    return schema_xml
+
+
+if imc_available:
+
+    class _MCDDataFile(MCDFile):
+        # reads acquisition data using already parsed metadata, i.e. without
+        # locating and parsing the schema again
+        def open(self) -> None:
+            if self._fh is not None:
+                self._fh.close()
+            self._fh = open(self._path, mode="rb")
+
+    class _ZipMemberTXTFile(TXTFile):
+        # .txt file member of a .zip archive, streamed from the archive
+        def __init__(self, fzip: ZipFile, txt_member: str) -> None:
+            super().__init__(Path(str(fzip.filename)) / txt_member)
+            self._fzip = fzip
+            self._txt_member = txt_member
+
+        def open(self) -> None:
+            if self._fh is not None:
+                self._fh.close()
+            self._fh = TextIOWrapper(self._fzip.open(self._txt_member))
+            (
+                self._num_channels,
+                self._channel_metals,
+                self._channel_masses,
+                self._channel_labels,
+            ) = self._read_channels()
+
+
+@contextmanager
+def _open_txt_file(txt_file: Union[str, PathLike]) -> Generator["TXTFile", None, None]:
+    zip_file_txt_member = _get_zip_file_member(txt_file)
+    if zip_file_txt_member is not None:
+        zip_file, txt_member = zip_file_txt_member
+        with ZipFile(zip_file) as fzip:
+            with _ZipMemberTXTFile(fzip, txt_member) as f:
+                yield f
+    else:
+        with TXTFile(txt_file) as f:
+            yield f
+
+
+def _read_mcd_schema_xml(mcd_file: Union[str, PathLike]) -> str:
+    zip_file_mcd_member = _get_zip_file_member(mcd_file)
+    if zip_file_mcd_member is None:
+        with Path(mcd_file).open(mode="rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _find_mcd_schema_xml(mm, 0, len(mm))
+    stored_zip_file_mcd_member = _get_stored_zip_file_member(mcd_file)
+    if stored_zip_file_mcd_member is not None:
+        zip_file, member_offset, member_size = stored_zip_file_mcd_member
+        with Path(zip_file).open(mode="rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _find_mcd_schema_xml(
+                    mm, member_offset, member_offset + member_size
+                )
+    # compressed members cannot be read in place, stream the schema instead
+    zip_file, mcd_member = zip_file_mcd_member
+    with ZipFile(zip_file) as fzip:
+        with fzip.open(mcd_member) as f:
+            return _stream_mcd_schema_xml(f)
+
+
+def _stat_imc_file(path: Union[str, PathLike]) -> Tuple[int, int]:
+    # .zip archive members are considered modified if the archive is modified
+    zip_file_member = _get_zip_file_member(path)
+    if zip_file_member is not None:
+        path = zip_file_member[0]
+    stat_result = Path(path).stat()
+    return stat_result.st_size, stat_result.st_mtime_ns
+
+
+def _create_mcd_index_entry(
+    mcd_file: Union[str, PathLike], slides: Sequence["Slide"]
+) -> Dict[str, Any]:
+    size, mtime_ns = _stat_imc_file(mcd_file)
+    return {
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "slides": [
+            {
+                "id": slide.id,
+                "metadata": slide.metadata,
+                "acquisitions": [
+                    {
+                        "id": acquisition.id,
+                        "roi_points_um": acquisition.roi_points_um,
+                        "metadata": acquisition.metadata,
+                        "num_channels": acquisition.num_channels,
+                        "channel_metals": acquisition.channel_metals,
+                        "channel_masses": acquisition.channel_masses,
+                        "channel_labels": acquisition.channel_labels,
+                    }
+                    for acquisition in slide.acquisitions
+                ],
+            }
+            for slide in slides
+        ],
+    }
+
+
+def _parse_mcd_index_entry(mcd_index_entry: Dict[str, Any]) -> List["Slide"]:
+    slides = []
+    for slide_data in mcd_index_entry["slides"]:
+        slide = Slide(slide_data["id"], slide_data["metadata"])
+        for acquisition_data in slide_data["acquisitions"]:
+            roi_points_um = acquisition_data["roi_points_um"]
+            if roi_points_um is not None:
+                roi_points_um = tuple(tuple(point) for point in roi_points_um)
+            acquisition = Acquisition(
+                slide,
+                None,  # panoramas are not indexed
+                acquisition_data["id"],
+                roi_points_um,
+                acquisition_data["metadata"],
+                acquisition_data["num_channels"],
+                _channel_metals=acquisition_data["channel_metals"],
+                _channel_masses=acquisition_data["channel_masses"],
+                _channel_labels=acquisition_data["channel_labels"],
+            )
+            slide.acquisitions.append(acquisition)
+        slides.append(slide)
+    return slides
+
+
+def _read_mcd_index(mcd_index_file: Union[str, PathLike]) -> Dict[str, Any]:
+    if not Path(mcd_index_file).is_file():
+        return {}
+    try:
+        with Path(mcd_index_file).open(mode="r") as f:
+            mcd_index = json.load(f)
+        if isinstance(mcd_index, dict):
+            return mcd_index
+    except Exception as e:
+        logger.warning(f"Error reading MCD index {mcd_index_file}: {e}")
+    return {}
+
+
+def _write_mcd_index(
+    mcd_index: Dict[str, Any], mcd_index_file: Union[str, PathLike]
+) -> None:
+    # write to a temporary file first to not leave behind a truncated index
+    temp_mcd_index_file = Path(mcd_index_file).with_name(
+        f".{Path(mcd_index_file).name}.tmp"
+    )
+    try:
+        with temp_mcd_index_file.open(mode="w") as f:
+            json.dump(mcd_index, f)
+        temp_mcd_index_file.replace(mcd_index_file)
+    except Exception as e:
+        logger.warning(f"Error writing MCD index {mcd_index_file}: {e}")
+
+
+def _read_mcd_slides(
+    mcd_file: Union[str, PathLike], mcd_index: Optional[Dict[str, Any]] = None
+) -> List["Slide"]:
+    # only reads the schema (metadata), or takes it from the index if the
+    # file has not changed since indexing (same size and modification time)
+    mcd_index_key = str(Path(mcd_file).absolute())
+    if mcd_index is not None and mcd_index_key in mcd_index:
+        mcd_index_entry = mcd_index[mcd_index_key]
+        try:
+            current_mcd_index_entry = _create_mcd_index_entry(mcd_file, [])
+            if (
+                mcd_index_entry["size"] == current_mcd_index_entry["size"]
+                and mcd_index_entry["mtime_ns"] == current_mcd_index_entry["mtime_ns"]
+            ):
+                return _parse_mcd_index_entry(mcd_index_entry)
+        except Exception as e:
+            logger.warning(f"Invalid MCD index entry for file {mcd_file}: {e}")
+    slides = MCDParser(_read_mcd_schema_xml(mcd_file)).parse_slides()
+    if mcd_index is not None:
+        mcd_index[mcd_index_key] = _create_mcd_index_entry(mcd_file, slides)
+    return slides
+
+
+def _read_mcd_acquisition(
+    mcd_file: Union[str, PathLike], acquisition: "Acquisition", strict: bool = False
+) -> np.ndarray:
+    stored_zip_file_mcd_member = _get_stored_zip_file_member(mcd_file)
+    if stored_zip_file_mcd_member is not None:
+        zip_file, member_offset, member_size = stored_zip_file_mcd_member
+        # data offsets are relative to the start of the member
+        metadata = dict(acquisition.metadata)
+        for key in ("DataStartOffset", "DataEndOffset"):
+            if key in metadata:
+                offset = int(metadata[key])
+                if offset > member_size:
+                    raise IOError(
+                        f"MCD file corrupted: {key} ({offset}) "
+                        f"exceeds file size ({member_size})"
+                    )
+                metadata[key] = str(member_offset + offset)
+        acquisition = replace(acquisition, metadata=metadata)
+        mcd_file = zip_file
+    with _MCDDataFile(mcd_file) as f:
+        return f.read_acquisition(acquisition, strict=strict)
+
+
+def _detach_acquisition(acquisition: "Acquisition") -> "Acquisition":
+    # drops references to other acquisitions, e.g. for sending to workers
+    slide = replace(acquisition.slide, panoramas=[], acquisitions=[])
+    return replace(acquisition, slide=slide, panorama=None)
+
+
 def list_mcd_files(mcd_dir: Union[str, PathLike], unzip: bool = False) -> List[Path]:
     mcd_files = sorted(Path(mcd_dir).rglob("[!.]*.mcd"))
     if unzip:
@@ -94,16 +393,14 @@ def create_panel_from_imc_panel(
     imc_panel_keep_col: str = "full",
     imc_panel_ilastik_col: str = "ilastik",
 ) -> pd.DataFrame:
-    imc_panel = pd.read_csv(
+    imc_panel = io._read_csv(
         imc_panel_file,
-        sep=",|;",
         dtype={
             imc_panel_channel_col: pd.StringDtype(),
             imc_panel_name_col: pd.StringDtype(),
             imc_panel_keep_col: pd.BooleanDtype(),
             imc_panel_ilastik_col: pd.BooleanDtype(),
         },
-        engine="python",
         true_values=["1"],
         false_values=["0"],
     )
@@ -148,47 +445,52 @@ def create_panel_from_imc_panel(
 
 
 def create_panels_from_mcd_file(mcd_file: Union[str, PathLike]) -> List[pd.DataFrame]:
+    return _create_panels_from_slides(_read_mcd_slides(mcd_file))
+
+
+def _create_panels_from_slides(slides: Sequence["Slide"]) -> List[pd.DataFrame]:
     panels = []
-    with MCDFile(mcd_file) as f:
-        for slide in f.slides:
-            for acquisition in slide.acquisitions:
-                panel = pd.DataFrame(
-                    data={
-                        "channel": pd.Series(
-                            data=acquisition.channel_names,
-                            dtype=pd.StringDtype(),
-                        ),
-                        "name": pd.Series(
-                            data=acquisition.channel_labels,
-                            dtype=pd.StringDtype(),
-                        ),
-                    },
-                )
-                panels.append(panel)
+    for slide in slides:
+        for acquisition in slide.acquisitions:
+            panel = pd.DataFrame(
+                data={
+                    "channel": pd.Series(
+                        data=acquisition.channel_names,
+                        dtype=pd.StringDtype(),
+                    ),
+                    "name": pd.Series(
+                        data=acquisition.channel_labels,
+                        dtype=pd.StringDtype(),
+                    ),
+                },
+            )
+            panels.append(panel)
     return panels
 
 
 def create_panel_from_mcd_files(
-    mcd_files: Sequence[Union[str, PathLike]], unzip: bool = False
+    mcd_files: Sequence[Union[str, PathLike]],
+    unzip: bool = False,
+    mcd_index_file: Union[str, PathLike, None] = None,
 ) -> pd.DataFrame:
+    mcd_index = None
+    if mcd_index_file is not None:
+        mcd_index = _read_mcd_index(mcd_index_file)
     panels = []
     for mcd_file in mcd_files:
         zip_file_mcd_member = _get_zip_file_member(mcd_file)
-        if zip_file_mcd_member is None:
-            panels += create_panels_from_mcd_file(mcd_file)
-        elif unzip:
-            zip_file, mcd_member = zip_file_mcd_member
-            with ZipFile(zip_file) as fzip:
-                with TemporaryDirectory() as temp_dir:
-                    extracted_mcd_file = fzip.extract(mcd_member, path=temp_dir)
-                    panels += create_panels_from_mcd_file(extracted_mcd_file)
+        if zip_file_mcd_member is None or unzip:
+            slides = _read_mcd_slides(mcd_file, mcd_index=mcd_index)
+            panels += _create_panels_from_slides(slides)
+    if mcd_index_file is not None:
+        _write_mcd_index(mcd_index, mcd_index_file)
     panel = pd.concat(panels, ignore_index=True, copy=False)
     panel.drop_duplicates(inplace=True, ignore_index=True)
     return _clean_panel(panel)
 
 
 def create_panel_from_txt_file(txt_file: Union[str, PathLike]) -> pd.DataFrame:
-    with TXTFile(txt_file) as f:
+    with _open_txt_file(txt_file) as f:
         return pd.DataFrame(
             data={
                 "channel": pd.Series(data=f.channel_names, dtype=pd.StringDtype()),
@@ -203,16 +505,9 @@ def create_panel_from_txt_files(
     panels = []
     for txt_file in txt_files:
         zip_file_txt_member = _get_zip_file_member(txt_file)
-        if zip_file_txt_member is None:
+        if zip_file_txt_member is None or unzip:
             panel = create_panel_from_txt_file(txt_file)
             panels.append(panel)
-        elif unzip:
-            zip_file, txt_member = zip_file_txt_member
-            with ZipFile(zip_file) as fzip:
-                with TemporaryDirectory() as temp_dir:
-                    extracted_txt_file = fzip.extract(txt_member, path=temp_dir)
-                    panel = create_panel_from_txt_file(extracted_txt_file)
-                    panels.append(panel)
     panel = pd.concat(panels, ignore_index=True, copy=False)
     panel.drop_duplicates(inplace=True, ignore_index=True)
     return _clean_panel(panel)
@@ -279,19 +574,47 @@ def _get_channel_indices(
     return channel_indices
 
 
+_txt_file_name_pattern = re.compile(r"(?P<prefix>.*)_0*(?P<acquisition_id>\d+)\.txt")
+
+
+def _get_txt_file_index_keys(txt_file: Union[str, PathLike]) -> List[Tuple[str, int]]:
+    # a .txt file matches an .mcd file acquisition if its name starts with the
+    # .mcd file stem and ends with _{acquisition id}.txt (with leading zeros),
+    # so the .txt file is indexed for all possible .mcd file stems (prefixes)
+    m = _txt_file_name_pattern.fullmatch(Path(txt_file).name)
+    if m is None:
+        return []
+    prefix = m.group("prefix")
+    acquisition_id = int(m.group("acquisition_id"))
+    return [(prefix[:i], acquisition_id) for i in range(len(prefix) + 1)]
+
+
+def _index_txt_files(
+    txt_files: Sequence[Union[str, PathLike]]
+) -> Dict[Tuple[str, int], Dict[Union[str, PathLike], None]]:
+    txt_file_index: Dict[Tuple[str, int], Dict[Union[str, PathLike], None]] = {}
+    for txt_file in txt_files:
+        for key in _get_txt_file_index_keys(txt_file):
+            txt_file_index.setdefault(key, {})[txt_file] = None
+    return txt_file_index
+
+
+def _unindex_txt_file(
+    txt_file_index: Dict[Tuple[str, int], Dict[Union[str, PathLike], None]],
+    txt_file: Union[str, PathLike],
+) -> None:
+    for key in _get_txt_file_index_keys(txt_file):
+        txt_file_index[key].pop(txt_file, None)
+
+
 def _match_txt_file(
     mcd_file: Union[str, PathLike],
     acquisition: Acquisition,
-    txt_files: Sequence[Union[str, PathLike]],
+    txt_file_index: Dict[Tuple[str, int], Dict[Union[str, PathLike], None]],
 ) -> Union[str, PathLike, None]:
-    txt_file_name_pattern = re.compile(
-        rf"{Path(mcd_file).stem}.*_0*{acquisition.id}.txt"
+    filtered_txt_files = list(
+        txt_file_index.get((Path(mcd_file).stem, acquisition.id), {})
     )
-    filtered_txt_files = [
-        txt_file
-        for txt_file in txt_files
-        if txt_file_name_pattern.match(Path(txt_file).name)
-    ]
     if len(filtered_txt_files) == 1:
         return filtered_txt_files[0]
     if len(filtered_txt_files) > 1:
@@ -310,7 +633,7 @@ def _try_preprocess_txt_image_from_disk(
 ) -> Optional[np.ndarray]:
     try:
         channel_ind = None
-        with TXTFile(txt_file) as f:
+        with _open_txt_file(txt_file) as f:
             if channel_names is not None:
                 channel_ind = _get_channel_indices(f, channel_names)
                 if isinstance(channel_ind, str):
@@ -328,86 +651,341 @@ def _try_preprocess_txt_image_from_disk(
         return None
 
 
-def _try_preprocess_mcd_images_from_disk(
+def _try_preprocess_txt_image_from_disk_or_zip(
+    txt_file: Union[str, PathLike],
+    channel_names: Optional[Sequence[str]] = None,
+    hpf: Optional[float] = None,
+    unzip: bool = False,
+) -> Optional[np.ndarray]:
+    if _get_zip_file_member(txt_file) is None or unzip:
+        return _try_preprocess_txt_image_from_disk(
+            txt_file, channel_names=channel_names, hpf=hpf
+        )
+    return None
+
+
+def _try_preprocess_mcd_image_from_disk(
     mcd_file: Union[str, PathLike],
-    candidate_txt_files: List[Union[str, PathLike]],
+    acquisition: "Acquisition",
+    recovery_txt_file: Optional[Path],
     channel_names: Optional[Sequence[str]] = None,
     hpf: Optional[float] = None,
     unzip: bool = False,
     strict: bool = False,
-) -> Generator[Tuple[Acquisition, np.ndarray, Optional[Path], bool], None, None]:
+) -> Optional[Tuple[np.ndarray, bool]]:
+    acquisition_id = acquisition.id
     try:
-        with MCDFile(mcd_file) as f_mcd:
-            for slide in f_mcd.slides:
-                for acquisition in slide.acquisitions:
-                    recovery_txt_file = _match_txt_file(
-                        mcd_file, acquisition, candidate_txt_files
-                    )
-                    if recovery_txt_file is not None:
-                        candidate_txt_files.remove(recovery_txt_file)
-                        recovery_txt_file = Path(recovery_txt_file)
-                    channel_ind = None
-                    if channel_names is not None:
-                        channel_ind = _get_channel_indices(acquisition, channel_names)
-                        if isinstance(channel_ind, str):
-                            logger.warning(
-                                f"Channel {channel_ind} not found for acquisition "
-                                f"{acquisition.id} in file {mcd_file}; skipping"
-                            )
-                            continue
-                    try:
-                        img = f_mcd.read_acquisition(acquisition, strict=strict)
-                        if channel_ind is not None:
-                            img = img[channel_ind, :, :]
-                        img = preprocess_image(img, hpf=hpf)
-                        yield acquisition, img, recovery_txt_file, False
-                        del img
-                    except Exception as e:
-                        logger.warning(
-                            f"Error reading acquisition {acquisition.id} "
-                            f"from file {mcd_file}: {e}"
-                        )
-                        if recovery_txt_file is not None:
-                            logger.warning(f"Recovering from file {recovery_txt_file}")
-                            zip_file_txt_member = _get_zip_file_member(
-                                recovery_txt_file
-                            )
-                            if zip_file_txt_member is None:
-                                img = _try_preprocess_txt_image_from_disk(
-                                    recovery_txt_file,
-                                    channel_names=channel_names,
-                                    hpf=hpf,
-                                )
-                                if img is not None:
-                                    yield acquisition, img, recovery_txt_file, True
-                                    del img
-                            elif unzip:
-                                zip_file, txt_member = zip_file_txt_member
-                                with ZipFile(zip_file) as fzip:
-                                    with TemporaryDirectory() as temp_dir:
-                                        extracted_recovery_txt_file = fzip.extract(
-                                            txt_member, path=temp_dir
-                                        )
-                                        img = _try_preprocess_txt_image_from_disk(
-                                            extracted_recovery_txt_file,
-                                            channel_names=channel_names,
-                                            hpf=hpf,
-                                        )
-                                        if img is not None:
-                                            yield (
-                                                acquisition,
-                                                img,
-                                                recovery_txt_file,
-                                                True,
-                                            )
-                                            del img
-                        else:
-                            logger.warning(
-                                f"No corresponding recovery text file was found for acquisition {acquisition.id} in file {mcd_file}"
-                            )
-
+        channel_ind = None
+        if channel_names is not None:
+            channel_ind = _get_channel_indices(acquisition, channel_names)
+            if isinstance(channel_ind, str):
+                logger.warning(
+                    f"Channel {channel_ind} not found for acquisition "
+                    f"{acquisition_id} in file {mcd_file}; skipping"
+                )
+                return None
+        img = _read_mcd_acquisition(mcd_file, acquisition, strict=strict)
+        if channel_ind is not None:
+            img = img[channel_ind, :, :]
+        return preprocess_image(img, hpf=hpf), False
     except Exception as e:
-        logger.exception(f"Error reading file {mcd_file}: {e}")
+        logger.warning(
+            f"Error reading acquisition {acquisition_id} from file {mcd_file}: {e}"
+        )
+    if recovery_txt_file is None:
+        logger.warning(
+            "No corresponding recovery text file was found "
+            f"for acquisition {acquisition_id} in file {mcd_file}"
+        )
+        return None
+    logger.warning(f"Recovering from file {recovery_txt_file}")
+    img = _try_preprocess_txt_image_from_disk_or_zip(
+        recovery_txt_file, channel_names=channel_names, hpf=hpf, unzip=unzip
+    )
+    if img is None:
+        return None
+    return img, True
+
+
+def _try_preprocess_image_from_disk(
+    mcd_txt_file: Union[str, PathLike],
+    acquisition: Optional["Acquisition"],
+    recovery_txt_file: Optional[Path],
+    channel_names: Optional[Sequence[str]] = None,
+    hpf: Optional[float] = None,
+    unzip: bool = False,
+    strict: bool = False,
+) -> Optional[Tuple[np.ndarray, bool]]:
+    if acquisition is not None:
+        return _try_preprocess_mcd_image_from_disk(
+            mcd_txt_file,
+            acquisition,
+            recovery_txt_file,
+            channel_names=channel_names,
+            hpf=hpf,
+            unzip=unzip,
+            strict=strict,
+        )
+    img = _try_preprocess_txt_image_from_disk_or_zip(
+        mcd_txt_file, channel_names=channel_names, hpf=hpf, unzip=unzip
+    )
+    if img is None:
+        return None
+    return img, False
+
+
+image_manifest_file_name = ".steinbock_imc_manifest.jsonl"
+
+
+def _is_skipped(
+    mcd_txt_file: Union[str, PathLike],
+    acquisition_id: Optional[int],
+    image_manifest: Optional[Dict[str, Dict[str, Any]]],
+    channel_names: Optional[Sequence[str]] = None,
+    hpf: Optional[float] = None,
+) -> bool:
+    if image_manifest is None or len(image_manifest) == 0:
+        return False
+    try:
+        key = create_image_manifest_key(
+            mcd_txt_file, acquisition_id, channel_names=channel_names, hpf=hpf
+        )
+    except OSError:
+        return False
+    return key in image_manifest
+
+
+def create_image_manifest_key(
+    mcd_txt_file: Union[str, PathLike],
+    acquisition_id: Optional[int],
+    channel_names: Optional[Sequence[str]] = None,
+    hpf: Optional[float] = None,
+) -> str:
+    size, mtime_ns = _stat_imc_file(mcd_txt_file)
+    if channel_names is not None:
+        channel_names = list(channel_names)
+    return json.dumps(
+        [
+            str(Path(mcd_txt_file).absolute()),
+            size,
+            mtime_ns,
+            acquisition_id,
+            channel_names,
+            hpf,
+            io.img_dtype.name,
+            io.img_storage,
+        ]
+    )
+
+
+def _stat_image_file(img_file: Union[str, PathLike]) -> Tuple[int, int]:
+    # for directories (e.g. Zarr stores), the total size and the latest
+    # modification time of all contained files and directories are used,
+    # such that modified, added or removed (e.g. chunk) files are detected
+    img_stat_result = Path(img_file).stat()
+    size, mtime_ns = img_stat_result.st_size, img_stat_result.st_mtime_ns
+    if Path(img_file).is_dir():
+        size = 0
+        for path in Path(img_file).rglob("*"):
+            stat_result = path.stat()
+            if path.is_file():
+                size += stat_result.st_size
+            mtime_ns = max(mtime_ns, stat_result.st_mtime_ns)
+    return size, mtime_ns
+
+
+def create_image_manifest_record(
+    mcd_txt_file: Union[str, PathLike],
+    acquisition: Optional[Acquisition],
+    image_info_row: Dict[str, Any],
+    img_file: Union[str, PathLike],
+    channel_names: Optional[Sequence[str]] = None,
+    hpf: Optional[float] = None,
+) -> Dict[str, Any]:
+    acquisition_id = acquisition.id if acquisition is not None else None
+    img_file_size, img_file_mtime_ns = _stat_image_file(img_file)
+    return {
+        "key": create_image_manifest_key(
+            mcd_txt_file, acquisition_id, channel_names=channel_names, hpf=hpf
+        ),
+        "source_file": str(Path(mcd_txt_file).absolute()),
+        "acquisition_id": acquisition_id,
+        "image_file_size": img_file_size,
+        "image_file_mtime_ns": img_file_mtime_ns,
+        "image_info": image_info_row,
+    }
+
+
+def _is_image_manifest_record_valid(
+    record: Dict[str, Any],
+    img_dir: Union[str, PathLike],
+    channel_names: Optional[Sequence[str]] = None,
+    hpf: Optional[float] = None,
+) -> bool:
+    try:
+        img_file_name = record["image_info"]["image"]
+        if not img_file_name.endswith(io.image_file_suffix):
+            return False
+        img_file_size, img_file_mtime_ns = _stat_image_file(
+            Path(img_dir) / img_file_name
+        )
+        if (
+            img_file_size != record["image_file_size"]
+            or img_file_mtime_ns != record["image_file_mtime_ns"]
+        ):
+            return False
+        # source file, acquisition and preprocessing settings are unchanged
+        return record["key"] == create_image_manifest_key(
+            record["source_file"],
+            record["acquisition_id"],
+            channel_names=channel_names,
+            hpf=hpf,
+        )
+    except (OSError, KeyError, TypeError, AttributeError):
+        return False
+
+
+def read_image_manifest(
+    manifest_file: Union[str, PathLike],
+    img_dir: Union[str, PathLike],
+    channel_names: Optional[Sequence[str]] = None,
+    hpf: Optional[float] = None,
+) -> Dict[str, Dict[str, Any]]:
+    # returns records of unchanged acquisitions with unchanged images by key;
+    # records are appended, incomplete ones (e.g. after crashes) are ignored
+    records: Dict[str, Dict[str, Any]] = {}
+    if not Path(manifest_file).is_file():
+        return records
+    with Path(manifest_file).open(mode="r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                records[record["key"]] = record
+            except (ValueError, KeyError, TypeError):
+                pass
+    return {
+        key: record
+        for key, record in records.items()
+        if _is_image_manifest_record_valid(
+            record, img_dir, channel_names=channel_names, hpf=hpf
+        )
+    }
+
+
+def append_image_manifest_record(
+    record: Dict[str, Any], manifest_file: Union[str, PathLike]
+) -> None:
+    with Path(manifest_file).open(mode="a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def write_image_manifest(
+    records: Sequence[Dict[str, Any]], manifest_file: Union[str, PathLike]
+) -> None:
+    # write to a temporary file first to not lose records when interrupted
+    temp_manifest_file = Path(manifest_file).with_name(
+        f"{Path(manifest_file).name}.tmp"
+    )
+    with temp_manifest_file.open(mode="w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    temp_manifest_file.replace(manifest_file)
+
+
+class _PreprocessTask(NamedTuple):
+    source_file: Path
+    acquisition: Optional["Acquisition"]
+    mcd_txt_file: Union[str, PathLike]  # extracted .mcd file for compressed members
+    recovery_txt_file: Optional[Path]
+    extracted_mcd_file: Optional[Path]  # to be removed after the last acquisition
+    skipped: bool  # unchanged, not to be preprocessed again
+
+
+def _list_preprocess_tasks(
+    mcd_files: Sequence[Union[str, PathLike]],
+    txt_files: Sequence[Union[str, PathLike]],
+    temp_dir: Union[str, PathLike],
+    unzip: bool = False,
+    mcd_index_file: Union[str, PathLike, None] = None,
+    image_manifest: Optional[Dict[str, Dict[str, Any]]] = None,
+    channel_names: Optional[Sequence[str]] = None,
+    hpf: Optional[float] = None,
+) -> Generator[_PreprocessTask, None, None]:
+    # matching of txt files is done here (not in the worker processes), such
+    # that results are deterministic and independent of the number of workers
+    # unmatched .txt files, in order (dict for constant-time removal)
+    candidate_txt_files = dict.fromkeys(txt_files)
+    txt_file_index = _index_txt_files(txt_files)
+    mcd_index = None
+    if mcd_index_file is not None:
+        mcd_index = _read_mcd_index(mcd_index_file)
+    # process mcd files in reverse order to avoid ambiguous txt file matching
+    # see https://github.com/BodenmillerGroup/steinbock/issues/100
+    for i, mcd_file in enumerate(
+        sorted(mcd_files, key=lambda mcd_file: Path(mcd_file).stem, reverse=True)
+    ):
+        zip_file_mcd_member = _get_zip_file_member(mcd_file)
+        if zip_file_mcd_member is not None and not unzip:
+            continue
+        try:
+            acquisitions = [
+                acquisition
+                for slide in _read_mcd_slides(mcd_file, mcd_index=mcd_index)
+                for acquisition in slide.acquisitions
+            ]
+        except Exception as e:
+            logger.exception(f"Error reading file {mcd_file}: {e}")
+            acquisitions = []
+        skipped = [
+            _is_skipped(
+                mcd_file,
+                acquisition.id,
+                image_manifest,
+                channel_names=channel_names,
+                hpf=hpf,
+            )
+            for acquisition in acquisitions
+        ]
+        extracted_mcd_file = None
+        if (
+            not all(skipped)
+            and zip_file_mcd_member is not None
+            and _get_stored_zip_file_member(mcd_file) is None
+        ):
+            # compressed members need random access for reading images
+            zip_file, mcd_member = zip_file_mcd_member
+            with ZipFile(zip_file) as fzip:
+                extracted_mcd_file = Path(
+                    fzip.extract(mcd_member, path=Path(temp_dir) / str(i))
+                )
+        last_j = max((j for j in range(len(skipped)) if not skipped[j]), default=-1)
+        for j, acquisition in enumerate(acquisitions):
+            recovery_txt_file = _match_txt_file(mcd_file, acquisition, txt_file_index)
+            if recovery_txt_file is not None:
+                del candidate_txt_files[recovery_txt_file]
+                _unindex_txt_file(txt_file_index, recovery_txt_file)
+                recovery_txt_file = Path(recovery_txt_file)
+            yield _PreprocessTask(
+                Path(mcd_file),
+                acquisition,
+                extracted_mcd_file or mcd_file,
+                recovery_txt_file,
+                extracted_mcd_file if j == last_j else None,
+                skipped[j],
+            )
+    if mcd_index_file is not None:
+        _write_mcd_index(mcd_index, mcd_index_file)
+    for txt_file in candidate_txt_files:
+        yield _PreprocessTask(
+            Path(txt_file),
+            None,
+            txt_file,
+            None,
+            None,
+            _is_skipped(
+                txt_file, None, image_manifest, channel_names=channel_names, hpf=hpf
+            ),
+        )
 
 
 def try_preprocess_images_from_disk(
@@ -417,77 +995,72 @@ def try_preprocess_images_from_disk(
     hpf: Optional[float] = None,
     unzip: bool = False,
     strict: bool = False,
+    workers: int = 1,
+    mcd_index_file: Union[str, PathLike, None] = None,
+    image_manifest: Optional[Dict[str, Dict[str, Any]]] = None,
 ) -> Generator[
-    Tuple[Path, Optional["Acquisition"], np.ndarray, Optional[Path], bool],
+    Tuple[Path, Optional["Acquisition"], Optional[np.ndarray], Optional[Path], bool],
     None,
     None,
 ]:
-    candidate_txt_files = list(txt_files)
-    # process mcd files in reverse order to avoid ambiguous txt file matching
-    # see https://github.com/BodenmillerGroup/steinbock/issues/100
-    for mcd_file in sorted(
-        mcd_files, key=lambda mcd_file: Path(mcd_file).stem, reverse=True
-    ):
-        zip_file_mcd_member = _get_zip_file_member(mcd_file)
-        if zip_file_mcd_member is None:
-            for (
-                acquisition,
-                img,
-                recovery_txt_file,
-                recovered,
-            ) in _try_preprocess_mcd_images_from_disk(
-                mcd_file,
-                candidate_txt_files,
+    # for acquisitions found in the image manifest, no image (None) is yielded
+    with TemporaryDirectory() as temp_dir:
+        tasks, preprocess_tasks = itertools.tee(
+            _list_preprocess_tasks(
+                mcd_files,
+                txt_files,
+                temp_dir,
+                unzip=unzip,
+                mcd_index_file=mcd_index_file,
+                image_manifest=image_manifest,
+                channel_names=channel_names,
+                hpf=hpf,
+            )
+        )
+        mcd_txt_files, acquisitions, recovery_txt_files = itertools.tee(
+            (task for task in preprocess_tasks if not task.skipped), 3
+        )
+        # acquisitions are decoded in parallel, results are yielded in order
+        results = map_parallel(
+            partial(
+                _try_preprocess_image_from_disk,
                 channel_names=channel_names,
                 hpf=hpf,
                 unzip=unzip,
                 strict=strict,
-            ):
-                yield Path(mcd_file), acquisition, img, recovery_txt_file, recovered
-                del img
-        elif unzip:
-            zip_file, mcd_member = zip_file_mcd_member
-            with ZipFile(zip_file) as fzip:
-                with TemporaryDirectory() as temp_dir:
-                    extracted_mcd_file = fzip.extract(mcd_member, path=temp_dir)
-                    for (
-                        acquisition,
+            ),
+            (task.mcd_txt_file for task in mcd_txt_files),
+            (
+                _detach_acquisition(task.acquisition)
+                if task.acquisition is not None
+                else None
+                for task in acquisitions
+            ),
+            (task.recovery_txt_file for task in recovery_txt_files),
+            workers=workers,
+        )
+        for task in tasks:
+            if task.skipped:
+                yield (
+                    task.source_file,
+                    task.acquisition,
+                    None,
+                    task.recovery_txt_file,
+                    False,
+                )
+            else:
+                result = next(results)
+                if result is not None:
+                    img, recovered = result
+                    yield (
+                        task.source_file,
+                        task.acquisition,
                         img,
-                        recovery_txt_file,
+                        task.recovery_txt_file,
                         recovered,
-                    ) in _try_preprocess_mcd_images_from_disk(
-                        extracted_mcd_file,
-                        candidate_txt_files,
-                        channel_names=channel_names,
-                        hpf=hpf,
-                        unzip=unzip,
-                        strict=strict,
-                    ):
-                        yield (
-                            Path(mcd_file),
-                            acquisition,
-                            img,
-                            recovery_txt_file,
-                            recovered,
-                        )
-                        del img
-    for txt_file in candidate_txt_files:
-        zip_file_txt_member = _get_zip_file_member(txt_file)
-        if zip_file_txt_member is None:
-            img = _try_preprocess_txt_image_from_disk(
-                txt_file, channel_names=channel_names, hpf=hpf
-            )
-            if img is not None:
-                yield Path(txt_file), None, img, None, False
-                del img
-        elif unzip:
-            zip_file, txt_member = zip_file_txt_member
-            with ZipFile(zip_file) as fzip:
-                with TemporaryDirectory() as temp_dir:
-                    extracted_txt_file = fzip.extract(txt_member, path=temp_dir)
-                    img = _try_preprocess_txt_image_from_disk(
-                        extracted_txt_file, channel_names=channel_names, hpf=hpf
                     )
-                    if img is not None:
-                        yield Path(txt_file), None, img, None, False
-                        del img
+                    del img
+                del result
+            if task.extracted_mcd_file is not None:
+                task.extracted_mcd_file.unlink()
+        results.close()  # shuts down worker processes
@@ -179,6 +179,14 @@ except ImportError:
     show_default=True,
     help="See Cellpose documentation",
 )
+@click.option(
+    "--prefetch",
+    "prefetch",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of images to read ahead",
+)
 @click.option(
     "-o",
     "mask_dir",
@@ -209,6 +217,7 @@ def cellpose_cmd(
     niter,
     augment,
     tile_overlap,
+    prefetch,
     mask_dir,
 ):
     cellpose = _get_cellpose_module()
@@ -247,7 +256,10 @@ def cellpose_cmd(
         niter=niter,
         augment=augment,
         tile_overlap=tile_overlap,
+        prefetch=prefetch,
     ):
-        mask_file = io._as_path_with_suffix(Path(mask_dir) / img_file.name, ".tiff")
+        mask_file = io._as_path_with_suffix(
+            Path(mask_dir) / img_file.name, io.image_file_suffix
+        )
         io.write_mask(mask, mask_file)
         logger.info(mask_file)
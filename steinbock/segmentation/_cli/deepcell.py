@@ -142,6 +142,14 @@ except ImportError:
     type=click.Path(exists=True, dir_okay=False),
     help="[Mesmer] Postprocessing parameters (YAML file)",
 )
+@click.option(
+    "--prefetch",
+    "prefetch",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of images to read ahead",
+)
 @click.option(
     "-o",
     "mask_dir",
@@ -165,6 +173,7 @@ def deepcell_cmd(
     segmentation_type,
     preprocess_file,
     postprocess_file,
+    prefetch,
     mask_dir,
 ):
     deepcell = _get_deepcell_module()
@@ -220,11 +229,14 @@ def deepcell_cmd(
         channelwise_zscore=channelwise_zscore,
         channel_groups=channel_groups,
         aggr_func=aggr_func,
+        prefetch=prefetch,
         pixel_size_um=pixel_size_um,
         segmentation_type=segmentation_type,
         preprocess_kwargs=preprocess_kwargs,
         postprocess_kwargs=postprocess_kwargs,
     ):
-        mask_file = io._as_path_with_suffix(Path(mask_dir) / img_file.name, ".tiff")
+        mask_file = io._as_path_with_suffix(
+            Path(mask_dir) / img_file.name, io.image_file_suffix
+        )
         io.write_mask(mask, mask_file)
         logger.info(mask_file)
@@ -1,4 +1,5 @@
 import logging
+from functools import partial
 from importlib.util import find_spec
 from os import PathLike
 from pathlib import Path
@@ -7,6 +8,7 @@ from typing import Generator, Optional, Protocol, Sequence, Tuple, Union
 import numpy as np
 
 from .. import io
+from .._parallel import map_prefetched
 from ._segmentation import SteinbockSegmentationException
 
 try:
@@ -80,14 +82,22 @@ def try_segment_objects(
     niter: Optional[int] = None,
     augment: bool = False,
     tile_overlap: float = 0.1,
+    prefetch: int = 1,
 ) -> Generator[Tuple[Path, np.ndarray, np.ndarray, np.ndarray], None, None]:
     model = models.CellposeModel(
         gpu=True
     )  # cellpose checks for gpu availability internally, so we can just set gpu=True here.
-    for img_file in img_files:
+    channels = None
+    if channel_groups is not None:
+        channels, channel_groups = io._select_grouped_channels(channel_groups)
+    read_image = partial(io.read_image, channels=channels)
+    # read the next images in the background while segmenting
+    for img_file, img_future in zip(
+        img_files, map_prefetched(read_image, img_files, depth=prefetch)
+    ):
         try:
             img = create_segmentation_stack(
-                io.read_image(img_file),
+                img_future.result(),
                 channelwise_minmax=channelwise_minmax,
                 channelwise_zscore=channelwise_zscore,
                 channel_groups=channel_groups,
@@ -120,3 +130,4 @@ def try_segment_objects(
             del img, masks, flows, styles
         except Exception as e:
             logger.exception(f"Error segmenting objects in {img_file}: {e}")
+        del img_future
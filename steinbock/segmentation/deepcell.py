@@ -19,6 +19,7 @@ from typing import (
 import numpy as np
 
 from .. import io
+from .._parallel import map_prefetched
 from ._segmentation import SteinbockSegmentationException
 
 if TYPE_CHECKING:
@@ -114,13 +115,21 @@ def try_segment_objects(
     channelwise_zscore: bool = False,
     channel_groups: Optional[np.ndarray] = None,
     aggr_func: AggregationFunction = np.mean,
+    prefetch: int = 1,
     **predict_kwargs,
 ) -> Generator[Tuple[Path, np.ndarray], None, None]:
     app, predict = application.value(model=model)
-    for img_file in img_files:
+    channels = None
+    if channel_groups is not None:
+        channels, channel_groups = io._select_grouped_channels(channel_groups)
+    read_image = partial(io.read_image, channels=channels)
+    # read the next images in the background while segmenting
+    for img_file, img_future in zip(
+        img_files, map_prefetched(read_image, img_files, depth=prefetch)
+    ):
         try:
             img = create_segmentation_stack(
-                io.read_image(img_file),
+                img_future.result(),
                 channelwise_minmax=channelwise_minmax,
                 channelwise_zscore=channelwise_zscore,
                 channel_groups=channel_groups,
@@ -136,3 +145,4 @@ def try_segment_objects(
             del img, mask
         except Exception as e:
             logger.exception(f"Error segmenting objects in {img_file}: {e}")
+        del img_future
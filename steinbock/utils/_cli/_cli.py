@@ -1,6 +1,7 @@
 import click
 
 from ..._cli.utils import OrderedClickGroup
+from .conversion import convert_cmd_group
 from .expansion import expand_cmd
 from .matching import match_cmd
 from .mosaics import mosaics_cmd_group
@@ -14,3 +15,4 @@ def utils_cmd_group():
 utils_cmd_group.add_command(expand_cmd)
 utils_cmd_group.add_command(match_cmd)
 utils_cmd_group.add_command(mosaics_cmd_group)
+utils_cmd_group.add_command(convert_cmd_group)
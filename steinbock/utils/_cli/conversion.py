@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import click
+import click_log
+
+from ... import io
+from ..._cli.utils import OrderedClickGroup, catch_exception, logger
+from ..._steinbock import SteinbockException
+from ..._steinbock import logger as steinbock_logger
+from .. import conversion
+
+
+@click.group(
+    name="convert", cls=OrderedClickGroup, help="Convert between TIFF and Zarr"
+)
+def convert_cmd_group():
+    pass
+
+
+@convert_cmd_group.command(name="images", help="Convert images")
+@click.argument("images", type=click.Path(exists=True))
+@click.option(
+    "--format",
+    "img_format",
+    type=click.Choice(list(io._image_file_suffixes), case_sensitive=False),
+    required=True,
+    help="Output file format (TIFF or OME-NGFF Zarr)",
+)
+@click.option(
+    "--workers",
+    "workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes",
+)
+@click.option(
+    "-o",
+    "converted_img_dir",
+    type=click.Path(file_okay=False),
+    help="Path to the converted images output directory",
+)
+@click_log.simple_verbosity_option(logger=steinbock_logger)
+@catch_exception(handle=SteinbockException)
+def images_cmd(images, img_format, workers, converted_img_dir):
+    if Path(images).is_file() or io._is_zarr(images):
+        img_files = [Path(images)]
+        img_dir = Path(images).parent
+    else:
+        img_files = io.list_image_files(images)
+        img_dir = Path(images)
+    if converted_img_dir is not None:
+        Path(converted_img_dir).mkdir(exist_ok=True)
+    else:
+        converted_img_dir = img_dir
+    for _, converted_img_file in conversion.try_convert_images_from_disk_to_disk(
+        img_files, converted_img_dir, img_format.lower(), workers=workers
+    ):
+        logger.info(converted_img_file)
+
+
+@convert_cmd_group.command(name="masks", help="Convert masks")
+@click.argument("masks", type=click.Path(exists=True))
+@click.option(
+    "--format",
+    "mask_format",
+    type=click.Choice(list(io._image_file_suffixes), case_sensitive=False),
+    required=True,
+    help="Output file format (TIFF or OME-NGFF Zarr)",
+)
+@click.option(
+    "--workers",
+    "workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes",
+)
+@click.option(
+    "-o",
+    "converted_mask_dir",
+    type=click.Path(file_okay=False),
+    help="Path to the converted masks output directory",
+)
+@click_log.simple_verbosity_option(logger=steinbock_logger)
+@catch_exception(handle=SteinbockException)
+def masks_cmd(masks, mask_format, workers, converted_mask_dir):
+    if Path(masks).is_file() or io._is_zarr(masks):
+        mask_files = [Path(masks)]
+        mask_dir = Path(masks).parent
+    else:
+        mask_files = io.list_mask_files(masks)
+        mask_dir = Path(masks)
+    if converted_mask_dir is not None:
+        Path(converted_mask_dir).mkdir(exist_ok=True)
+    else:
+        converted_mask_dir = mask_dir
+    for _, converted_mask_file in conversion.try_convert_masks_from_disk_to_disk(
+        mask_files, converted_mask_dir, mask_format.lower(), workers=workers
+    ):
+        logger.info(converted_mask_file)
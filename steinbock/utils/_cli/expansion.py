@@ -20,6 +20,14 @@ from .. import expansion
     show_default=True,
     help="Use memory mapping for reading images/masks",
 )
+@click.option(
+    "--workers",
+    "workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes",
+)
 @click.option(
     "-o",
     "expanded_masks_dir",
@@ -28,7 +36,7 @@ from .. import expansion
 )
 @click_log.simple_verbosity_option(logger=steinbock_logger)
 @catch_exception(handle=SteinbockException)
-def expand_cmd(masks, distance, mmap, expanded_masks_dir):
+def expand_cmd(masks, distance, mmap, workers, expanded_masks_dir):
     if Path(masks).is_file():
         mask_files = [Path(masks)]
     elif Path(masks).is_dir():
@@ -37,10 +45,7 @@ def expand_cmd(masks, distance, mmap, expanded_masks_dir):
         Path(expanded_masks_dir).mkdir(exist_ok=True)
     else:
         expanded_masks_dir = Path(masks)
-    for mask_file, expanded_mask in expansion.try_expand_masks_from_disk(
-        mask_files, distance, mmap=mmap
+    for _, expanded_mask_file in expansion.try_expand_masks_from_disk_to_disk(
+        mask_files, expanded_masks_dir, distance, mmap=mmap, workers=workers
     ):
-        expanded_mask_file = Path(expanded_masks_dir) / mask_file.name
-        io.write_mask(expanded_mask, expanded_mask_file, ignore_dtype=True)
         logger.info(expanded_mask_file)
-        del expanded_mask
@@ -20,6 +20,14 @@ from .. import matching
     show_default=True,
     help="Use memory mapping for reading images/masks",
 )
+@click.option(
+    "--workers",
+    "workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes",
+)
 @click.option(
     "-o",
     "csv_dir",
@@ -29,7 +37,7 @@ from .. import matching
 )
 @click_log.simple_verbosity_option(logger=steinbock_logger)
 @catch_exception(handle=SteinbockException)
-def match_cmd(masks1, masks2, mmap, csv_dir):
+def match_cmd(masks1, masks2, mmap, workers, csv_dir):
     if Path(masks1).is_file() and Path(masks2).is_file():
         mask_files1 = [Path(masks1)]
         mask_files2 = [Path(masks2)]
@@ -37,11 +45,12 @@ def match_cmd(masks1, masks2, mmap, csv_dir):
         mask_files1 = io.list_mask_files(masks1)
         mask_files2 = io.list_mask_files(masks2, base_files=mask_files1)
     Path(csv_dir).mkdir(exist_ok=True)
-    for mask_file1, mask_file2, df in matching.try_match_masks_from_disk(
-        mask_files1, mask_files2, mmap=mmap
+    for _, _, csv_file in matching.try_match_masks_from_disk_to_disk(
+        mask_files1,
+        mask_files2,
+        csv_dir,
+        csv_column_names=[Path(masks1).name, Path(masks2).name],
+        mmap=mmap,
+        workers=workers,
     ):
-        csv_file = io._as_path_with_suffix(Path(csv_dir) / mask_file1.name, ".csv")
-        df.columns = [Path(masks1).name, Path(masks2).name]
-        df.to_csv(csv_file, index=False)
         logger.info(csv_file)
-        del df
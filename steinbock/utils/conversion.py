@@ -0,0 +1,97 @@
+import logging
+from functools import partial
+from os import PathLike
+from pathlib import Path
+from typing import Generator, Optional, Sequence, Tuple, Union
+
+from .. import io
+from .._parallel import map_parallel
+from ._utils import SteinbockUtilsException
+
+logger = logging.getLogger(__name__)
+
+
+def _get_file_suffix(file_format: str) -> str:
+    if file_format not in io._image_file_suffixes:
+        raise SteinbockUtilsException(f"Unsupported file format: {file_format}")
+    return io._image_file_suffixes[file_format]
+
+
+def _try_convert_image_from_disk_to_disk(
+    img_file: Union[str, PathLike],
+    img_dir: Union[str, PathLike],
+    img_suffix: str,
+) -> Optional[Path]:
+    try:
+        img = io.read_image(img_file, native_dtype=True)
+        converted_img_file = io._as_path_with_suffix(
+            Path(img_dir) / Path(img_file).name, img_suffix
+        )
+        io.write_image(img, converted_img_file, ignore_dtype=True)
+        return converted_img_file
+    except Exception as e:
+        logger.exception(f"Error converting image {img_file}: {e}")
+    return None
+
+
+def _try_convert_mask_from_disk_to_disk(
+    mask_file: Union[str, PathLike],
+    mask_dir: Union[str, PathLike],
+    mask_suffix: str,
+) -> Optional[Path]:
+    try:
+        mask = io.read_mask(mask_file, native_dtype=True)
+        converted_mask_file = io._as_path_with_suffix(
+            Path(mask_dir) / Path(mask_file).name, mask_suffix
+        )
+        io.write_mask(mask, converted_mask_file, ignore_dtype=True)
+        return converted_mask_file
+    except Exception as e:
+        logger.exception(f"Error converting mask {mask_file}: {e}")
+    return None
+
+
+def try_convert_images_from_disk_to_disk(
+    img_files: Sequence[Union[str, PathLike]],
+    img_dir: Union[str, PathLike],
+    img_format: str,
+    workers: int = 1,
+) -> Generator[Tuple[Path, Path], None, None]:
+    img_suffix = _get_file_suffix(img_format)
+    for img_file, converted_img_file in zip(
+        img_files,
+        map_parallel(
+            partial(
+                _try_convert_image_from_disk_to_disk,
+                img_dir=img_dir,
+                img_suffix=img_suffix,
+            ),
+            img_files,
+            workers=workers,
+        ),
+    ):
+        if converted_img_file is not None:
+            yield Path(img_file), converted_img_file
+
+
+def try_convert_masks_from_disk_to_disk(
+    mask_files: Sequence[Union[str, PathLike]],
+    mask_dir: Union[str, PathLike],
+    mask_format: str,
+    workers: int = 1,
+) -> Generator[Tuple[Path, Path], None, None]:
+    mask_suffix = _get_file_suffix(mask_format)
+    for mask_file, converted_mask_file in zip(
+        mask_files,
+        map_parallel(
+            partial(
+                _try_convert_mask_from_disk_to_disk,
+                mask_dir=mask_dir,
+                mask_suffix=mask_suffix,
+            ),
+            mask_files,
+            workers=workers,
+        ),
+    ):
+        if converted_mask_file is not None:
+            yield Path(mask_file), converted_mask_file
@@ -1,3 +1,4 @@
+from functools import partial
 from os import PathLike
 from pathlib import Path
 from typing import Generator, Sequence, Tuple, Union
@@ -6,6 +7,7 @@ import numpy as np
 from skimage.segmentation import expand_labels
 
 from .. import io
+from .._parallel import map_parallel
 
 
 def expand_mask(mask: np.ndarray, distance: int) -> np.ndarray:
@@ -13,13 +15,61 @@ def expand_mask(mask: np.ndarray, distance: int) -> np.ndarray:
     return expanded_mask
 
 
+def _expand_mask_from_disk(
+    mask_file: Union[str, PathLike],
+    distance: int,
+    mmap: bool = False,
+    expanded_mask_dir: Union[str, PathLike, None] = None,
+) -> Union[np.ndarray, Path]:
+    if mmap:
+        mask = io.mmap_mask(mask_file)
+    else:
+        mask = io.read_mask(mask_file, native_dtype=True)
+    expanded_mask = expand_mask(mask, distance=distance)
+    del mask
+    if expanded_mask_dir is None:
+        return expanded_mask
+    expanded_mask_file = Path(expanded_mask_dir) / Path(mask_file).name
+    io.write_mask(expanded_mask, expanded_mask_file, ignore_dtype=True)
+    return expanded_mask_file
+
+
 def try_expand_masks_from_disk(
-    mask_files: Sequence[Union[str, PathLike]], distance: int, mmap: bool = False
+    mask_files: Sequence[Union[str, PathLike]],
+    distance: int,
+    mmap: bool = False,
+    workers: int = 1,
 ) -> Generator[Tuple[Path, np.ndarray], None, None]:
-    for mask_file in mask_files:
-        if mmap:
-            mask = io.mmap_mask(mask_file)
-        else:
-            mask = io.read_mask(mask_file, native_dtype=True)
-        expanded_mask = expand_mask(mask, distance=distance)
+    for mask_file, expanded_mask in zip(
+        mask_files,
+        map_parallel(
+            partial(_expand_mask_from_disk, distance=distance, mmap=mmap),
+            mask_files,
+            workers=workers,
+        ),
+    ):
         yield Path(mask_file), expanded_mask
+        del expanded_mask
+
+
+def try_expand_masks_from_disk_to_disk(
+    mask_files: Sequence[Union[str, PathLike]],
+    expanded_mask_dir: Union[str, PathLike],
+    distance: int,
+    mmap: bool = False,
+    workers: int = 1,
+) -> Generator[Tuple[Path, Path], None, None]:
+    for mask_file, expanded_mask_file in zip(
+        mask_files,
+        map_parallel(
+            partial(
+                _expand_mask_from_disk,
+                distance=distance,
+                mmap=mmap,
+                expanded_mask_dir=expanded_mask_dir,
+            ),
+            mask_files,
+            workers=workers,
+        ),
+    ):
+        yield Path(mask_file), expanded_mask_file
@@ -1,12 +1,14 @@
 import logging
+from functools import partial
 from os import PathLike
 from pathlib import Path
-from typing import Generator, Sequence, Tuple, Union
+from typing import Generator, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
 
 from .. import io
+from .._parallel import map_parallel
 
 logger = logging.getLogger(__name__)
 
@@ -29,22 +31,79 @@ def match_masks(mask1: np.ndarray, mask2: np.ndarray) -> pd.DataFrame:
     return df
 
 
+def _try_match_masks_from_disk(
+    mask_file1: Union[str, PathLike],
+    mask_file2: Union[str, PathLike],
+    mmap: bool = False,
+    csv_dir: Union[str, PathLike, None] = None,
+    csv_column_names: Optional[Sequence[str]] = None,
+) -> Union[pd.DataFrame, Path, None]:
+    try:
+        if mmap:
+            mask1 = io.mmap_mask(mask_file1)
+            mask2 = io.mmap_mask(mask_file2)
+        else:
+            mask1 = io.read_mask(mask_file1)
+            mask2 = io.read_mask(mask_file2)
+        df = match_masks(mask1, mask2)
+        del mask1, mask2
+        if csv_dir is None:
+            return df
+        csv_file = io._as_path_with_suffix(
+            Path(csv_dir) / Path(mask_file1).name, ".csv"
+        )
+        if csv_column_names is not None:
+            df.columns = list(csv_column_names)
+        df.to_csv(csv_file, index=False)
+        return csv_file
+    except Exception as e:
+        logger.exception(f"Error matching masks {mask_file1, mask_file2}: {e}")
+    return None
+
+
 def try_match_masks_from_disk(
     mask_files1: Sequence[Union[str, PathLike]],
     mask_files2: Sequence[Union[str, PathLike]],
     mmap: bool = False,
+    workers: int = 1,
 ) -> Generator[Tuple[Path, Path, pd.DataFrame], None, None]:
-    for mask_file1, mask_file2 in zip(mask_files1, mask_files2):
-        try:
-            if mmap:
-                mask1 = io.mmap_mask(mask_file1)
-                mask2 = io.mmap_mask(mask_file2)
-            else:
-                mask1 = io.read_mask(mask_file1)
-                mask2 = io.read_mask(mask_file2)
-            df = match_masks(mask1, mask2)
-            del mask1, mask2
+    for mask_file1, mask_file2, df in zip(
+        mask_files1,
+        mask_files2,
+        map_parallel(
+            partial(_try_match_masks_from_disk, mmap=mmap),
+            mask_files1,
+            mask_files2,
+            workers=workers,
+        ),
+    ):
+        if df is not None:
             yield Path(mask_file1), Path(mask_file2), df
             del df
-        except Exception as e:
-            logger.exception(f"Error matching masks {mask_file1, mask_file2}: {e}")
+
+
+def try_match_masks_from_disk_to_disk(
+    mask_files1: Sequence[Union[str, PathLike]],
+    mask_files2: Sequence[Union[str, PathLike]],
+    csv_dir: Union[str, PathLike],
+    csv_column_names: Optional[Sequence[str]] = None,
+    mmap: bool = False,
+    workers: int = 1,
+) -> Generator[Tuple[Path, Path, Path], None, None]:
+    for mask_file1, mask_file2, csv_file in zip(
+        mask_files1,
+        mask_files2,
+        map_parallel(
+            partial(
+                _try_match_masks_from_disk,
+                mmap=mmap,
+                csv_dir=csv_dir,
+                csv_column_names=csv_column_names,
+            ),
+            mask_files1,
+            mask_files2,
+            workers=workers,
+        ),
+    ):
+        if csv_file is not None:
+            yield Path(mask_file1), Path(mask_file2), csv_file
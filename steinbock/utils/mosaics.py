@@ -91,21 +91,26 @@ def try_stitch_tiles_from_disk_to_disk(
     for img_file_stem, tile_infos in img_tile_infos.items():
         img_file = Path(img_dir) / f"{img_file_stem}.tiff"
         try:
-            tile = io.read_image(tile_infos[0].tile_file, native_dtype=True)
+            tiles = [
+                io.open_image(ti.tile_file, native_dtype=True) for ti in tile_infos
+            ]
             img_shape = (
-                tile.shape[0],
+                tiles[0].shape[0],
                 max(ti.y + ti.height for ti in tile_infos),
                 max(ti.x + ti.width for ti in tile_infos),
             )
+            # tiles may have different data types (e.g. masks of different sizes)
+            img_dtype = np.result_type(*(tile.dtype for tile in tiles))
+            if relabel:  # relabeled objects may not fit the data type of the tiles
+                img_dtype = np.result_type(img_dtype, io.mask_dtype)
             if mmap:
                 img = io.mmap_image(
-                    img_file, mode="r+", shape=img_shape, dtype=tile.dtype
+                    img_file, mode="r+", shape=img_shape, dtype=img_dtype
                 )
             else:
-                img = np.zeros(img_shape, dtype=tile.dtype)
-            for i, tile_info in enumerate(tile_infos):
-                if i > 0:
-                    tile = io.read_image(tile_info.tile_file, native_dtype=True)
+                img = np.zeros(img_shape, dtype=img_dtype)
+            for tile_info in tile_infos:
+                tile = io.read_image(tile_info.tile_file, native_dtype=True)
                 img[
                     :,
                     tile_info.y : tile_info.y + tile_info.height,
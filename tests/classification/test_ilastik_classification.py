@@ -59,6 +59,15 @@ class TestIlastikClassification:
         )
         ilastik.write_ilastik_crop(ilastik_crop, tmp_path / "ilastik_crop.h5")  # TODO
 
+    def test_open_ilastik_crop(self, tmp_path: Path):
+        rng = np.random.default_rng(seed=0)
+        ilastik_crop = rng.random((4, 10, 12)).astype(io.img_dtype)
+        ilastik.write_ilastik_crop(ilastik_crop, tmp_path / "ilastik_crop.h5")
+        lazy_crop = ilastik.open_ilastik_crop(tmp_path / "ilastik_crop.h5")
+        assert lazy_crop.shape == ilastik_crop.shape
+        assert np.array_equal(lazy_crop[[2, 0], 3:8, -1], ilastik_crop[[2, 0], 3:8, -1])
+        assert np.array_equal(np.asarray(lazy_crop), ilastik_crop)
+
     def test_create_ilastik_image(self):
         img = np.array(
             [
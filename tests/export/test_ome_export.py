@@ -0,0 +1,25 @@
+from pathlib import Path
+
+import numpy as np
+import tifffile
+
+from steinbock.export import ome
+
+
+class TestOMEExport:
+    def test_write_ome_tiff(self, tmp_path: Path):
+        img = np.arange(2 * 70 * 50, dtype=np.float32).reshape((2, 70, 50))
+        ome.write_ome_tiff(img, tmp_path / "img.ome.tiff", ["a", "b"], tile_size=16)
+        with tifffile.TiffFile(tmp_path / "img.ome.tiff") as tif:
+            levels = tif.series[0].levels
+            assert [level.shape for level in levels] == [
+                (2, 70, 50),
+                (2, 35, 25),
+                (2, 18, 13),
+                (2, 9, 7),
+            ]
+            assert np.array_equal(levels[0].asarray(), img)
+            assert np.allclose(
+                levels[1].asarray(), img.reshape((2, 35, 2, 25, 2)).mean(axis=(2, 4))
+            )
+            assert levels[3].asarray()[1, -1, -1] == img[1, 64:, 48:].mean()
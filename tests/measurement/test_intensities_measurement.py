@@ -1,10 +1,11 @@
 from pathlib import Path
 
 import numpy as np
+import scipy.ndimage
 
 from steinbock import io
 from steinbock.measurement import intensities
-from steinbock.measurement.intensities import IntensityAggregation
+from steinbock.measurement.intensities import IntensityAggregation, IntensityPercentile
 
 
 class TestIntensitiesMeasurement:
@@ -40,6 +41,84 @@ class TestIntensitiesMeasurement:
         assert np.all(df.columns.values == np.array(channel_names))
         assert np.all(df.values == np.array([[1.0, 25.0], [5.0, 150.0]]))
 
+    def test_measure_intensites_aggregations(self):
+        rng = np.random.default_rng(seed=0)
+        img = rng.random((3, 20, 30), dtype=io.img_dtype)
+        mask = rng.integers(0, 50, (20, 30), dtype=io.mask_dtype)
+        channel_names = ["Channel 1", "Channel 2", "Channel 3"]
+        object_ids = np.unique(mask[mask != 0])
+        scipy_aggregations = {
+            IntensityAggregation.SUM: scipy.ndimage.sum_labels,
+            IntensityAggregation.MIN: scipy.ndimage.minimum,
+            IntensityAggregation.MAX: scipy.ndimage.maximum,
+            IntensityAggregation.MEAN: scipy.ndimage.mean,
+            IntensityAggregation.MEDIAN: scipy.ndimage.median,
+            IntensityAggregation.STD: scipy.ndimage.standard_deviation,
+            IntensityAggregation.VAR: scipy.ndimage.variance,
+        }
+        for intensity_aggregation, scipy_aggregation in scipy_aggregations.items():
+            df = intensities.measure_intensites(
+                img, mask, channel_names, intensity_aggregation
+            )
+            assert np.all(df.index.values == object_ids)
+            for i, channel_name in enumerate(channel_names):
+                expected = scipy_aggregation(img[i], labels=mask, index=object_ids)
+                assert np.all(df[channel_name].values == expected)
+
+    def test_measure_intensites_percentiles(self):
+        rng = np.random.default_rng(seed=0)
+        img = rng.random((3, 20, 30), dtype=io.img_dtype)
+        mask = rng.integers(0, 50, (20, 30), dtype=io.mask_dtype)
+        channel_names = ["Channel 1", "Channel 2", "Channel 3"]
+        object_ids = np.unique(mask[mask != 0])
+        for percentile in (0.0, 25.0, 90.0, 99.5, 100.0):
+            df = intensities.measure_intensites(
+                img, mask, channel_names, IntensityPercentile(percentile)
+            )
+            assert np.all(df.index.values == object_ids)
+            for i, channel_name in enumerate(channel_names):
+                expected = [
+                    np.percentile(img[i][mask == object_id].astype(float), percentile)
+                    for object_id in object_ids
+                ]
+                assert np.allclose(df[channel_name].values, expected)
+
+    def test_measure_aggregated_intensities(self):
+        img = np.array(
+            [
+                [
+                    [0.5, 1.5, 0.1],
+                    [0.1, 0.2, 0.3],
+                    [0.1, 6.5, 3.5],
+                ],
+            ],
+            dtype=io.img_dtype,
+        )
+        mask = np.array(
+            [
+                [1, 1, 0],
+                [0, 0, 0],
+                [0, 2, 2],
+            ],
+            dtype=io.mask_dtype,
+        )
+        intensities_dict = intensities.measure_aggregated_intensities(
+            img,
+            mask,
+            ["Channel 1"],
+            [IntensityAggregation.MEAN, IntensityAggregation.MAX],
+        )
+        assert list(intensities_dict.keys()) == [
+            IntensityAggregation.MEAN,
+            IntensityAggregation.MAX,
+        ]
+        mean_df = intensities_dict[IntensityAggregation.MEAN]
+        max_df = intensities_dict[IntensityAggregation.MAX]
+        assert np.all(mean_df.index.values == np.array([1, 2]))
+        assert np.all(max_df.index.values == np.array([1, 2]))
+        assert np.allclose(mean_df.values, np.array([[1.0], [5.0]]))
+        assert np.allclose(max_df.values, np.array([[1.5], [6.5]]))
+
     def test_try_measure_intensities_from_disk(
         self, imc_test_data_steinbock_path: Path
     ):
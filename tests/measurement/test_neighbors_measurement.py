@@ -24,6 +24,41 @@ class TestNeighborsMeasurement:
             dmax=1.0,
         )  # TODO
 
+    def test_measure_neighbors_centroid_kdtree(self):
+        rng = np.random.default_rng(seed=0)
+        centroids = rng.random((100, 2)) * 100
+        for metric, p in (("euclidean", 2.0), ("cityblock", 1.0)):
+            for dmax, kmax in ((10.0, None), (None, 5), (10.0, 5)):
+                dense_neighbors = neighbors._query_centroid_neighbors_dense(
+                    centroids, metric, dmax=dmax, kmax=kmax
+                )
+                kdtree_neighbors = neighbors._query_centroid_neighbors_kdtree(
+                    centroids, p, dmax=dmax, kmax=kmax
+                )
+                dense_edges = sorted(zip(dense_neighbors[0], dense_neighbors[1]))
+                kdtree_edges = sorted(zip(kdtree_neighbors[0], kdtree_neighbors[1]))
+                assert dense_edges == kdtree_edges
+                assert np.allclose(
+                    np.sort(dense_neighbors[2]), np.sort(kdtree_neighbors[2])
+                )
+
+    def test_measure_neighbors_centroid_kdtree_dmax(self):
+        # regular grid with many (diagonal) neighbors at a distance of dmax
+        centroids = np.stack(
+            np.meshgrid(np.arange(20) * 0.1, np.arange(20) * 0.1), axis=-1
+        ).reshape(-1, 2)
+        dmax = 0.1 * np.sqrt(2.0)
+        for metric, p in (("euclidean", 2.0), ("cityblock", 1.0)):
+            dense_neighbors = neighbors._query_centroid_neighbors_dense(
+                centroids, metric, dmax=dmax
+            )
+            kdtree_neighbors = neighbors._query_centroid_neighbors_kdtree(
+                centroids, p, dmax=dmax
+            )
+            dense_edges = sorted(zip(dense_neighbors[0], dense_neighbors[1]))
+            kdtree_edges = sorted(zip(kdtree_neighbors[0], kdtree_neighbors[1]))
+            assert dense_edges == kdtree_edges
+
     def test_measure_neighbors_euclidean_border(self):
         mask = np.array(
             [
@@ -40,6 +75,53 @@ class TestNeighborsMeasurement:
             dmax=1.0,
         )  # TODO
 
+    def test_measure_neighbors_euclidean_border_dmax(self):
+        # border pixels of the two objects are exactly dmax apart
+        mask = np.zeros((4, 5), dtype=io.mask_dtype)
+        mask[0, 0] = 1
+        mask[2, 3] = 2
+        df = neighbors.measure_neighbors(
+            mask,
+            NeighborhoodType.EUCLIDEAN_BORDER_DISTANCE,
+            metric="euclidean",
+            dmax=np.sqrt(13.0),
+        )
+        assert sorted(zip(df["Object"], df["Neighbor"])) == [(1, 2), (2, 1)]
+        assert np.allclose(df["Distance"], np.sqrt(13.0))
+
+    def test_measure_neighbors_euclidean_border_distances(self):
+        rng = np.random.default_rng(seed=0)
+        mask = rng.integers(0, 20, (20, 20), dtype=io.mask_dtype)
+        mask[rng.random((20, 20)) < 0.8] = 0
+        object_coords = {
+            object_id: np.argwhere(mask == object_id)
+            for object_id in np.unique(mask[mask != 0])
+        }
+        for dmax, kmax in ((3.0, None), (None, 2), (3.0, 2), (None, None)):
+            df = neighbors.measure_neighbors(
+                mask,
+                NeighborhoodType.EUCLIDEAN_BORDER_DISTANCE,
+                metric="euclidean",
+                dmax=dmax,
+                kmax=kmax,
+            )
+            for object_id, coords in object_coords.items():
+                expected_dists = sorted(
+                    np.amin(
+                        np.linalg.norm(
+                            coords[:, np.newaxis, :] - neighbor_coords, axis=-1
+                        )
+                    )
+                    for neighbor_id, neighbor_coords in object_coords.items()
+                    if neighbor_id != object_id
+                )
+                if dmax is not None:
+                    expected_dists = [d for d in expected_dists if d <= dmax]
+                if kmax is not None:
+                    expected_dists = expected_dists[:kmax]
+                dists = sorted(df.loc[df["Object"] == object_id, "Distance"])
+                assert np.allclose(dists, expected_dists)
+
     def test_measure_neighbors_euclidean_pixel_expansion(self):
         mask = np.array(
             [
@@ -56,6 +138,47 @@ class TestNeighborsMeasurement:
             dmax=1.0,
         )  # TODO
 
+    def test_measure_neighbors_euclidean_pixel_expansion_connectivity(self):
+        mask = np.array(
+            [
+                [1, 2],
+                [3, 4],
+            ],
+            dtype=io.mask_dtype,
+        )
+        edges = {1: [(1, 2), (1, 3), (2, 4), (3, 4)], 2: [(1, 4), (2, 3)]}
+        expected_edges = set()
+        for connectivity in (1, 2):
+            expected_edges.update(edges[connectivity])
+            expected_edges.update((b, a) for a, b in edges[connectivity])
+            df = neighbors.measure_neighbors(
+                mask,
+                NeighborhoodType.EUCLIDEAN_PIXEL_EXPANSION,
+                metric="euclidean",
+                dmax=1.0,
+                connectivity=connectivity,
+            )
+            assert set(zip(df["Object"], df["Neighbor"])) == expected_edges
+            assert len(df.index) == len(expected_edges)
+            assert df["Distance"].isna().all()
+
+    def test_measure_neighbors_centroid_delaunay_triangulation(self):
+        mask = np.zeros((10, 10), dtype=io.mask_dtype)
+        mask[1, 1] = 1
+        mask[1, 5] = 2
+        mask[1, 8] = 3
+        mask[6, 5] = 4
+        df = neighbors.measure_neighbors(
+            mask,
+            NeighborhoodType.CENTROID_DELAUNAY_TRIANGULATION,
+            metric="euclidean",
+            dmax=5.0,
+        )
+        expected_edges = [(1, 2), (2, 3), (2, 4)]
+        expected_edges += [(b, a) for a, b in expected_edges]
+        assert list(zip(df["Object"], df["Neighbor"])) == sorted(expected_edges)
+        assert np.all(df["Distance"] <= 5.0)
+
     def test_try_measure_neighbors_from_disk(self, imc_test_data_steinbock_path: Path):
         mask_files = io.list_mask_files(imc_test_data_steinbock_path / "masks")
         gen = neighbors.try_measure_neighbors_from_disk(
@@ -1,7 +1,11 @@
+import os
+from io import BytesIO
 from pathlib import Path
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
 import numpy as np
 import pytest
+from readimc.data import Acquisition
 
 from steinbock import io
 from steinbock.preprocessing import imc
@@ -29,6 +33,21 @@ class TestIMCPreprocessing:
         )
         imc.create_panel_from_mcd_files(mcd_files)  # TODO
 
+    def test_create_panel_from_mcd_files_index(
+        self, imc_test_data_steinbock_path: Path, tmp_path: Path
+    ):
+        mcd_files = imc.list_mcd_files(imc_test_data_steinbock_path / "raw")
+        mcd_index_file = tmp_path / "mcd_index.json"
+        panel = imc.create_panel_from_mcd_files(
+            mcd_files, mcd_index_file=mcd_index_file
+        )
+        assert mcd_index_file.is_file()
+        indexed_panel = imc.create_panel_from_mcd_files(
+            mcd_files, mcd_index_file=mcd_index_file
+        )
+        assert indexed_panel.equals(panel)
+        assert panel.equals(imc.create_panel_from_mcd_files(mcd_files))
+
     def test_create_panel_from_txt_file(self, imc_test_data_steinbock_path: Path):
         pass  # TODO
 
@@ -89,9 +108,117 @@ class TestIMCPreprocessing:
         )
         assert np.all(preprocessed_img == expected_preprocessed_img)
 
+    def test_match_txt_file(self):
+        txt_files = [
+            Path("sample1_ROI_001_1.txt"),
+            Path("sample1_ROI_002_2.txt"),
+            Path("sample10_ROI_001_1.txt"),
+            Path("sample2_ROI_001_1.txt"),
+            Path("sample2_extra_1.txt"),
+        ]
+        txt_file_index = imc._index_txt_files(txt_files)
+        acquisition = Acquisition(None, None, 1, None, {}, 0)
+        txt_file = imc._match_txt_file("sample10.mcd", acquisition, txt_file_index)
+        assert txt_file == Path("sample10_ROI_001_1.txt")
+        imc._unindex_txt_file(txt_file_index, txt_file)
+        txt_file = imc._match_txt_file("sample1.mcd", acquisition, txt_file_index)
+        assert txt_file == Path("sample1_ROI_001_1.txt")
+        assert imc._match_txt_file("sample2.mcd", acquisition, txt_file_index) is None
+        assert imc._match_txt_file("sample3.mcd", acquisition, txt_file_index) is None
+
+    def test_read_image_manifest(self, tmp_path: Path):
+        txt_file = tmp_path / "sample_1.txt"
+        txt_file.write_text("data")
+        img_dir = tmp_path / "img"
+        img_dir.mkdir()
+        img_file = img_dir / f"sample_1{io.image_file_suffix}"
+        io.write_image(np.zeros((1, 2, 2), dtype=io.img_dtype), img_file)
+        image_info_row = {"image": img_file.name}
+        record = imc.create_image_manifest_record(
+            txt_file, None, image_info_row, img_file, hpf=50.0
+        )
+        manifest_file = img_dir / imc.image_manifest_file_name
+        imc.append_image_manifest_record(record, manifest_file)
+        with manifest_file.open(mode="a") as f:
+            f.write('{"key": ')  # incomplete record
+        image_manifest = imc.read_image_manifest(manifest_file, img_dir, hpf=50.0)
+        assert list(image_manifest.values()) == [record]
+        assert len(imc.read_image_manifest(manifest_file, img_dir)) == 0
+        txt_file.write_text("modified data")
+        assert len(imc.read_image_manifest(manifest_file, img_dir, hpf=50.0)) == 0
+
+    def test_stat_image_file_dir(self, tmp_path: Path):
+        img_file = tmp_path / "sample_1.ome.zarr"
+        (img_file / "0" / "0").mkdir(parents=True)
+        chunk_file = img_file / "0" / "0" / "0"
+        chunk_file.write_bytes(b"data")
+        size, mtime_ns = imc._stat_image_file(img_file)
+        assert size == 4
+        os.utime(chunk_file, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        assert imc._stat_image_file(img_file) == (4, mtime_ns + 10**9)
+        chunk_file.write_bytes(b"more data")
+        assert imc._stat_image_file(img_file)[0] == 9
+
     def test_try_preprocess_images_from_disk(self, imc_test_data_steinbock_path: Path):
         mcd_files = imc.list_mcd_files(imc_test_data_steinbock_path / "raw")
         txt_files = imc.list_txt_files(imc_test_data_steinbock_path / "raw")
         gen = imc.try_preprocess_images_from_disk(mcd_files, txt_files)
         for mcd_txt_file, acquisition, img, recovery_file, recovered in gen:
             pass  # TODO
+
+    def test_try_preprocess_images_from_disk_workers(
+        self, imc_test_data_steinbock_path: Path
+    ):
+        mcd_files = imc.list_mcd_files(imc_test_data_steinbock_path / "raw")
+        txt_files = imc.list_txt_files(imc_test_data_steinbock_path / "raw")
+        serial_results = list(imc.try_preprocess_images_from_disk(mcd_files, txt_files))
+        parallel_results = list(
+            imc.try_preprocess_images_from_disk(mcd_files, txt_files, workers=2)
+        )
+        assert len(parallel_results) == len(serial_results)
+        for serial_result, parallel_result in zip(serial_results, parallel_results):
+            mcd_txt_file, acquisition, img, recovery_file, recovered = serial_result
+            assert parallel_result[0] == mcd_txt_file
+            assert getattr(parallel_result[1], "id", None) == getattr(
+                acquisition, "id", None
+            )
+            assert np.array_equal(parallel_result[2], img)
+            assert parallel_result[3:] == (recovery_file, recovered)
+
+    @pytest.mark.parametrize("compression", [ZIP_STORED, ZIP_DEFLATED])
+    def test_try_preprocess_images_from_zip(
+        self, imc_test_data_steinbock_path: Path, tmp_path: Path, compression: int
+    ):
+        mcd_files = imc.list_mcd_files(imc_test_data_steinbock_path / "raw")
+        txt_files = imc.list_txt_files(imc_test_data_steinbock_path / "raw")
+        with ZipFile(tmp_path / "raw.zip", mode="w", compression=compression) as fzip:
+            for mcd_txt_file in mcd_files + txt_files:
+                fzip.write(mcd_txt_file, arcname=mcd_txt_file.name)
+        zip_mcd_files = imc.list_mcd_files(tmp_path, unzip=True)
+        zip_txt_files = imc.list_txt_files(tmp_path, unzip=True)
+        assert imc.create_panel_from_mcd_files(zip_mcd_files, unzip=True).equals(
+            imc.create_panel_from_mcd_files(mcd_files)
+        )
+        results = list(imc.try_preprocess_images_from_disk(mcd_files, txt_files))
+        zip_results = list(
+            imc.try_preprocess_images_from_disk(
+                zip_mcd_files, zip_txt_files, unzip=True
+            )
+        )
+        assert len(zip_results) == len(results)
+        for result, zip_result in zip(results, zip_results):
+            assert zip_result[0].name == result[0].name
+            assert np.array_equal(zip_result[2], result[2])
+
+    def test_stream_mcd_schema_xml(self):
+        schema_xml = "<MCDSchema><Slide /></MCDSchema>"
+        data = (
+            b"\1" * 100
+            + "<MCDSchema></MCDSchema>".encode("utf-16-le")
+            + b"\2" * 50
+            + schema_xml.encode("utf-16-le")
+            + b"\3" * 10
+        )
+        for chunk_size in (1, 7, 64, len(data)):
+            assert imc._stream_mcd_schema_xml(BytesIO(data), chunk_size) == schema_xml
+        assert imc._find_mcd_schema_xml(data, 0, len(data)) == schema_xml
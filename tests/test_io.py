@@ -1,5 +1,10 @@
+import tracemalloc
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+import pytest
+
 from steinbock import io
 
 
@@ -10,9 +15,47 @@ class TestIO:
     def test_write_panel(self, imc_test_data_steinbock_path: Path):
         pass  # TODO
 
+    def test_to_dtype(self):
+        img = np.random.default_rng(seed=0).random((4, 256, 256)) * 1e5 - 1e3
+        block_size = 2**12
+        tracemalloc.start()
+        try:
+            converted_img = io._to_dtype(img, np.dtype(np.uint16), block_size)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        expected_img = np.clip(np.around(img), 0, 65535).astype(np.uint16)
+        assert np.array_equal(converted_img, expected_img)
+        # output array plus block-sized temporaries (no full-size temporaries)
+        assert peak_memory < converted_img.nbytes + 4 * block_size * img.itemsize
+
     def test_list_image_files(self, imc_test_data_steinbock_path: Path):
         io.list_image_files(imc_test_data_steinbock_path / "img")  # TODO
 
+    def test_list_image_files_index(self, tmp_path: Path, monkeypatch):
+        monkeypatch.setattr(io, "dir_index_manifest", True)
+        for img_file_name in ("a.tiff", "sub/b.tiff", ".c.tiff", "d.ome.zarr/0/0"):
+            (tmp_path / img_file_name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / img_file_name).touch()
+        img_files = io.list_image_files(tmp_path)
+        assert img_files == [
+            tmp_path / "a.tiff",
+            tmp_path / "d.ome.zarr",
+            tmp_path / "sub" / "b.tiff",
+        ]
+        assert (tmp_path / ".steinbock_index.json").is_file()
+        (tmp_path / "e.tiff").touch()
+        assert io.list_image_files(tmp_path) == img_files[:2] + [
+            tmp_path / "e.tiff",
+            img_files[2],
+        ]
+        assert io.list_mask_files(tmp_path, base_files=["x/a.csv", "d.csv"]) == [
+            tmp_path / "a.tiff",
+            tmp_path / "d.ome.zarr",
+        ]
+        with pytest.raises(io.SteinbockIOException):
+            io.list_mask_files(tmp_path, base_files=["b.tiff"])
+
     def test_read_image(self, imc_test_data_steinbock_path: Path):
         io.read_image(
             imc_test_data_steinbock_path / "img" / "20210305_NE_mockData1_1.tiff"
@@ -21,6 +64,79 @@ class TestIO:
     def test_write_image(self, imc_test_data_steinbock_path: Path):
         pass  # TODO
 
+    @pytest.mark.parametrize("tile_size", [0, 16])
+    @pytest.mark.parametrize("compression", ["none", "zlib"])
+    def test_read_image_subset(
+        self, tmp_path: Path, monkeypatch, compression: str, tile_size: int
+    ):
+        monkeypatch.setattr(io, "tiff_compression", compression)
+        monkeypatch.setattr(io, "tiff_tile_size", tile_size)
+        rng = np.random.default_rng(seed=0)
+        img = rng.random((5, 40, 30)).astype(io.img_dtype)
+        io.write_image(img, tmp_path / "img.tiff")
+        subset_img = io.read_image(
+            tmp_path / "img.tiff", channels=[3, 1], region=(5, 37, 17, 30)
+        )
+        assert np.array_equal(subset_img, img[[3, 1], 5:37, 17:30])
+        with pytest.raises(io.SteinbockIOException):
+            io.read_image(tmp_path / "img.tiff", channels=[5])
+
+    @pytest.mark.parametrize("img_storage", ["float16", "uint16"])
+    def test_write_image_compact(self, tmp_path: Path, monkeypatch, img_storage: str):
+        monkeypatch.setattr(io, "img_storage", img_storage)
+        rng = np.random.default_rng(seed=0)
+        img = (rng.random((3, 40, 30)) * 1000).astype(io.img_dtype)
+        img[1] = 0
+        io.write_image(img, tmp_path / "img.tiff")
+        for read_img in (
+            io.read_image(tmp_path / "img.tiff"),
+            io.mmap_image(tmp_path / "img.tiff"),
+        ):
+            assert read_img.dtype == io.img_dtype
+            assert np.allclose(read_img, img, rtol=1e-3, atol=1e-2)
+        subset_img = io.read_image(tmp_path / "img.tiff", channels=[2, 0])
+        assert np.allclose(subset_img, img[[2, 0]], rtol=1e-3, atol=1e-2)
+
+    @pytest.mark.parametrize("img_storage", ["float16", "uint16"])
+    def test_write_image_compact_nan(
+        self, tmp_path: Path, monkeypatch, img_storage: str
+    ):
+        monkeypatch.setattr(io, "img_storage", img_storage)
+        rng = np.random.default_rng(seed=0)
+        img = (rng.random((3, 8, 8)) * 1000).astype(io.img_dtype)
+        img[0, 3, 4] = np.nan
+        img[2] = np.nan
+        io.write_image(img, tmp_path / "img.tiff")
+        read_img = io.read_image(tmp_path / "img.tiff")
+        assert np.array_equal(np.isnan(read_img), np.isnan(img))
+        assert np.allclose(read_img, img, rtol=1e-3, atol=1e-2, equal_nan=True)
+        if img_storage == "uint16":
+            img[1, 0, 0] = np.inf
+            with pytest.raises(io.SteinbockIOException):
+                io.write_image(img, tmp_path / "img.tiff")
+
+    def test_open_image(self, tmp_path: Path):
+        rng = np.random.default_rng(seed=0)
+        img = (rng.random((5, 40, 30)) * 100).astype(np.uint16)
+        io.write_image(img, tmp_path / "img.tiff", ignore_dtype=True)
+        lazy_img = io.open_image(tmp_path / "img.tiff")
+        assert lazy_img.shape == img.shape
+        assert lazy_img.dtype == io.img_dtype
+        assert (
+            io.open_image(tmp_path / "img.tiff", native_dtype=True).dtype == img.dtype
+        )
+        img = img.astype(io.img_dtype)
+        for key in (
+            1,
+            [3, 1],
+            (slice(None), 5),
+            (2, slice(30, 2, -4), [0, 7]),
+            ([0, 2], [1, 3], [4, 5]),
+            ([0, 2], slice(None), [4, 5]),
+        ):
+            assert np.array_equal(lazy_img[key], img[key])
+        assert np.array_equal(np.asarray(lazy_img), img)
+
     def test_read_image_info(self, imc_test_data_steinbock_path: Path):
         io.read_image_info(imc_test_data_steinbock_path / "images.csv")  # TODO
 
@@ -38,6 +154,28 @@ class TestIO:
     def test_write_mask(self, imc_test_data_steinbock_path: Path):
         pass  # TODO
 
+    @pytest.mark.parametrize("compression", ["none", "zlib"])
+    def test_write_mask_tiled(self, tmp_path: Path, monkeypatch, compression: str):
+        monkeypatch.setattr(io, "tiff_compression", compression)
+        monkeypatch.setattr(io, "tiff_tile_size", 32)
+        mask = np.zeros((50, 70), dtype=io.mask_dtype)
+        mask[10:20, 30:60] = 1
+        io.write_mask(mask, tmp_path / "mask.tiff")
+        assert np.array_equal(io.read_mask(tmp_path / "mask.tiff"), mask)
+        assert np.array_equal(io.mmap_mask(tmp_path / "mask.tiff"), mask)
+
+    @pytest.mark.parametrize(
+        "max_label,dtype", [(200, np.uint8), (300, np.uint16), (70000, np.uint32)]
+    )
+    def test_write_mask_dtype(self, tmp_path: Path, max_label: int, dtype: type):
+        mask = np.zeros((50, 70), dtype=np.uint32)
+        mask[10:20, 30:60] = max_label
+        io.write_mask(mask, tmp_path / "mask.tiff")
+        assert io.read_mask(tmp_path / "mask.tiff", native_dtype=True).dtype == dtype
+        read_mask = io.read_mask(tmp_path / "mask.tiff")
+        assert read_mask.dtype == np.result_type(dtype, io.mask_dtype)
+        assert np.array_equal(read_mask, mask)
+
     def test_list_data_files(self, imc_test_data_steinbock_path: Path):
         io.list_data_files(imc_test_data_steinbock_path / "intensities")  # TODO
 
@@ -59,3 +197,52 @@ class TestIO:
 
     def test_write_neighbors(self, imc_test_data_steinbock_path: Path):
         pass  # TODO
+
+    @pytest.mark.parametrize("suffix", [".csv", ".parquet", ".feather"])
+    def test_write_read_data_formats(self, tmp_path: Path, suffix: str):
+        if suffix != ".csv":
+            pytest.importorskip("pyarrow")
+        data = pd.DataFrame(
+            data={"Channel 1": [1.5, 2.5], "Channel 2": [3.0, 4.0]},
+            index=pd.Index([1, 3], name="Object"),
+        )
+        io.write_data(data, tmp_path / f"img{suffix}")
+        assert io.list_data_files(tmp_path) == [tmp_path / f"img{suffix}"]
+        assert io.list_data_files(tmp_path, base_files=[Path("img.tiff")]) == [
+            tmp_path / f"img{suffix}"
+        ]
+        pd.testing.assert_frame_equal(
+            io.read_data(tmp_path / f"img{suffix}"), data, check_index_type=False
+        )
+
+    @pytest.mark.parametrize("suffix", [".csv", ".parquet", ".feather"])
+    def test_write_read_neighbors_formats(self, tmp_path: Path, suffix: str):
+        if suffix != ".csv":
+            pytest.importorskip("pyarrow")
+        neighbors = pd.DataFrame(
+            data={
+                "Object": np.array([1, 3], dtype=io.mask_dtype),
+                "Neighbor": np.array([3, 1], dtype=io.mask_dtype),
+                "Distance": np.array([2.5, 2.5], dtype=np.float32),
+            }
+        )
+        io.write_neighbors(neighbors, tmp_path / f"img{suffix}")
+        pd.testing.assert_frame_equal(
+            io.read_neighbors(tmp_path / f"img{suffix}"), neighbors
+        )
+        neighbors["Object"] = neighbors["Neighbor"] = np.array(
+            [1, 70000], dtype=np.uint32
+        )
+        io.write_neighbors(neighbors, tmp_path / f"img{suffix}")
+        pd.testing.assert_frame_equal(
+            io.read_neighbors(tmp_path / f"img{suffix}"), neighbors
+        )
+
+    @pytest.mark.parametrize("sep", [",", ";"])
+    def test_read_data_separators(self, tmp_path: Path, sep: str):
+        data_file = tmp_path / "img.csv"
+        data_file.write_text(f"Object{sep}Channel 1{sep}Channel 2\n1{sep}1.5{sep}3\n")
+        data = io.read_data(data_file)
+        assert data.index.tolist() == [1]
+        assert data.columns.tolist() == ["Channel 1", "Channel 2"]
+        assert data.loc[1, "Channel 1"] == 1.5
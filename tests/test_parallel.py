@@ -0,0 +1,53 @@
+import logging
+from operator import mul
+
+import pytest
+
+from steinbock._parallel import map_parallel, map_prefetched
+from steinbock._steinbock import SteinbockException
+
+logger = logging.getLogger("steinbock.tests")
+
+
+def _log_and_square(x: int) -> int:
+    logger.info(f"info {x}")
+    logger.debug(f"debug {x}")
+    return x * x
+
+
+class TestParallel:
+    def test_map_parallel(self):
+        xs = list(range(20))
+        ys = list(range(20, 40))
+        expected = [x * y for x, y in zip(xs, ys)]
+        assert list(map_parallel(mul, xs, ys)) == expected
+        assert list(map_parallel(mul, xs, ys, workers=3)) == expected
+
+    def test_map_parallel_logging(self, caplog):
+        # log records of worker processes are handled by the parent process
+        caplog.set_level(logging.INFO, logger="steinbock")
+        assert list(map_parallel(_log_and_square, range(5), workers=2)) == [
+            x * x for x in range(5)
+        ]
+        assert [record.getMessage() for record in caplog.records] == [
+            f"info {x}" for x in range(5)
+        ]
+
+    def test_map_parallel_invalid_workers(self):
+        with pytest.raises(SteinbockException):
+            list(map_parallel(mul, [1], [2], workers=0))
+
+    def test_map_prefetched(self):
+        xs = list(range(20))
+        ys = list(range(20, 40))
+        expected = [x * y for x, y in zip(xs, ys)]
+        for depth in (0, 1, 3):
+            futures = map_prefetched(mul, xs, ys, depth=depth)
+            assert [future.result() for future in futures] == expected
+
+    def test_map_prefetched_exception(self):
+        futures = list(map_prefetched(int, ["1", "x", "3"], depth=1))
+        assert futures[0].result() == 1
+        with pytest.raises(ValueError):
+            futures[1].result()
+        assert futures[2].result() == 3
@@ -0,0 +1,36 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from steinbock import io
+from steinbock.utils import conversion
+
+
+@pytest.mark.skipif(not io.zarr_available, reason="zarr not available")
+class TestConversionUtils:
+    def test_try_convert_images_from_disk_to_disk(self, tmp_path: Path):
+        img = np.arange(3 * 20 * 30, dtype=io.img_dtype).reshape((3, 20, 30))
+        io.write_image(img, tmp_path / "img.tiff")
+        gen = conversion.try_convert_images_from_disk_to_disk(
+            [tmp_path / "img.tiff"], tmp_path, "zarr"
+        )
+        (img_file, zarr_img_file), *_ = gen
+        assert zarr_img_file == tmp_path / "img.ome.zarr"
+        assert np.array_equal(io.read_image(zarr_img_file), img)
+        assert np.array_equal(
+            io.read_image(zarr_img_file, channels=[2, 0], region=(5, 10, 0, 30)),
+            img[[2, 0], 5:10, :],
+        )
+
+    def test_try_convert_masks_from_disk_to_disk(self, tmp_path: Path):
+        mask = np.zeros((20, 30), dtype=io.mask_dtype)
+        mask[5:10, 10:20] = 1
+        io.write_mask(mask, tmp_path / "mask.ome.zarr")
+        gen = conversion.try_convert_masks_from_disk_to_disk(
+            [tmp_path / "mask.ome.zarr"], tmp_path, "tiff"
+        )
+        (mask_file, tiff_mask_file), *_ = gen
+        assert tiff_mask_file == tmp_path / "mask.tiff"
+        assert np.array_equal(io.read_mask(tiff_mask_file), mask)
+        assert io.list_mask_files(tmp_path) == [tiff_mask_file]